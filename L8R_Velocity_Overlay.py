@@ -1,15 +1,25 @@
-import ctypes
 import tkinter as tk
 from tkinter import ttk
-from ctypes import wintypes
+import argparse
+import os
 import sys
 import math
 import time
-import struct
 import threading
-import queue
-import re
-from collections import deque
+
+from l8r_game import (MAX_SPEED, PLAYER_FIELDS, POINTER_CHAINS_FILE, SCAN_WORKERS, SIGNATURE_CACHE_FILE,
+                      ChainCache, load_fallback_chains)
+from l8r_graph import RASTER_AVAILABLE, GraphFrame, GraphRaster, GraphScene
+from l8r_history import HISTORY_FIELDS, HistoryPyramid
+from l8r_kinematics import SMOOTHING_MODES, Kinematics
+from l8r_memory import MemoryReader, ReadPlan
+from l8r_peaks import PeakTracker
+from l8r_perf import PerfMonitor, hud_text, write_jsonl
+from l8r_record import SessionRecorder, session_filename
+from l8r_replay import Recording, ReplaySource, parse_speed
+from l8r_sampling import PrecisionScheduler, SampleRing, monitor_refresh_rate
+from l8r_telemetry import TELEMETRY_PORT, TelemetryServer
+from l8r_watch import AttachWatcher
 
 # ==============================================================================
 #  L8R SK8R VELOCITY OVERLAY
@@ -17,188 +27,27 @@ from collections import deque
 
 # --- Configuration ------------------------------------------------------------
 
-PROCESS_NAME = "l8rsk8r.exe"
-BASE_MODULE = "UnityPlayer.dll" 
+# Game process, pointer chain, signature and player layout: see l8r_game.py
 
-# Fallback Static Pointer (May not work on all PCs)
-BASE_OFFSET = 0x01C67AE8
-POINTER_OFFSETS = [0x100, 0xD0, 0x8, 0x48, 0x288, 0x0] 
+# Recorded sessions go here, one file per recording (see l8r_record.py)
+RECORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+# Performance reports (Settings > Export Perf Log), one JSON object per line
+PERF_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_log.jsonl")
+# Telemetry stream (Settings > Stream Telemetry): ws://127.0.0.1:<port>/, localhost only
+TELEMETRY_STREAM_PORT = TELEMETRY_PORT
 
-# AOB Signature Scanning (Preferred)
-# Set VELOCITY_SIGNATURE to a unique byte pattern found in Cheat Engine.
-# Example: "48 8B 05 ?? ?? ?? ?? 48 8B 88"
-# Use '??' for wildcards.
-VELOCITY_SIGNATURE = None 
-VELOCITY_SIG_OFFSET = 0x0 # Offset from the signature match to the pointer
+# Samples buffered between the polling thread and the UI (power of two, ~65 s at 1 ms)
+SAMPLE_RING_CAPACITY = 1 << 16
 
-OFFSET_VELOCITY = 0x24C
-OFFSET_GRAVITY = 0x27C
+UI_FRAME_MS = 33 # UI refresh while tracking (~30 fps)
+UI_IDLE_FRAME_MS = 250 # UI refresh while the game isn't linked
+MAX_PEAK_LABELS = 15 # Long graph spans space peaks out so about this many fit
+PERF_REPORT_INTERVAL = 1.0 # Seconds between performance HUD / log updates
 
 # ------------------------------------------------------------------------------
 
-# --- Windows API Definitions ---
-kernel32 = ctypes.windll.kernel32
-user32 = ctypes.windll.user32
-
-TH32CS_SNAPPROCESS = 0x00000002
-TH32CS_SNAPMODULE = 0x00000008
-TH32CS_SNAPMODULE32 = 0x00000010
-PROCESS_VM_READ = 0x0010
-PROCESS_QUERY_INFORMATION = 0x0400
-
-class PROCESSENTRY32(ctypes.Structure):
-    _fields_ = [
-        ("dwSize", wintypes.DWORD),
-        ("cntUsage", wintypes.DWORD),
-        ("th32ProcessID", wintypes.DWORD),
-        ("th32DefaultHeapID", ctypes.c_void_p),
-        ("th32ModuleID", wintypes.DWORD),
-        ("cntThreads", wintypes.DWORD),
-        ("th32ParentProcessID", wintypes.DWORD),
-        ("pcPriClassBase", ctypes.c_long),
-        ("dwFlags", wintypes.DWORD),
-        ("szExeFile", ctypes.c_char * 260)
-    ]
-
-class MODULEENTRY32(ctypes.Structure):
-    _fields_ = [
-        ("dwSize", wintypes.DWORD),
-        ("th32ModuleID", wintypes.DWORD),
-        ("th32ProcessID", wintypes.DWORD),
-        ("GlblcntUsage", wintypes.DWORD),
-        ("ProccntUsage", wintypes.DWORD),
-        ("modBaseAddr", ctypes.c_void_p),
-        ("modBaseSize", wintypes.DWORD),
-        ("hModule", ctypes.c_void_p),
-        ("szModule", ctypes.c_char * 256),
-        ("szExePath", ctypes.c_char * 260)
-    ]
-
-def get_pid_by_name(process_name):
-    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
-    pid = None
-    entry = PROCESSENTRY32()
-    entry.dwSize = ctypes.sizeof(PROCESSENTRY32)
-    
-    if kernel32.Process32First(snapshot, ctypes.byref(entry)):
-        while True:
-            try:
-                exe_name = entry.szExeFile.decode('utf-8').lower()
-                if process_name.lower() in exe_name:
-                    pid = entry.th32ProcessID
-                    break
-            except:
-                pass
-            if not kernel32.Process32Next(snapshot, ctypes.byref(entry)):
-                break
-    kernel32.CloseHandle(snapshot)
-    return pid
-
-def get_module_base(pid, module_name):
-    try:
-        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPMODULE | TH32CS_SNAPMODULE32, pid)
-        if snapshot == -1 or snapshot == 0: return None, 0
-    except:
-        return None, 0
-
-    base_addr = None
-    base_size = 0
-    entry = MODULEENTRY32()
-    entry.dwSize = ctypes.sizeof(MODULEENTRY32)
-    
-    if kernel32.Module32First(snapshot, ctypes.byref(entry)):
-        while True:
-            try:
-                m_name = entry.szModule.decode('utf-8').lower()
-                if module_name.lower() == m_name:
-                    base_addr = entry.modBaseAddr
-                    base_size = entry.modBaseSize
-                    break
-            except:
-                pass
-            if not kernel32.Module32Next(snapshot, ctypes.byref(entry)):
-                break
-    kernel32.CloseHandle(snapshot)
-    return base_addr, base_size
-
-class MemoryReader:
-    def __init__(self):
-        self.pid = None
-        self.handle = None
-        self.modules = {}
-
-    def attach(self, process_name):
-        pid = get_pid_by_name(process_name)
-        if pid:
-            self.pid = pid
-            self.handle = kernel32.OpenProcess(PROCESS_VM_READ | PROCESS_QUERY_INFORMATION, False, pid)
-            return True
-        return False
-
-    def get_module(self, module_name):
-        if not self.pid: return 0, 0
-        return get_module_base(self.pid, module_name)
-
-    def read_bytes(self, address, size):
-        if not self.handle or not address: return None
-        buf = ctypes.create_string_buffer(size)
-        read = ctypes.c_size_t()
-        if kernel32.ReadProcessMemory(self.handle, ctypes.c_void_p(address), buf, size, ctypes.byref(read)):
-            return buf.raw
-        return None
-
-    def read_ptr(self, address):
-        data = self.read_bytes(address, 8) # 64-bit pointer
-        if data:
-            return struct.unpack('<Q', data)[0]
-        return 0
-
-    def read_float(self, address):
-        data = self.read_bytes(address, 4)
-        if data:
-            return struct.unpack('<f', data)[0]
-        return 0.0
-
-    def scan_pattern(self, module_name, pattern_str):
-        if not self.pid: return None
-        base, size = self.get_module(module_name)
-        if not base or not size: return None
-        
-        try:
-            # Read entire module
-            data = self.read_bytes(base, size)
-            if not data: return None
-            
-            # Convert pattern "48 8B ??" -> regex
-            parts = pattern_str.split()
-            regex_parts = []
-            for part in parts:
-                if part == '??' or part == '?':
-                    regex_parts.append(b'.')
-                else:
-                    regex_parts.append(re.escape(bytes.fromhex(part)))
-            regex = b''.join(regex_parts)
-            
-            match = re.search(regex, data)
-            if match:
-                return base + match.start()
-        except Exception as e:
-            # print(f"Scan error: {e}")
-            pass
-        return None
-
-    def resolve_chain(self, base_addr, offsets):
-        current_addr = self.read_ptr(base_addr)
-        if not current_addr: return 0
-        
-        for i, offset in enumerate(offsets):
-            current_addr = self.read_ptr(current_addr + offset)
-            if not current_addr:
-                return 0
-        return current_addr
-
 class VelocityOverlay:
-    def __init__(self, root):
+    def __init__(self, root, replay=None, telemetry_port=TELEMETRY_STREAM_PORT):
         self.root = root
         self.root.title("L8R Velocity")
         self.root.attributes('-topmost', True)
@@ -217,6 +66,11 @@ class VelocityOverlay:
         self.graph_show_x = tk.BooleanVar(value=False)
         self.graph_show_y = tk.BooleanVar(value=False)
         self.graph_show_z = tk.BooleanVar(value=False)
+        self.graph_show_h = tk.BooleanVar(value=False)
+        self.graph_show_accel = tk.BooleanVar(value=False)
+        self.graph_show_jerk = tk.BooleanVar(value=False)
+        self.show_kinematics = tk.BooleanVar(value=False) # Horizontal speed / acceleration / jerk readouts
+        self.kin_smoothing = tk.StringVar(value="ema") # One of SMOOTHING_MODES
         
         self.font_size_mag = tk.IntVar(value=24)
         self.font_size_vec = tk.IntVar(value=10)
@@ -231,6 +85,15 @@ class VelocityOverlay:
         self.precision_peak = tk.IntVar(value=1)
         
         self.graph_height = tk.IntVar(value=100) # Dynamic graph height
+        self.graph_span = tk.IntVar(value=30) # Seconds shown by the graphs
+        self.graph_session = tk.BooleanVar(value=False) # Show the whole session instead
+        self.graph_raster = tk.BooleanVar(value=False) # Rasterise graph lines into a PhotoImage (needs numpy)
+        self.ui_match_refresh = tk.BooleanVar(value=False) # Redraw at the monitor refresh rate instead of UI_FRAME_MS
+        self.refresh_hz = monitor_refresh_rate()
+        self.record_session = tk.BooleanVar(value=False) # Write every sample to RECORD_DIR
+        self.show_perf = tk.BooleanVar(value=False) # Performance HUD row
+        self.perf_export = tk.BooleanVar(value=False) # Append performance reports to PERF_LOG_FILE
+        self.telemetry_stream = tk.BooleanVar(value=False) # Serve samples over WebSocket (l8r_telemetry.py)
 
         # Apply font updates
         def update_fonts(*args):
@@ -239,30 +102,42 @@ class VelocityOverlay:
             self.label_vx.config(font=vec_font)
             self.label_vy.config(font=vec_font)
             self.label_vz.config(font=vec_font)
-            self.draw_graph() # Redraw for peak font size
+            self.label_h.config(font=vec_font)
+            self.label_accel.config(font=vec_font)
+            self.label_jerk.config(font=vec_font)
+            self.invalidate_graphs() # Redraw for peak font size
 
         try:
             self.show_magnitude.trace_add("write", lambda *args: self.refresh_layout())
             self.show_vectors.trace_add("write", lambda *args: self.refresh_layout())
             self.show_graph.trace_add("write", lambda *args: self.refresh_layout())
+            self.show_kinematics.trace_add("write", lambda *args: self.refresh_layout())
+            self.show_perf.trace_add("write", lambda *args: self.sync_perf())
+            self.perf_export.trace_add("write", lambda *args: self.sync_perf())
+            self.telemetry_stream.trace_add("write", lambda *args: self.sync_telemetry())
             
             self.font_size_mag.trace_add("write", update_fonts)
             self.font_size_vec.trace_add("write", update_fonts)
-            self.font_size_peak.trace_add("write", lambda *args: self.draw_graph())
-            self.peak_update_rate.trace_add("write", lambda *args: self.draw_graph())
+            self.font_size_peak.trace_add("write", lambda *args: self.invalidate_graphs())
+            self.precision_peak.trace_add("write", lambda *args: self.invalidate_graphs())
+            self.graph_span.trace_add("write", lambda *args: self.invalidate_graphs())
+            self.graph_session.trace_add("write", lambda *args: self.invalidate_graphs())
             self.graph_height.trace_add("write", lambda *args: self.refresh_layout()) # Update layout if height changes
+            self.graph_raster.trace_add("write", lambda *args: self.reset_graphs())
             
             self.graph_show_mag.trace_add("write", lambda *args: self.refresh_layout())
             self.graph_show_x.trace_add("write", lambda *args: self.refresh_layout())
             self.graph_show_y.trace_add("write", lambda *args: self.refresh_layout())
             self.graph_show_z.trace_add("write", lambda *args: self.refresh_layout())
+            self.graph_show_h.trace_add("write", lambda *args: self.refresh_layout())
+            self.graph_show_accel.trace_add("write", lambda *args: self.refresh_layout())
+            self.graph_show_jerk.trace_add("write", lambda *args: self.refresh_layout())
         except AttributeError:
             # Fallback for older python
             pass
 
-        # --- Data ---
-        self.history = deque()
-        self.history_duration = 30.0 # seconds
+        self._init_state(MemoryReader(scan_workers=SCAN_WORKERS, signature_cache_file=SIGNATURE_CACHE_FILE),
+                         replay, telemetry_port, load_fallback_chains(POINTER_CHAINS_FILE))
 
         # --- UI Components ---
         self.label_speed = tk.Label(root, text="WAITING...", font=("Consolas", 24, "bold"), fg="#00FF00", bg="black")
@@ -274,50 +149,100 @@ class VelocityOverlay:
         self.label_vy.pack(side="left", expand=True)
         self.label_vz = tk.Label(self.frame_vec, text="Z: 0.00", font=("Consolas", 10), fg="#5555FF", bg="black")
         self.label_vz.pack(side="left", expand=True)
+
+        self.frame_kin = tk.Frame(root, bg="black")
+        self.label_h = tk.Label(self.frame_kin, text="H: 0.00", font=("Consolas", 10), fg="#FFAA00", bg="black")
+        self.label_h.pack(side="left", expand=True)
+        self.label_accel = tk.Label(self.frame_kin, text="A: 0.0", font=("Consolas", 10), fg="#FF55FF", bg="black")
+        self.label_accel.pack(side="left", expand=True)
+        self.label_jerk = tk.Label(self.frame_kin, text="J: 0", font=("Consolas", 10), fg="#55FFFF", bg="black")
+        self.label_jerk.pack(side="left", expand=True)
         
         # Multiple Canvases
         self.canvas_mag = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
         self.canvas_x = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
         self.canvas_y = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
         self.canvas_z = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
+        self.canvas_h = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
+        self.canvas_accel = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
+        self.canvas_jerk = tk.Canvas(root, bg="black", height=100, highlightthickness=0)
+        for canvas in (self.canvas_mag, self.canvas_x, self.canvas_y, self.canvas_z,
+                       self.canvas_h, self.canvas_accel, self.canvas_jerk):
+            canvas.bind("<Configure>", lambda e: self.invalidate_graphs())
+        self.photo_factory = tk.PhotoImage
         
         self.label_status = tk.Label(root, text="Searching for game...", font=("Arial", 8), fg="white", bg="black")
+        self.label_perf = tk.Label(root, text="", font=("Consolas", 8), fg="#AAAAAA", bg="black")
 
         self.refresh_layout()
 
         self.menu = tk.Menu(root, tearoff=0)
         self.menu.add_checkbutton(label="Show Magnitude", variable=self.show_magnitude)
         self.menu.add_checkbutton(label="Show Vectors", variable=self.show_vectors)
+        self.menu.add_checkbutton(label="Show Derived", variable=self.show_kinematics)
+        self.menu.add_checkbutton(label="Show Performance", variable=self.show_perf)
         self.menu.add_checkbutton(label="Show Graph", variable=self.show_graph)
         self.menu.add_separator()
         self.menu.add_command(label="Settings...", command=self.open_settings)
         self.menu.add_separator()
-        self.menu.add_command(label="Exit", command=sys.exit)
+        self.menu.add_command(label="Exit", command=self.shutdown)
 
         self.root.bind("<ButtonPress-1>", self.start_move)
         self.root.bind("<B1-Motion>", self.do_move)
         self.root.bind("<Button-3>", self.show_context_menu)
-        self.root.bind("<Double-Button-1>", lambda e: sys.exit())
+        self.root.bind("<Double-Button-1>", lambda e: self.shutdown())
 
-        # Threading setup
-        self.data_queue = queue.Queue()
-        self.status_msg = "Initializing..."
-        self.running = True
-        self.thread_poll_rate = self.polling_rate.get()
-        
         # Update thread rate when UI changes
         self.polling_rate.trace_add("write", lambda *args: setattr(self, 'thread_poll_rate', self.polling_rate.get()))
+        self.kin_smoothing.trace_add("write", lambda *args: setattr(self, 'kin_mode', self.kin_smoothing.get()))
+        self.record_session.trace_add("write", lambda *args: setattr(self, 'record_wanted', self.record_session.get()))
 
-        self.mem = MemoryReader()
-        self.attached = False
-        self.player_address = 0
-        
         # Start polling thread
         self.poll_thread = threading.Thread(target=self.polling_loop, daemon=True)
         self.poll_thread.start()
         
         self.update_ui()
 
+    def _init_state(self, mem, replay=None, telemetry_port=TELEMETRY_STREAM_PORT, fallback_chains=()):
+        # Everything that isn't a Tk widget or variable (the settings vars are
+        # read, so they must exist). The benchmarks build a headless overlay
+        # on the same state: mem None there means UI only, no watcher.
+        # --- Data ---
+        self.history = HistoryPyramid() # t, speed, vx, vy, vz: raw recent samples plus aggregate tiers
+        self.peak_trackers = {i: PeakTracker() for i in range(1, len(HISTORY_FIELDS))} # history column -> peaks
+        self.peak_span = None # Graph span the peak trackers were built for
+        self.label_text = {} # label -> text last set, so unchanged readouts cost nothing
+        self.graph_dirty = True
+        self.graph_scenes = {} # canvas -> GraphScene / GraphRaster (retained items)
+        self.graph_columns = {} # (series, width) -> PixelColumns, the decimated window kept between frames
+        self.perf = None # PerfMonitor while the HUD or the log is on; None costs the hot paths nothing
+        self.perf_log = None
+        self.perf_next_report = 0.0
+        self.perf_scans = 0
+
+        # Threading setup
+        self.ring = SampleRing(SAMPLE_RING_CAPACITY) # Polling thread -> Tk thread, drops oldest on overflow
+        self.status_msg = "Initializing..."
+        self.running = True
+        self.thread_poll_rate = self.polling_rate.get()
+        self.scheduler = PrecisionScheduler(self.thread_poll_rate / 1000.0)
+        self.kinematics = Kinematics(self.kin_smoothing.get()) # Polling thread only
+        self.kin_mode = self.kinematics.mode
+        # The polling thread opens and closes the recorder itself, so it never races a sample
+        self.recorder = None
+        self.record_wanted = self.record_session.get()
+
+        self.mem = mem
+        self.chain = ChainCache(mem, fallback_chains=fallback_chains)
+        self.player_plan = ReadPlan(PLAYER_FIELDS)
+        self.attached = False
+        self.player_address = 0
+        self.replay = replay # ReplaySource standing in for the game, or None
+        # Finds the game and notices it closing on its own thread; poll_once only applies its events
+        self.watcher = AttachWatcher(mem.backend).start() if replay is None and mem is not None else None
+        self.telemetry = None # TelemetryServer while streaming; the polling thread pushes into its ring
+        self.telemetry_port = telemetry_port
+
     def show_context_menu(self, event):
         self.menu.post(event.x_root, event.y_root)
         
@@ -359,11 +284,19 @@ class VelocityOverlay:
                              bg="#222222", fg="white", highlightthickness=0)
             scale.pack(fill="x")
             
-        def create_check(label, var):
-            cb = tk.Checkbutton(scrollable_frame, text=label, variable=var, bg="#222222", fg="white", 
+        def create_check(label, var, state="normal"):
+            cb = tk.Checkbutton(scrollable_frame, text=label, variable=var, bg="#222222", fg="white", state=state,
                                 selectcolor="#444444", activebackground="#222222", activeforeground="white")
             cb.pack(anchor="w", padx=10)
 
+        def create_choice(label, var, options):
+            frame = tk.Frame(scrollable_frame, bg="#222222")
+            frame.pack(fill="x", padx=10, pady=5)
+            tk.Label(frame, text=label, fg="white", bg="#222222").pack(side="left")
+            menu = tk.OptionMenu(frame, var, *options)
+            menu.config(bg="#444444", fg="white", activebackground="#555555", highlightthickness=0)
+            menu.pack(side="right")
+
         # Font Settings
         lbl_fonts = tk.Label(scrollable_frame, text="Font Sizes", fg="#AAAAAA", bg="#222222", font=("Arial", 10, "bold"))
         lbl_fonts.pack(anchor="w", padx=5, pady=(10, 0))
@@ -389,10 +322,30 @@ class VelocityOverlay:
         lbl_graph = tk.Label(scrollable_frame, text="Graphs", fg="#AAAAAA", bg="#222222", font=("Arial", 10, "bold"))
         lbl_graph.pack(anchor="w", padx=5, pady=(10, 0))
         create_scale("Graph Height", self.graph_height, 50, 300)
+        create_scale("Graph Span (sec)", self.graph_span, 10, 3600)
+        create_check("Show Whole Session", self.graph_session)
         create_check("Show Magnitude (Green)", self.graph_show_mag)
         create_check("Show X (Red)", self.graph_show_x)
         create_check("Show Y (Light Green)", self.graph_show_y)
         create_check("Show Z (Blue)", self.graph_show_z)
+        create_check("Show Horizontal Speed (Orange)", self.graph_show_h)
+        create_check("Show Acceleration (Magenta)", self.graph_show_accel)
+        create_check("Show Jerk (Cyan)", self.graph_show_jerk)
+        create_choice("Accel/Jerk Smoothing", self.kin_smoothing, SMOOTHING_MODES)
+        if RASTER_AVAILABLE:
+            create_check("Raster Graphs (faster for dense traces)", self.graph_raster)
+        if self.refresh_hz:
+            create_check(f"Match Monitor Refresh ({self.refresh_hz} Hz)", self.ui_match_refresh)
+
+        # Recording
+        lbl_rec = tk.Label(scrollable_frame, text="Recording", fg="#AAAAAA", bg="#222222", font=("Arial", 10, "bold"))
+        lbl_rec.pack(anchor="w", padx=5, pady=(10, 0))
+        if self.replay is None:
+            create_check("Record Session to Disk", self.record_session)
+        else:
+            create_check("Record Session to Disk (not while replaying)", self.record_session, "disabled")
+        create_check("Export Perf Log (perf_log.jsonl)", self.perf_export)
+        create_check(f"Stream Telemetry (ws://127.0.0.1:{self.telemetry_port})", self.telemetry_stream)
         
         # Add some padding at the bottom
         tk.Label(scrollable_frame, text="", bg="#222222").pack(pady=10)
@@ -408,11 +361,16 @@ class VelocityOverlay:
     def refresh_layout(self):
         self.label_speed.pack_forget()
         self.frame_vec.pack_forget()
+        self.frame_kin.pack_forget()
         self.canvas_mag.pack_forget()
         self.canvas_x.pack_forget()
         self.canvas_y.pack_forget()
         self.canvas_z.pack_forget()
+        self.canvas_h.pack_forget()
+        self.canvas_accel.pack_forget()
+        self.canvas_jerk.pack_forget()
         self.label_status.pack_forget()
+        self.label_perf.pack_forget()
         
         current_height = self.graph_height.get()
 
@@ -421,6 +379,9 @@ class VelocityOverlay:
         
         if self.show_vectors.get():
             self.frame_vec.pack(fill="x", pady=5)
+
+        if self.show_kinematics.get():
+            self.frame_kin.pack(fill="x", pady=(0, 5))
             
         if self.show_graph.get():
             # Only pack individual graphs if enabled
@@ -436,8 +397,20 @@ class VelocityOverlay:
             if self.graph_show_z.get():
                 self.canvas_z.config(height=current_height)
                 self.canvas_z.pack(fill="x", pady=2, padx=5)
+            if self.graph_show_h.get():
+                self.canvas_h.config(height=current_height)
+                self.canvas_h.pack(fill="x", pady=2, padx=5)
+            if self.graph_show_accel.get():
+                self.canvas_accel.config(height=current_height)
+                self.canvas_accel.pack(fill="x", pady=2, padx=5)
+            if self.graph_show_jerk.get():
+                self.canvas_jerk.config(height=current_height)
+                self.canvas_jerk.pack(fill="x", pady=2, padx=5)
             
         self.label_status.pack(side="bottom")
+        if self.show_perf.get():
+            self.label_perf.pack(side="bottom")
+        self.invalidate_graphs()
 
     def start_move(self, event):
         self.root.x = event.x
@@ -448,10 +421,21 @@ class VelocityOverlay:
         y = self.root.winfo_y() + (event.y - self.root.y)
         self.root.geometry(f"+{x}+{y}")
         
-    def draw_single_graph(self, canvas, data_index, color, title):
-        canvas.delete("all")
-        
-        if len(self.history) < 2: return
+    def draw_single_graph(self, canvas, data_index, color, title, frame=None):
+        # Retained items: only what changed since the last frame is sent to Tk
+        scene = self.graph_scenes.get(canvas)
+        if scene is None:
+            if self.graph_raster.get() and RASTER_AVAILABLE:
+                scene = GraphRaster(canvas, self.photo_factory)
+            else:
+                scene = GraphScene(canvas)
+            self.graph_scenes[canvas] = scene
+        
+        if len(self.history) < 2:
+            scene.clear()
+            return
+        if frame is None: frame = self.graph_frame()
+        scene.begin()
 
         width = canvas.winfo_width()
         height = canvas.winfo_height()
@@ -461,18 +445,10 @@ class VelocityOverlay:
         margin_bottom = 40 
         graph_height = height - margin_bottom
 
-        # Create local copy for analysis
-        data = list(self.history)
-        now = data[-1][0]
-        start_time = now - self.history_duration
-        
-        # Collect values
-        all_values = [d[data_index] for d in data]
-        
-        if not all_values: return
+        start_time = frame.start_time
 
-        max_val = max(all_values)
-        min_val = min(all_values)
+        # Visible window decimated to min/max per pixel column
+        min_val, max_val, xs, values = frame.series(data_index, width)
         
         # Adjust scale to always include 0
         if min_val > 0: min_val = 0
@@ -482,104 +458,58 @@ class VelocityOverlay:
         if val_range < 10.0: val_range = 10.0 # Minimum range
         
         # Draw Title
-        canvas.create_text(2, 2, anchor="nw", text=title, fill=color, font=("Arial", 8, "bold"))
+        scene.text("title", (2, 2), anchor="nw", text=title, fill=color, font=("Arial", 8, "bold"))
         
         # 2. Draw Grid
         # Zero line
         zero_y = graph_height - ((0 - min_val) / val_range * graph_height)
-        canvas.create_line(0, zero_y, width, zero_y, fill="#555555")
+        scene.line("zero", (0, zero_y, width, zero_y), fill="#555555")
         
-        # Grid lines
+        # Grid lines (every 10, or 100, 1000, ... for big ranges like jerk)
         grid_interval = 10.0
+        while val_range / grid_interval > 10:
+            grid_interval *= 10
         # Positive grid
         curr = 0
         while curr < max_val:
             y = graph_height - ((curr - min_val) / val_range * graph_height)
             if y >= 0 and y <= graph_height:
-                canvas.create_line(0, y, width, y, fill="#333333", dash=(4, 4))
+                scene.line(("grid", curr), (0, y, width, y), fill="#333333", dash=(4, 4))
             curr += grid_interval
             
         # Negative grid
-        curr = -10.0
+        curr = -grid_interval
         while curr > min_val:
             y = graph_height - ((curr - min_val) / val_range * graph_height)
             if y >= 0 and y <= graph_height:
-                canvas.create_line(0, y, width, y, fill="#333333", dash=(4, 4))
+                scene.line(("grid", curr), (0, y, width, y), fill="#333333", dash=(4, 4))
             curr -= grid_interval
             
-        canvas.create_text(width - 2, 2, anchor="ne", text=f"{max_val:.1f}", fill="#555555", font=("Arial", 8))
-        canvas.create_text(width - 2, graph_height - 10, anchor="se", text=f"{min_val:.1f}", fill="#555555", font=("Arial", 8))
+        scene.text("max", (width - 2, 2), anchor="ne", text=f"{max_val:.1f}", fill="#555555", font=("Arial", 8))
+        scene.text("min", (width - 2, graph_height - 10), anchor="se", text=f"{min_val:.1f}", fill="#555555", font=("Arial", 8))
 
         # Plot Line
-        points = []
-        for item in data:
-            t = item[0]
-            val = item[data_index]
-            if t < start_time: continue
-            x = (t - start_time) / self.history_duration * width
-            y = graph_height - ((val - min_val) / val_range * graph_height)
-            points.append(x)
-            points.append(y)
+        points = frame.polyline(xs, values, min_val, val_range, graph_height)
         if len(points) >= 4:
-            canvas.create_line(points, fill=color, width=2)
-            
-        # Draw Peaks
-        peaks = []
-        for i in range(1, len(data) - 1):
-            t = data[i][0]
-            s = data[i][data_index] # Use relevant index
-            prev_s = data[i-1][data_index]
-            next_s = data[i+1][data_index]
+            scene.line("trace", points, layer="trace", fill=color, width=2)
             
-            # Simple peak detection: local maxima
-            # Only consider positive peaks for now, or abs magnitude?
-            # User wants peaks for "max speeds". For Vectors, maybe just positive?
-            # Or absolute max?
-            # Let's do raw value peaks.
-            if s > prev_s and s > next_s:
-                 # Check threshold to avoid noise
-                 if abs(s) > 1.0:
-                    peaks.append((t, s))
-        
-        peaks.sort(key=lambda x: x[1], reverse=True)
-        
-        selected_peaks = []
-        update_rate = self.peak_update_rate.get()
-        delay_ms = self.peak_display_delay.get()
-        delay_s = delay_ms / 1000.0
-        
-        current_time = now if now else time.time()
-        
-        for p in peaks:
-            t, s = p
-            # Skip if peak is too recent (delay)
-            if (current_time - t) < delay_s:
-                continue
-            
-            conflict = False
-            for sp in selected_peaks:
-                if abs(t - sp[0]) < update_rate: 
-                    conflict = True
-                    break
-            if not conflict:
-                selected_peaks.append(p)
-        
-        # Sort by TIME ascending to stabilize row assignment
-        selected_peaks.sort(key=lambda x: x[0])
-        
+        # Draw Peaks (kept up to date by the streaming peak trackers)
         peak_font = ("Arial", self.font_size_peak.get(), "bold")
         peak_decimals = self.precision_peak.get()
         
-        # Only show peaks visible in window
-        visible_peaks = [p for p in selected_peaks if p[0] >= start_time]
+        # Peak markers only slide left between frames: move them all in one call
+        scene.scroll("peak", start_time, width / frame.duration)
+        
+        # Only show peaks visible in window (time order keeps label rows stable)
+        visible_peaks = self.peak_trackers[data_index].visible(start_time)
         
         for i, p in enumerate(visible_peaks):
             t, s = p
             
-            px = (t - start_time) / self.history_duration * width
+            px = (t - start_time) / frame.duration * width
             py = graph_height - ((s - min_val) / val_range * graph_height)
             
-            canvas.create_line(px, py, px, graph_height, fill="#FFFF00", dash=(2, 4))
+            scene.line(("peak", t), (px, py, px, graph_height), layer="peak", transient=True, fill="#FFFF00", dash=(2, 4))
             
             # Stagger labels across 3 rows to prevent overlap
             # Use stable index based on time-sorted list
@@ -591,122 +521,324 @@ class VelocityOverlay:
             elif px > width - 20: anchor = "e"
             
             label_text = f"{s:.{peak_decimals}f}"
-            canvas.create_text(px, label_y, text=label_text, fill="#FFFF00", font=peak_font, anchor=anchor)
+            scene.text(("peak_label", t), (px, label_y), layer="peak", transient=True, text=label_text, fill="#FFFF00", font=peak_font, anchor=anchor)
+
+        scene.end()
+
+
+    def reset_graphs(self):
+        # Drop every graph's items, e.g. when switching between vector and raster rendering
+        for canvas in self.graph_scenes:
+            canvas.delete("all")
+        self.graph_scenes.clear()
+        self.invalidate_graphs()
 
+    def invalidate_graphs(self):
+        # Redraw the graphs on the next frame
+        self.graph_dirty = True
+
+    def graph_duration(self):
+        # Seconds the graphs span: the configured window, or everything recorded
+        if self.graph_session.get():
+            first, last = self.history.first_time(), self.history.last_time()
+            if first is not None and last > first:
+                return last - first
+        return float(max(self.graph_span.get(), 1))
+
+    def graph_frame(self):
+        duration = self.graph_duration()
+        return GraphFrame(self.history.view(duration), duration, self.graph_columns)
 
     def draw_graph(self):
         if not self.show_graph.get(): return
         
+        # One time-axis pass shared by every graph this frame
+        frame = self.graph_frame()
+        draw = self.draw_single_graph if self.perf is None else self.draw_timed
         if self.graph_show_mag.get():
-            self.draw_single_graph(self.canvas_mag, 1, "#00FF00", "MAGNITUDE")
+            draw(self.canvas_mag, 1, "#00FF00", "MAGNITUDE", frame)
         if self.graph_show_x.get():
-            self.draw_single_graph(self.canvas_x, 2, "#FF5555", "X VELOCITY")
+            draw(self.canvas_x, 2, "#FF5555", "X VELOCITY", frame)
         if self.graph_show_y.get():
-            self.draw_single_graph(self.canvas_y, 3, "#55FF55", "Y VELOCITY")
+            draw(self.canvas_y, 3, "#55FF55", "Y VELOCITY", frame)
         if self.graph_show_z.get():
-            self.draw_single_graph(self.canvas_z, 4, "#5555FF", "Z VELOCITY")
+            draw(self.canvas_z, 4, "#5555FF", "Z VELOCITY", frame)
+        if self.graph_show_h.get():
+            draw(self.canvas_h, 5, "#FFAA00", "HORIZONTAL SPEED", frame)
+        if self.graph_show_accel.get():
+            draw(self.canvas_accel, 6, "#FF55FF", "ACCELERATION", frame)
+        if self.graph_show_jerk.get():
+            draw(self.canvas_jerk, 7, "#55FFFF", "JERK", frame)
+
+    def draw_timed(self, canvas, data_index, color, title, frame):
+        t0 = time.perf_counter()
+        self.draw_single_graph(canvas, data_index, color, title, frame)
+        self.perf.rendered(title, time.perf_counter() - t0)
 
     def polling_loop(self):
+        self.scheduler.begin_timer_period()
         while self.running:
             try:
-                # Sleep based on rate
-                rate_sec = self.thread_poll_rate / 1000.0
-                if rate_sec < 0.001: rate_sec = 0.001
-                time.sleep(rate_sec)
-                
-                current_time = time.time()
-                
-                if not self.attached:
-                    if self.mem.attach(PROCESS_NAME):
-                        self.attached = True
-                        self.status_msg = "Attached. resolving pointer..."
-                    else:
-                        self.status_msg = "Game not found..."
-                
-                if self.attached:
-                    mod_base, mod_size = self.mem.get_module(BASE_MODULE)
-                    if mod_base:
-                        if VELOCITY_SIGNATURE:
-                            # Try Signature Scan
-                            scan_res = self.mem.scan_pattern(BASE_MODULE, VELOCITY_SIGNATURE)
-                            if scan_res:
-                                self.player_address = self.mem.resolve_chain(scan_res + VELOCITY_SIG_OFFSET, POINTER_OFFSETS)
-                                if self.player_address:
-                                    self.status_msg = f"Linked (AOB): {hex(self.player_address).upper()}"
-                                else:
-                                    self.status_msg = "AOB Found, resolving chain..."
-                            else:
-                                # Fallback to static
-                                self.player_address = self.mem.resolve_chain(mod_base + BASE_OFFSET, POINTER_OFFSETS)
-                                if self.player_address:
-                                    self.status_msg = f"Linked (Static): {hex(self.player_address).upper()}"
-                                else:
-                                    self.status_msg = "Scanning AOB..."
-                        else:
-                            # Use Static Pointer
-                            self.player_address = self.mem.resolve_chain(mod_base + BASE_OFFSET, POINTER_OFFSETS)
-                            if self.player_address:
-                                self.status_msg = f"Linked: {hex(self.player_address).upper()}"
-                            else:
-                                self.status_msg = "Resolving chain..."
-                    else:
-                        self.status_msg = f"Waiting for {BASE_MODULE}..."
-
-                    if self.player_address:
-                        vx = self.mem.read_float(self.player_address + OFFSET_VELOCITY)
-                        vy = self.mem.read_float(self.player_address + OFFSET_GRAVITY) 
-                        vz = self.mem.read_float(self.player_address + OFFSET_VELOCITY + 8)
-                        
-                        speed = math.sqrt(vx*vx + vy*vy + vz*vz)
-                        
-                        if speed < 100000:
-                            self.data_queue.put((current_time, speed, vx, vy, vz))
-                        else:
-                            self.player_address = 0
+                # Absolute deadlines on the monotonic clock (no drift from read time)
+                self.scheduler.set_period(max(self.thread_poll_rate, 1) / 1000.0)
+                self.poll_once(self.scheduler.wait())
+                # A replay is already on disk; recording it would only write an empty session
+                if self.record_wanted != (self.recorder is not None) and self.replay is None:
+                    self.sync_recorder()
             except Exception as e:
-                self.attached = False
+                self.chain.reset() # Attach state belongs to the watcher
                 self.status_msg = "Error reading memory"
                 time.sleep(1)
+                self.scheduler.reset()
+        self.scheduler.end_timer_period()
+
+    def sync_perf(self):
+        # Tk thread: counters run only while the HUD or the log wants them
+        wanted = self.show_perf.get() or self.perf_export.get()
+        if wanted and self.perf is None:
+            self.perf = PerfMonitor()
+            self.perf_next_report = time.perf_counter() + PERF_REPORT_INTERVAL
+            self.perf.counters = self.perf_counters()
+            self.perf_scans = self.chain.scans
+        elif not wanted:
+            self.perf = None
+        if self.perf_export.get() and self.perf_log is None:
+            self.perf_log = open(PERF_LOG_FILE, "a")
+        elif not self.perf_export.get() and self.perf_log is not None:
+            self.perf_log.close()
+            self.perf_log = None
+        self.refresh_layout()
 
-    def update_ui(self):
-        # Consume queue
-        while not self.data_queue.empty():
-            try:
-                item = self.data_queue.get_nowait()
-                self.history.append(item)
+    def perf_counters(self):
+        # Running totals kept elsewhere anyway; reported as rates
+        return {
+            "polls": self.scheduler.ticks,
+            "missed": self.scheduler.missed,
+            "resolves": self.chain.misses,
+            "breaks": self.chain.breaks,
+            "dropped": self.ring.dropped,
+        }
+
+    def report_perf(self, now):
+        scans = self.chain.scans
+        report = self.perf.report(now, self.perf_counters(), self.scheduler)
+        if scans != self.perf_scans:
+            report["scan_ms"] = round(self.chain.last_scan * 1000.0, 1)
+        self.perf_scans = scans
+        if self.show_perf.get():
+            self.set_label(self.label_perf, hud_text(report))
+        if self.perf_log is not None:
+            write_jsonl(self.perf_log, report)
+
+    def sync_telemetry(self):
+        # Tk thread: the server has its own thread; the poller only sees the attribute flip
+        if self.telemetry_stream.get() and self.telemetry is None:
+            server = TelemetryServer(port=self.telemetry_port)
+            if server.start():
+                self.telemetry = server
+            else:
+                self.status_msg = f"Telemetry stream failed: {server.error}"
+                self.telemetry_stream.set(False)
+        elif not self.telemetry_stream.get() and self.telemetry is not None:
+            server, self.telemetry = self.telemetry, None
+            server.stop()
+
+    def sync_recorder(self):
+        # Polling thread: start or stop recording to match the setting
+        if self.record_wanted:
+            self.recorder = SessionRecorder(os.path.join(RECORD_DIR, session_filename()))
+        else:
+            recorder, self.recorder = self.recorder, None
+            recorder.close()
+
+    def shutdown(self):
+        # Stop polling first, then let the recorder write out its last chunk
+        self.running = False
+        self.poll_thread.join(timeout=1.0)
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder.join(timeout=2.0)
+        if self.perf_log is not None:
+            self.perf_log.close()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.mem.close()
+        sys.exit()
+
+    def poll_once(self, current_time=None):
+        # Sample timestamps are perf_counter seconds, never wall clock
+        if current_time is None: current_time = time.perf_counter()
+        if self.kin_mode != self.kinematics.mode:
+            self.kinematics.configure(self.kin_mode)
+
+        if self.replay is not None:
+            # Never more than half the ring ahead of the UI, so nothing is dropped
+            batch = self.replay.poll(current_time, self.ring.capacity // 2 - self.ring.pending())
+            self.status_msg = self.replay.status
+            if batch is not None:
+                batch += self.kinematics.extend(batch[0], *batch[2:])
+                self.ring.extend(batch)
+                telemetry = self.telemetry
+                if telemetry is not None:
+                    telemetry.ring.extend(batch)
+            return
+        
+        watcher = self.watcher
+        if watcher.events:
+            attached = watcher.apply(self.mem)
+            if attached is not None:
+                self.attached = attached
+                self.chain.new_process()
+                self.player_address = 0
+        if not self.attached:
+            self.status_msg = watcher.status
+        else:
+            self.player_address = self.chain.get()
+            self.status_msg = self.chain.status
+            if self.player_address and self.chain.relinks:
+                self.status_msg += f" (re-linked {self.chain.relinks}x)"
+
+            if self.player_address:
+                perf = self.perf
+                if perf is None:
+                    fields = self.player_plan.read(self.mem, self.player_address)
+                else:
+                    t0 = time.perf_counter()
+                    fields = self.player_plan.read(self.mem, self.player_address)
+                    perf.read.add(time.perf_counter() - t0)
+                if fields:
+                    vx, vy, vz = fields
+                    speed = math.sqrt(vx*vx + vy*vy + vz*vz)
                 
-                if self.data_queue.empty():
-                    current_time, speed, vx, vy, vz = item
-                    
-                    prec_mag = self.precision_mag.get()
-                    prec_vec = self.precision_vec.get()
-                    
-                    self.label_speed.config(text=f"{speed:.{prec_mag}f} m/s")
-                    self.label_vx.config(text=f"X: {vx:.{prec_vec}f}")
-                    self.label_vy.config(text=f"Y: {vy:.{prec_vec}f}")
-                    self.label_vz.config(text=f"Z: {vz:.{prec_vec}f}")
-            except queue.Empty:
-                break
-        
-        self.label_status.config(text=self.status_msg)
-        
-        if "Linked" not in self.status_msg:
-             self.label_speed.config(text="--")
-             self.label_vx.config(text="X: --")
-             self.label_vy.config(text="Y: --")
-             self.label_vz.config(text="Z: --")
-        
-        current_time = time.time()
-        while self.history and (current_time - self.history[0][0] > self.history_duration):
-            self.history.popleft()
+                if fields and speed < MAX_SPEED:
+                    h_speed, accel, jerk = self.kinematics.update(current_time, vx, vy, vz)
+                    self.ring.push(current_time, speed, vx, vy, vz, h_speed, accel, jerk)
+                    recorder = self.recorder
+                    if recorder is not None:
+                        recorder.record(current_time, vx, vy, vz)
+                    telemetry = self.telemetry
+                    if telemetry is not None:
+                        telemetry.push(current_time, speed, vx, vy, vz, h_speed, accel, jerk)
+                else:
+                    # Unreadable or garbage velocity means the cached chain went stale
+                    self.chain.discard()
+                    self.player_address = 0
+
+    def update_peaks(self, current_time):
+        # Returns True if a settings change rebuilt the peaks
+        now = self.history.last_time()
+        if now is None: return False
+        duration = self.graph_duration()
+        t_min = current_time - duration
+        # Long spans space peaks out (in power-of-two steps, so rebuilds stay rare)
+        spacing = max(self.peak_update_rate.get(), 2.0 ** math.ceil(math.log2(duration / MAX_PEAK_LABELS)))
+        delay = self.peak_display_delay.get() / 1000.0
+        span = (self.graph_session.get(), self.graph_span.get())
+        span_changed, self.peak_span = span != self.peak_span, span
+        rebuilt = False
+        for index, tracker in self.peak_trackers.items():
+            if tracker.configure(spacing, delay) or span_changed:
+                # Settings changed: re-run the rule over what's in the history
+                tracker.rebuild(*self.history.series_since(index, t_min), now)
+                rebuilt = True
+            else:
+                tracker.advance(now)
+            tracker.expire(t_min)
+        return rebuilt
+
+    def set_label(self, label, text):
+        # Only touch Tk when the text actually changes
+        if self.label_text.get(label) != text:
+            label.config(text=text)
+            self.label_text[label] = text
+
+    def frame_interval(self, linked):
+        if not linked:
+            return UI_IDLE_FRAME_MS
+        if self.ui_match_refresh.get() and self.refresh_hz:
+            return max(4, int(1000 / self.refresh_hz))
+        return UI_FRAME_MS
+
+    def update_ui(self):
+        perf = self.perf
+        if perf is not None:
+            perf.frame_start(time.perf_counter(), self.ring.pending())
+
+        # Take every sample since the last frame in one batch
+        batch = self.ring.consume()
+        times, speeds, vxs, vys, vzs, h_speeds, accels, jerks = batch
+        linked = "Linked" in self.status_msg
+        if times:
+            self.history.extend(batch)
+            for index, tracker in self.peak_trackers.items():
+                tracker.feed(times, batch[index])
+            self.graph_dirty = True
+        
+        status = self.status_msg
+        recorder = self.recorder
+        if recorder is not None:
+            status += "  [REC failed]" if recorder.error else "  [REC]"
+        telemetry = self.telemetry
+        if telemetry is not None and telemetry.clients:
+            status += f"  [WS {len(telemetry.clients)}]"
+        self.set_label(self.label_status, status)
+        
+        if not linked:
+            self.set_label(self.label_speed, "--")
+            self.set_label(self.label_vx, "X: --")
+            self.set_label(self.label_vy, "Y: --")
+            self.set_label(self.label_vz, "Z: --")
+            self.set_label(self.label_h, "H: --")
+            self.set_label(self.label_accel, "A: --")
+            self.set_label(self.label_jerk, "J: --")
+        elif times:
+            speed, vx, vy, vz = speeds[-1], vxs[-1], vys[-1], vzs[-1]
             
-        self.draw_graph()
-        self.root.after(33, self.update_ui)
+            prec_mag = self.precision_mag.get()
+            prec_vec = self.precision_vec.get()
+            
+            self.set_label(self.label_speed, f"{speed:.{prec_mag}f} m/s")
+            self.set_label(self.label_vx, f"X: {vx:.{prec_vec}f}")
+            self.set_label(self.label_vy, f"Y: {vy:.{prec_vec}f}")
+            self.set_label(self.label_vz, f"Z: {vz:.{prec_vec}f}")
+            if self.show_kinematics.get():
+                self.set_label(self.label_h, f"H: {h_speeds[-1]:.{prec_vec}f}")
+                self.set_label(self.label_accel, f"A: {accels[-1]:.1f}")
+                self.set_label(self.label_jerk, f"J: {jerks[-1]:.0f}")
+        
+        current_time = time.perf_counter()
+        if self.history.evict(current_time):
+            self.graph_dirty = True
+        if self.update_peaks(current_time):
+            self.graph_dirty = True
+            
+        # Redraw only when something visible changed
+        if self.graph_dirty:
+            self.graph_dirty = False
+            self.draw_graph()
+        if perf is not None and current_time >= self.perf_next_report:
+            self.perf_next_report = current_time + PERF_REPORT_INTERVAL
+            self.report_perf(current_time)
+        self.root.after(self.frame_interval(linked), self.update_ui)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="L8R SK8R velocity overlay")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session instead of reading the game")
+    parser.add_argument("--speed", default="1", help="replay speed multiplier, or 'max' (default: 1)")
+    parser.add_argument("--telemetry", metavar="PORT", type=int, nargs="?", const=TELEMETRY_STREAM_PORT,
+                        help=f"stream samples over WebSocket from the start (default port: {TELEMETRY_STREAM_PORT})")
+    args = parser.parse_args()
+    try:
+        replay = ReplaySource(Recording(args.replay), parse_speed(args.speed)) if args.replay else None
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{e}\n")
     try:
         root = tk.Tk()
-        app = VelocityOverlay(root)
+        app = VelocityOverlay(root, replay, args.telemetry or TELEMETRY_STREAM_PORT)
+        if args.telemetry:
+            app.telemetry_stream.set(True)
         root.mainloop()
     except Exception as e:
         import traceback
@@ -0,0 +1,45 @@
+import argparse
+
+from l8r_bench_sampling import bench_attach, bench_handoff, bench_headless, bench_poll, bench_record, bench_telemetry
+from l8r_bench_scans import bench_pointers, bench_scan, bench_values
+from l8r_bench_ui import bench_perf, bench_replay, bench_spans, bench_ui
+
+# ==============================================================================
+#  END-TO-END BENCHMARKS (simulated game, no display needed)
+# ==============================================================================
+#
+#   python l8r_bench.py            # everything
+#   python l8r_bench.py poll ui    # selected sections
+#   python l8r_bench.py ui --tk    # draw on real Tk canvases (needs a display)
+#
+# The sections live in l8r_bench_sampling.py, l8r_bench_ui.py and
+# l8r_bench_scans.py, on the headless overlay and helpers in
+# l8r_bench_harness.py. This file only picks and runs them.
+
+SECTIONS = {"poll": bench_poll, "handoff": bench_handoff, "record": bench_record, "ui": bench_ui, "spans": bench_spans,
+            "replay": bench_replay, "perf": bench_perf, "telemetry": bench_telemetry, "headless": bench_headless,
+            "pointers": bench_pointers, "values": bench_values,
+            "attach": bench_attach, "scan": bench_scan}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="L8R overlay benchmarks against a simulated game")
+    parser.add_argument("sections", nargs="*", help=f"any of: {', '.join(SECTIONS)} (default: all)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of timed polling runs")
+    parser.add_argument("--tk", action="store_true", help="draw on real Tk canvases (needs a display)")
+    parser.add_argument("--graph-height", type=int, default=100, help="graph canvas height for the ui section")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    for name in args.sections or list(SECTIONS):
+        if name == "poll":
+            bench_poll(args.seconds)
+        elif name == "record":
+            bench_record(args.seconds)
+        elif name == "ui":
+            bench_ui(use_tk=args.tk, height=args.graph_height)
+        else:
+            SECTIONS[name]()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+from array import array
+import time
+
+import L8R_Velocity_Overlay as overlay
+import l8r_game
+from l8r_kinematics import Kinematics
+from l8r_sim import SimGame, skate_motion
+
+# ==============================================================================
+#  BENCHMARK HARNESS
+# ==============================================================================
+#
+# Shared by the l8r_bench_*.py sections. VelocityOverlay is built without its
+# Tk widgets: settings become plain value holders, labels swallow config()
+# calls, and RecordingCanvas counts every canvas call that would have been a
+# Tcl round trip. Everything else (history, ring, chain, watcher...) comes
+# from the overlay's own _init_state().
+
+# --- Headless overlay -----------------------------------------------------------
+
+class StubVar:
+    # Stands in for tk.BooleanVar / IntVar / DoubleVar
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def trace_add(self, mode, callback):
+        pass
+
+class StubWidget:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **kw):
+        self.options.update(kw)
+
+    configure = config
+
+    def pack(self, **kw):
+        pass
+
+    def pack_forget(self):
+        pass
+
+class StubRoot(StubWidget):
+    def after(self, ms, func, *args):
+        return None
+
+class StubPhoto:
+    # Stands in for tk.PhotoImage; keeps the last frame it was given
+    def __init__(self, **kw):
+        self.options = kw
+
+    def configure(self, **kw):
+        self.options.update(kw)
+
+class RecordingCanvas(StubWidget):
+    def __init__(self, width=240, height=100):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.calls = 0
+        self.items = 0
+        self._next_id = 1
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _item(self):
+        self.calls += 1
+        self.items += 1
+        self._next_id += 1
+        return self._next_id - 1
+
+    def create_line(self, *args, **kw):
+        return self._item()
+
+    def create_text(self, *args, **kw):
+        return self._item()
+
+    def create_image(self, *args, **kw):
+        return self._item()
+
+    def create_rectangle(self, *args, **kw):
+        return self._item()
+
+    def delete(self, *args):
+        self.calls += 1
+        if "all" in args: self.items = 0
+
+    def coords(self, *args):
+        self.calls += 1
+
+    def itemconfig(self, *args, **kw):
+        self.calls += 1
+
+    itemconfigure = itemconfig
+
+    def tag_raise(self, *args):
+        self.calls += 1
+
+    tag_lower = tag_raise
+    move = tag_raise
+
+HEADLESS_VARS = {
+    "show_magnitude": True, "show_vectors": True, "show_graph": True,
+    "graph_show_mag": True, "graph_show_x": True, "graph_show_y": True, "graph_show_z": True,
+    "graph_show_h": False, "graph_show_accel": False, "graph_show_jerk": False,
+    "show_kinematics": False, "kin_smoothing": "ema", "show_perf": False, "perf_export": False,
+    "telemetry_stream": False,
+    "font_size_mag": 24, "font_size_vec": 10, "font_size_peak": 8,
+    "peak_update_rate": 2.0, "polling_rate": 1, "peak_display_delay": 0,
+    "precision_mag": 2, "precision_vec": 2, "precision_peak": 1,
+    "graph_height": 100, "graph_raster": False, "ui_match_refresh": False,
+    "graph_span": 30, "graph_session": False, "record_session": False,
+}
+
+def make_headless_overlay(mem, canvas_factory=RecordingCanvas, root=None):
+    # mem may be None when only the UI side is exercised. Only the Tk half of
+    # VelocityOverlay.__init__ is stood in for here; the rest is the overlay's
+    # own _init_state(), so the two can't drift apart.
+    ov = overlay.VelocityOverlay.__new__(overlay.VelocityOverlay)
+    ov.root = root or StubRoot()
+    for name, value in HEADLESS_VARS.items():
+        setattr(ov, name, StubVar(value))
+    for name in ("label_speed", "label_vx", "label_vy", "label_vz", "label_status", "frame_vec",
+                 "label_h", "label_accel", "label_jerk", "frame_kin", "label_perf"):
+        setattr(ov, name, StubWidget())
+    for name in ("canvas_mag", "canvas_x", "canvas_y", "canvas_z", "canvas_h", "canvas_accel", "canvas_jerk"):
+        setattr(ov, name, canvas_factory())
+    ov.photo_factory = StubPhoto
+    ov.refresh_hz = None
+    ov._init_state(mem)
+    return ov
+
+# --- Helpers --------------------------------------------------------------------
+
+def make_sim(**kw):
+    return SimGame(l8r_game.BASE_OFFSET, l8r_game.POINTER_OFFSETS, l8r_game.PLAYER_FIELDS, **kw)
+
+def percentiles(values, points=(50, 90, 99, 99.9)):
+    ordered = sorted(values)
+    if not ordered: return {p: 0.0 for p in points}
+    return {p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))] for p in points}
+
+def fmt_us(seconds):
+    return f"{seconds * 1e6:8.1f} us"
+
+def motion_sample(t):
+    v = skate_motion(t)
+    vx, vy, vz = v["vx"], v["vy"], v["vz"]
+    return t, (vx * vx + vy * vy + vz * vz) ** 0.5, vx, vy, vz
+
+def push_motion(ov, t):
+    # One sample through the ring, with its kinematics, as poll_once pushes it
+    sample = motion_sample(t)
+    ov.ring.push(*sample, *ov.kinematics.update(t, *sample[2:]))
+
+def fill_history(ov, samples, duration=30.0, batch=10000):
+    # Evenly spread samples over the last `duration` seconds (perf_counter clock)
+    now = time.perf_counter()
+    ov.history.clear()
+    for tracker in ov.peak_trackers.values():
+        tracker.configure(None, None) # Rebuild from the new history on the next frame
+    kinematics = Kinematics()
+    for start in range(0, samples, batch):
+        rows = [motion_sample(now - duration + duration * i / samples) for i in range(start, min(start + batch, samples))]
+        columns = [array('d', column) for column in zip(*rows)]
+        ov.history.extend(columns + list(kinematics.extend(columns[0], *columns[2:])))
+        ov.history.evict(rows[-1][0]) # As update_ui would have, so raw stays bounded
+
+def counted(obj, name):
+    # Count calls to obj.name (instance attribute shadows the method)
+    calls = [0]
+    method = getattr(obj, name)
+    def wrapper(*args):
+        calls[0] += 1
+        return method(*args)
+    setattr(obj, name, wrapper)
+    return calls
+
+def poll_until(ov, done, timeout=5.0, period=0.0005):
+    # poll_once at ~period until done(); seconds taken, or None on timeout
+    t0 = time.perf_counter()
+    while not done():
+        if time.perf_counter() - t0 > timeout: return None
+        ov.poll_once()
+        time.sleep(period)
+    return time.perf_counter() - t0
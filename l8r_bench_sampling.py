@@ -0,0 +1,384 @@
+from array import array
+import asyncio
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import L8R_Velocity_Overlay as overlay
+import l8r_game
+import l8r_sample
+import l8r_telemetry
+import l8r_watch
+from l8r_bench_harness import counted, fmt_us, make_headless_overlay, make_sim, percentiles, poll_until
+from l8r_memory import MemoryReader, default_backend
+from l8r_record import RECORD_HEADER, SessionRecorder
+from l8r_sampling import RING_FIELDS, SampleRing
+
+# ==============================================================================
+#  BENCHMARKS: SAMPLING SIDE
+# ==============================================================================
+#
+# Polling, hand-off to the UI thread, recording, telemetry, the headless
+# sampler and the attach watcher: everything between the game and the ring.
+#
+#   python l8r_bench.py poll handoff record telemetry headless attach
+
+def bench_poll(seconds=2.0):
+    print("== Polling ==")
+    sim = make_sim()
+    ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+
+    # Unpaced: how fast can poll_once go, and what does each poll cost?
+    ov.poll_once() # attach + resolve
+    sim.syscalls = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        ov.poll_once()
+        latencies.append(time.perf_counter() - t0)
+    total = sum(latencies)
+    p = percentiles(latencies)
+    print(f"  unpaced: {len(latencies) / total:10.0f} polls/s, {sim.syscalls / len(latencies):.2f} reads/poll")
+    print(f"  latency: p50 {fmt_us(p[50])}  p90 {fmt_us(p[90])}  p99 {fmt_us(p[99])}  max {fmt_us(max(latencies))}")
+    print(f"  chain:   {ov.chain.stats()}")
+
+    # Paced: the real polling thread at 1 ms and 5 ms (fastest Settings values)
+    for rate_ms in (1, 5):
+        ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+        ov.thread_poll_rate = rate_ms
+        thread = threading.Thread(target=ov.polling_loop, daemon=True)
+        thread.start()
+        time.sleep(seconds)
+        ov.running = False
+        thread.join()
+        stamps = list(ov.ring.consume()[0])
+        if len(stamps) > 2:
+            intervals = [b - a for a, b in zip(stamps, stamps[1:])]
+            p = percentiles(intervals)
+            rate = (len(stamps) - 1) / (stamps[-1] - stamps[0])
+            print(f"  paced @{rate_ms} ms: {rate:8.1f} samples/s, interval p50 {fmt_us(p[50])}  "
+                  f"p99 {fmt_us(p[99])}  max {fmt_us(max(intervals))}")
+            st = ov.scheduler.stats()
+            print(f"             lateness mean {st['jitter_mean_ms'] * 1000:6.1f} us  p99 {st['jitter_p99_ms'] * 1000:6.1f} us"
+                  f"  missed {st['missed']}  spin margin {ov.scheduler.spin_margin * 1e6:.0f} us")
+
+def bench_handoff(samples=300000, frame=0.033):
+    # Producer pushes as fast as it can while a consumer drains once per UI frame
+    import queue
+    print("== Thread hand-off ==")
+
+    def run(push, drain):
+        done = threading.Event()
+        drained = [0]
+        frame_times = []
+
+        def consumer():
+            while not done.is_set():
+                time.sleep(frame)
+                t0 = time.perf_counter()
+                drained[0] += drain()
+                frame_times.append(time.perf_counter() - t0)
+
+        thread = threading.Thread(target=consumer, daemon=True)
+        thread.start()
+        t0 = time.perf_counter()
+        for i in range(samples):
+            push(i, 1.0, 2.0, 3.0, 4.0)
+        produce = time.perf_counter() - t0
+        done.set()
+        thread.join()
+        drained[0] += drain()
+        return produce / samples, max(frame_times) if frame_times else 0.0, drained[0]
+
+    q = queue.Queue()
+    def q_drain():
+        n = 0
+        while not q.empty():
+            try:
+                q.get_nowait()
+                n += 1
+            except queue.Empty:
+                break
+        return n
+    per, worst, n = run(lambda *v: q.put(v), q_drain)
+    print(f"  queue.Queue : {per * 1e6:6.2f} us/sample producer, worst drain {worst * 1000:7.2f} ms, {n} delivered")
+
+    ring = SampleRing(overlay.SAMPLE_RING_CAPACITY)
+    per, worst, n = run(ring.push, lambda: len(ring.consume()[0]))
+    print(f"  SampleRing  : {per * 1e6:6.2f} us/sample producer, worst drain {worst * 1000:7.2f} ms, "
+          f"{n} delivered, {ring.dropped} dropped")
+
+def bench_record(seconds=2.0, rate_ms=1):
+    # Paced polling at 1 kHz with and without a recorder on the polling thread
+    print(f"== Session recording (paced @{rate_ms} ms) ==")
+    sim = make_sim()
+    with tempfile.TemporaryDirectory() as tmp:
+        for recording in (False, True):
+            ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+            ov.thread_poll_rate = rate_ms
+            ov.poll_once() # attach + resolve before timing
+            if recording:
+                ov.recorder = SessionRecorder(os.path.join(tmp, "bench.l8r"))
+                ov.record_wanted = True
+            thread = threading.Thread(target=ov.polling_loop, daemon=True)
+            thread.start()
+            time.sleep(seconds)
+            ov.running = False
+            thread.join()
+            st = ov.scheduler.stats()
+            line = (f"  {'recording' if recording else 'off      '}: {st['rate_hz']:7.1f} Hz, lateness mean "
+                    f"{st['jitter_mean_ms'] * 1000:6.1f} us  p99 {st['jitter_p99_ms'] * 1000:6.1f} us  missed {st['missed']}")
+            if recording:
+                recorder = ov.recorder
+                recorder.close()
+                recorder.join()
+                size = os.path.getsize(recorder.path)
+                per = (size - RECORD_HEADER.size) / max(recorder.records, 1)
+                line += f"  | {recorder.records} samples, {size / 1024:.0f} KB, {per:.1f} B/sample"
+            print(line)
+
+class TelemetryClients:
+    # `count` WebSocket subscribers on their own asyncio thread, timing each
+    # message against the sample times it carries (same perf_counter clock)
+    def __init__(self, port, count):
+        self.port = port
+        self.count = count
+        self.newest = [] # Receive time - newest sample time, per message
+        self.oldest = [] # ... - oldest sample time (batching delay included)
+        self.received = [0] * count
+        self.connected = threading.Semaphore(0)
+        self.loop = None
+        self.thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True)
+        self.thread.start()
+        for _ in range(count):
+            self.connected.acquire()
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop = asyncio.Event()
+        tasks = [asyncio.create_task(self._client(i)) for i in range(self.count)]
+        await self.stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _client(self, i):
+        reader, writer, hello = await l8r_telemetry.connect("127.0.0.1", self.port)
+        self.connected.release()
+        header, record = l8r_telemetry.TELEMETRY_HEADER, l8r_telemetry.TELEMETRY_RECORD
+        try:
+            while True:
+                opcode, payload = await l8r_telemetry.ws_read(reader)
+                now = time.perf_counter()
+                n = header.unpack_from(payload)[3]
+                self.received[i] += n
+                if n:
+                    self.oldest.append(now - record.unpack_from(payload, header.size)[0])
+                    self.newest.append(now - record.unpack_from(payload, header.size + (n - 1) * record.size)[0])
+        finally:
+            writer.close()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.stop.set)
+        self.thread.join(2.0)
+
+def stalled_client(port):
+    # Handshakes, then never reads: the server must not buffer for it without bound
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    return sock
+
+def bench_telemetry(seconds=2.0, rate_ms=1, clients=32, burst=500):
+    # Paced 1 kHz polling with no server, then with `clients` subscribers;
+    # then fan-out throughput with the ring fed in bursts and one more
+    # subscriber that never reads
+    print(f"== Telemetry stream (paced @{rate_ms} ms, {clients} subscribers) ==")
+    sim = make_sim()
+    for streaming in (False, True):
+        ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+        ov.thread_poll_rate = rate_ms
+        ov.poll_once() # attach + resolve before timing
+        if streaming:
+            server = l8r_telemetry.TelemetryServer(port=0)
+            server.start()
+            subscribers = TelemetryClients(server.port, clients)
+            ov.telemetry = server
+        thread = threading.Thread(target=ov.polling_loop, daemon=True)
+        thread.start()
+        time.sleep(seconds)
+        ov.running = False
+        thread.join()
+        st = ov.scheduler.stats()
+        print(f"  {'streaming' if streaming else 'off      '}: {st['rate_hz']:7.1f} Hz, lateness mean "
+              f"{st['jitter_mean_ms'] * 1000:6.1f} us  p99 {st['jitter_p99_ms'] * 1000:6.1f} us  missed {st['missed']}")
+    time.sleep(0.05) # Let the last tick go out
+    subscribers.close()
+    server.stop()
+    newest, oldest = percentiles(subscribers.newest), percentiles(subscribers.oldest)
+    print(f"  latency sample -> subscriber: newest p50 {newest[50] * 1000:5.2f} ms  p99 {newest[99] * 1000:5.2f} ms | "
+          f"oldest in batch p50 {oldest[50] * 1000:5.2f} ms  p99 {oldest[99] * 1000:5.2f} ms")
+    print(f"  delivered {min(subscribers.received)}-{max(subscribers.received)} samples per subscriber "
+          f"({sum(subscribers.received) / max(len(subscribers.newest), 1):.1f} per message)")
+
+    # Fan-out throughput: bursts straight into the server's ring, as a replay at max speed would
+    server = l8r_telemetry.TelemetryServer(port=0)
+    server.start()
+    subscribers = TelemetryClients(server.port, clients)
+    stalled = stalled_client(server.port)
+    columns = tuple(array('d', [float(i)] * burst) for i in range(len(RING_FIELDS)))
+    pushed = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        columns[0][:] = array('d', [time.perf_counter()] * burst)
+        server.ring.extend(columns)
+        pushed += burst
+        time.sleep(rate_ms / 1000.0)
+    time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+    stats = server.stats()
+    buffered = max(c.writer.transport.get_write_buffer_size() for c in list(server.clients))
+    subscribers.close()
+    stalled.close()
+    server.stop()
+    total = sum(subscribers.received)
+    size = l8r_telemetry.TELEMETRY_RECORD.size
+    print(f"  fan-out: {pushed / elapsed / 1000:7.1f} k samples/s in, {total / elapsed / 1e6:6.2f} M samples/s out "
+          f"({total * size / elapsed / (1 << 20):.0f} MB/s over {clients} clients), "
+          f"server ring dropped {stats['ring_dropped']}")
+    print(f"  stalled subscriber: {stats['dropped']} samples skipped, largest transport buffer {buffered / 1024:.0f} KB "
+          f"(limit {l8r_telemetry.TELEMETRY_HIGH_WATER // 1024} KB + one message)")
+
+IMPORT_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0, "tkinter" in sys.modules, "numpy" in sys.modules)
+"""
+
+def import_cost(module, runs=5):
+    # Median import time in a fresh interpreter, and whether tkinter / numpy came along
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)], cwd=here,
+                             capture_output=True, text=True, check=True).stdout.split()
+        results.append((float(out[0]), out[1] == "True", out[2] == "True"))
+    results.sort()
+    return results[runs // 2]
+
+def bench_headless(seconds=2.0):
+    # l8r_sample.py vs. the overlay's polling path: startup to first sample
+    # and the fastest sustainable rate
+    print("== Headless sampler vs. overlay ==")
+    sim = make_sim()
+    for label, module in (("overlay", "L8R_Velocity_Overlay"), ("headless", "l8r_sample")):
+        imported, tk_loaded, np_loaded = import_cost(module)
+        if module == "l8r_sample":
+            sampler = l8r_sample.HeadlessSampler(MemoryReader(sim, scan_workers=1),
+                                                 l8r_sample.SampleWriter(io.BytesIO()), 0.0)
+            t0 = time.perf_counter()
+            sampler.run(count=1)
+        else:
+            ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+            t0 = time.perf_counter()
+            while not ov.ring.pending():
+                ov.poll_once()
+        first = time.perf_counter() - t0
+        print(f"  {label:8s}: import {imported * 1000:6.1f} ms (tkinter {'yes' if tk_loaded else 'no'}, "
+              f"numpy {'yes' if np_loaded else 'no'}), attach -> first sample {first * 1000:5.2f} ms")
+    print("           (the overlay also builds its Tk window before the first poll; not measurable without a display)")
+
+    # Unpaced: the overlay's poll_once (its polling thread never goes below 1 ms)
+    ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+    ov.poll_once()
+    polls = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for _ in range(1000):
+            ov.poll_once()
+        polls += 1000
+        ov.ring.consume()
+    print(f"  {'overlay poll_once, unpaced':34s}: {polls / (time.perf_counter() - t0):9.0f} samples/s (paced minimum 1 ms = 1 kHz)")
+
+    for fmt, derived in (("bin", False), ("csv", False), ("ndjson", False), ("ndjson", True)):
+        with open(os.devnull, "wb", buffering=l8r_sample.OUTPUT_BUFFER) as out:
+            writer = l8r_sample.SampleWriter(out, fmt, derived, time.perf_counter())
+            sampler = l8r_sample.HeadlessSampler(MemoryReader(sim, scan_workers=1), writer, 0.0, "ema" if derived else None)
+            writer.begin()
+            sampler.run(count=1) # attach + resolve
+            t0 = time.perf_counter()
+            sampler.run(duration=seconds)
+            rate = (sampler.samples - 1) / (time.perf_counter() - t0)
+        label = f"headless {fmt}{' --derived' if derived else ''}, unpaced"
+        print(f"  {label:34s}: {rate:9.0f} samples/s")
+
+    # Paced well past the overlay's limit
+    for rate_ms in (0.1, 0.05):
+        with open(os.devnull, "wb", buffering=l8r_sample.OUTPUT_BUFFER) as out:
+            sampler = l8r_sample.HeadlessSampler(MemoryReader(sim, scan_workers=1),
+                                                 l8r_sample.SampleWriter(out, "ndjson"), rate_ms / 1000.0)
+            sampler.run(count=1)
+            sampler.run(duration=seconds)
+        st = sampler.scheduler.stats()
+        print(f"  {f'headless ndjson, paced @{rate_ms:g} ms':34s}: {st['rate_hz']:9.0f} samples/s, lateness p99 "
+              f"{st['jitter_p99_ms'] * 1000:6.1f} us, missed {st['missed']}")
+
+def bench_attach(seconds=2.0):
+    # What the polling thread spends on finding the game, and how quickly it
+    # notices the game closing and coming back
+    print("== Attach watcher ==")
+    try:
+        backend = default_backend()
+        backend.find_process(l8r_game.PROCESS_NAME)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            backend.find_process(l8r_game.PROCESS_NAME)
+        walk = (time.perf_counter() - t0) / 20
+        print(f"  process list walk on this machine: {walk * 1000:.2f} ms -> searching on every 1 ms poll "
+              f"(before) would be {min(walk / 0.001, 1.0) * 100:.0f}% of the polling thread")
+    except OSError as e:
+        print(f"  process list walk: not measurable here ({e})")
+
+    sim = make_sim()
+    sim.exit()
+    searches = counted(sim, "find_process")
+    lookups = counted(sim, "find_module")
+    ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        ov.poll_once()
+        time.sleep(0.001)
+    print(f"  game closed for {seconds:g} s: {searches[0]} process searches (backoff "
+          f"{l8r_watch.ATTACH_BACKOFF_MIN * 1000:g} ms -> {l8r_watch.ATTACH_BACKOFF_MAX * 1000:g} ms)")
+
+    sim.restart()
+    dt = poll_until(ov, ov.ring.pending)
+    print(f"  game started: first sample after {dt * 1000:.1f} ms (up to one {l8r_watch.ATTACH_BACKOFF_MAX * 1000:g} ms backoff)")
+    searches[0] = lookups[0] = 0
+    t0 = time.perf_counter()
+    polls = 0
+    while time.perf_counter() - t0 < seconds:
+        ov.poll_once()
+        polls += 1
+    ov.ring.consume()
+    print(f"  attached, {polls} polls: {searches[0]} process searches, {lookups[0]} module lookups")
+
+    for gap in (0.0, 0.05, 1.0):
+        sim.exit()
+        dt = poll_until(ov, lambda: not ov.attached)
+        print(f"  game closed: detached after {dt * 1000:6.2f} ms", end="")
+        poll_until(ov, lambda: False, timeout=gap)
+        ov.ring.consume()
+        sim.restart()
+        dt = poll_until(ov, ov.ring.pending)
+        print(f"; relaunched {gap * 1000:4.0f} ms later: sampling after {dt * 1000:6.2f} ms [{ov.status_msg}]")
+    ov.watcher.stop()
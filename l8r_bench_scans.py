@@ -0,0 +1,202 @@
+import os
+import tempfile
+import time
+
+import l8r_game
+import l8r_pointers
+import l8r_values
+from l8r_bench_harness import make_headless_overlay, make_sim, percentiles
+from l8r_memory import MemoryReader
+from l8r_scan import ParallelSignatureScanner
+from l8r_sim import SIM_HEAP_BASE, SimGame, skate_motion
+
+# ==============================================================================
+#  BENCHMARKS: SCANNERS
+# ==============================================================================
+#
+# Signature scans, pointer scans and value scans on big simulated heaps.
+#
+#   python l8r_bench.py scan pointers values
+
+def bench_scan():
+    print("== Signature scan ==")
+    sim = make_sim()
+    size = len(sim.module)
+    print(f"  module {size / (1 << 20):.0f} MB, signature {sim.signature}, {os.cpu_count()} CPU(s)")
+    # Same image, same signatures: in-process vs a pool of N workers. "cold"
+    # includes starting the pool (what the first attach pays), "warm" reuses
+    # it; "miss" is a signature that isn't there, so the whole image is read.
+    # warm and miss are medians of 5.
+    missing = sim.signature.replace("4C 38", "4C 39", 1)
+    mem = MemoryReader(sim, scan_workers=1)
+    mem.attach(sim.process_name)
+    counts = sorted({1, 2, os.cpu_count() or 1})
+    for workers in counts:
+        label = "in-process" if workers == 1 else f"{workers} workers"
+        scanner = ParallelSignatureScanner(workers)
+        times = {}
+        for case, patterns, repeats in (("cold", [sim.signature], 1), ("warm", [sim.signature], 5), ("miss", [missing], 5)):
+            runs = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                hits = scanner.scan(mem, sim.module_base, size, patterns)
+                runs.append(time.perf_counter() - t0)
+                if case != "miss": assert hits[sim.signature] == [sim.root_addr - sim.signature_offset]
+            times[case] = percentiles(runs, (50,))[50]
+        scanner.close()
+        print(f"  {label:10s}: cold {times['cold'] * 1000:8.2f} ms  warm {times['warm'] * 1000:8.2f} ms  "
+              f"miss {times['miss'] * 1000:8.2f} ms  ({size / (1 << 20) / times['miss']:6.1f} MB/s)")
+    mem.close()
+    auto = ParallelSignatureScanner(l8r_game.SCAN_WORKERS)
+    print(f"  SCAN_WORKERS = {l8r_game.SCAN_WORKERS} scans this module {'with workers' if auto.use_pool(size) else 'in-process'}")
+
+    # Attach -> first sample, signature configured, with and without the disk cache
+    saved = l8r_game.VELOCITY_SIGNATURE, l8r_game.VELOCITY_SIG_OFFSET
+    l8r_game.VELOCITY_SIGNATURE, l8r_game.VELOCITY_SIG_OFFSET = sim.signature, sim.signature_offset
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = os.path.join(tmp, "signature_cache.json")
+            for label in ("first start", "cached start"):
+                ov = make_headless_overlay(MemoryReader(sim, scan_workers=1, signature_cache_file=cache_file))
+                t0 = time.perf_counter()
+                while not ov.ring.pending():
+                    ov.poll_once()
+                dt = time.perf_counter() - t0
+                print(f"  attach -> first sample ({label}): {dt * 1000:8.2f} ms  [{ov.status_msg}]")
+    finally:
+        l8r_game.VELOCITY_SIGNATURE, l8r_game.VELOCITY_SIG_OFFSET = saved
+
+def map_decoys(sim, size, density, targets, base):
+    # Pointer-dense decoy memory: `density` of the slots point at random
+    # 8-aligned addresses in [lo, hi) ranges from `targets`, the rest is junk
+    np = l8r_pointers.np
+    rng = np.random.default_rng(base)
+    words = rng.integers(0, 1 << 63, size // 8, dtype=np.uint64) | np.uint64(1) # Odd: never a pointer
+    picks = np.flatnonzero(rng.random(len(words)) < density)
+    ranges = np.array(targets, dtype=np.uint64)
+    which = rng.integers(0, len(ranges), len(picks))
+    spans = (ranges[which, 1] - ranges[which, 0]) // np.uint64(8)
+    words[picks] = ranges[which, 0] + (rng.integers(0, 1 << 62, len(picks), dtype=np.uint64) % spans) * np.uint64(8)
+    sim.map_region(base, words.view(np.uint8))
+    return len(picks)
+
+def bench_pointers(bulk_mb=512, clutter_mb=16):
+    # Pointer scan after a simulated game update: the root pointer moved and
+    # the signature is gone, so the configured chain no longer links. The sim
+    # gets a big pointer-dense heap: `bulk` only points into itself (snapshot
+    # and map cost); `clutter` points into itself and the sim heap, so the
+    # backward search has to wade through it.
+    print("== Pointer scan ==")
+    if l8r_pointers.np is None:
+        print("  skipped: needs numpy")
+        return
+    import tracemalloc
+    sim = SimGame(l8r_game.BASE_OFFSET + 0x2340, l8r_game.POINTER_OFFSETS, l8r_game.PLAYER_FIELDS, signature=None)
+    bulk_base, clutter_base = 0x20000000000, 0x1D800000000
+    heap = (SIM_HEAP_BASE, SIM_HEAP_BASE + sim.heap_size)
+    clutter = (clutter_base, clutter_base + (clutter_mb << 20))
+    map_decoys(sim, bulk_mb << 20, 1 / 4, [(bulk_base, bulk_base + (bulk_mb << 20))], bulk_base)
+    map_decoys(sim, clutter_mb << 20, 1 / 8, [clutter] * 999 + [heap], clutter_base)
+    mem = MemoryReader(sim, scan_workers=1)
+    mem.attach(sim.process_name)
+    module_base, module_size = mem.get_module(l8r_game.BASE_MODULE)
+    total = sum(size for _, size, _ in mem.regions())
+    print(f"  process: {total / (1 << 20):.0f} MB readable in {len(mem.regions())} regions")
+
+    for label, budget in (("full", l8r_pointers.POINTER_MAP_BUDGET), ("64 MB budget", 64 << 20)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        pmap = l8r_pointers.PointerMap.snapshot(mem, budget)
+        dt = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  snapshot ({label:12s}): {dt:6.2f} s  {pmap.scanned / (1 << 20) / dt:6.0f} MB/s  {len(pmap):9d} pointers  "
+              f"map {pmap.nbytes / (1 << 20):5.0f} MB ({pmap.nbytes / max(len(pmap), 1):.0f} B/ptr)  "
+              f"peak {peak / (1 << 20):5.0f} MB{'  TRUNCATED' if pmap.truncated else ''}")
+        if label == "full": full = pmap
+    pmap = full
+    del full
+
+    moved = (sim.root_addr - module_base, list(sim.pointer_offsets))
+    for workers in sorted({1, os.cpu_count() or 1}):
+        scanner = l8r_pointers.PointerScanner(workers)
+        try:
+            chains = scanner.search(pmap, sim.player_address, module_base, module_size)
+        finally:
+            scanner.close()
+        print(f"  search x{workers}: {scanner.last_duration:6.2f} s, frontier per level {scanner.level_sizes}, "
+              f"{len(chains)} chains")
+    if (os.cpu_count() or 1) == 1:
+        print("  (one CPU here: the pool split can't be timed)")
+    found = {(c["root"], tuple(c["offsets"])) for c in chains}
+    print(f"  the sim's own chain {l8r_pointers.format_chain({'root': moved[0], 'offsets': moved[1], 'checks': 0, 'hits': 0})}"
+          f" among them: {'yes' if (moved[0], tuple(moved[1])) in found else 'no (a shorter one reaches the same object)'}")
+
+    # Rank: a few respawns move every heap node; decoy chains stop resolving
+    l8r_pointers.rescan(mem, chains, module_base, sim.player_address)
+    for _ in range(3):
+        sim.respawn()
+        alive = l8r_pointers.rescan(mem, chains, module_base, sim.player_address)
+        print(f"  rescan after respawn: {alive} of {len(chains)} chains still reach the player")
+    chains.sort(key=l8r_game.chain_rank)
+    print("  best after rescans:")
+    for chain in chains[:3]:
+        print("    " + l8r_pointers.format_chain(chain))
+
+    # The overlay links through the saved chains
+    del pmap
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pointer_chains.json")
+        l8r_game.save_pointer_chains(path, chains)
+        ov = make_headless_overlay(MemoryReader(sim, scan_workers=1))
+        ov.chain = l8r_game.ChainCache(ov.mem, fallback_chains=l8r_game.load_fallback_chains(path))
+        t0 = time.perf_counter()
+        for _ in range(10):
+            ov.poll_once()
+            if ov.ring.pending(): break
+        dt = time.perf_counter() - t0
+    print(f"  overlay, saved chains: {'sampling' if ov.ring.pending() else 'NOT linked'} after {dt * 1000:.2f} ms [{ov.status_msg}]")
+
+def bench_values(heap_mb=512, churn=0.1):
+    # Relocating the velocity field with first/next scans: a sim with a big
+    # float heap where `churn` of the values change between scans
+    print("== Value scan ==")
+    np = l8r_values.np
+    if np is None:
+        print("  skipped: needs numpy")
+        return
+    now = [0.0]
+    sim = make_sim(clock=lambda: now[0])
+    rng = np.random.default_rng(7)
+    floats = (rng.standard_normal((heap_mb << 20) // 4) * 20.0).astype(np.float32)
+    sim.map_region(0x20000000000, floats.view(np.uint8))
+    mem = MemoryReader(sim, scan_workers=1)
+    mem.attach(sim.process_name)
+    scanner = l8r_values.ValueScanner(mem)
+
+    def step(seconds):
+        # Game time passes: the player moves, other values churn
+        now[0] += seconds
+        picks = rng.integers(0, len(floats), int(len(floats) * churn))
+        floats[picks] = rng.standard_normal(len(picks)).astype(np.float32) * 20.0
+
+    def show(label, count):
+        print(f"  {label:26s}: {scanner.last_duration:6.2f} s  {scanner.last_read / (1 << 20) / max(scanner.last_duration, 1e-9):7.0f} MB/s"
+              f"  {count:10d} candidates  kept {scanner.nbytes / (1 << 20):7.1f} MB")
+
+    vx = skate_motion(0.0)["vx"]
+    show(f"first exact {vx:.2f} (vx)", scanner.first("exact", vx, 0.01))
+    show("first unknown", scanner.first("unknown"))
+    step(0.2)
+    show("next changed", scanner.next("changed"))
+    step(0.2)
+    show("next changed", scanner.next("changed"))
+    step(0.2)
+    vx = skate_motion(now[0] - sim.t0)["vx"]
+    show(f"next exact {vx:.2f} (vx)", scanner.next("exact", vx, 0.01))
+    step(0.2)
+    show("next changed", scanner.next("changed"))
+    player = sim.player_address
+    found = [f"+0x{address - player:X}" for address, _ in scanner.candidates(5) if 0 <= address - player < 0x1000]
+    print(f"  left: {len(scanner)}, relative to the player object: {', '.join(found) or 'none'} "
+          f"(OFFSET_VELOCITY = 0x{l8r_game.OFFSET_VELOCITY:X})")
@@ -0,0 +1,222 @@
+import os
+import tempfile
+import time
+
+import l8r_graph
+import l8r_replay
+from l8r_bench_harness import (RecordingCanvas, fill_history, make_headless_overlay, make_sim, motion_sample,
+                               percentiles, push_motion)
+from l8r_history import HISTORY_FIELDS, HistoryBuffer
+from l8r_memory import MemoryReader
+from l8r_record import RECORD, RECORD_HEADER, RECORD_MAGIC, RECORD_VERSION
+from l8r_replay import Recording, ReplaySource, analyze
+
+# ==============================================================================
+#  BENCHMARKS: UI SIDE
+# ==============================================================================
+#
+# Frame time of the graphs and readouts against history length and span,
+# replaying recordings, and what the performance HUD itself costs.
+#
+#   python l8r_bench.py ui spans replay perf
+
+def bench_ui(lengths=(1000, 10000, 30000, 100000, 1000000), frames=20, use_tk=False, height=100):
+    print(f"== UI frame ({'numpy' if l8r_graph.np is not None else 'pure Python'} graph pipeline, {height} px graphs) ==")
+    root = None
+    canvas_factory = lambda: RecordingCanvas(height=height)
+    if use_tk:
+        import tkinter as tk
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            # No fallback: stub-canvas numbers would pass for real Tk frame times
+            print(f"  real Tk canvases unavailable ({e}): Tk frame times NOT measured")
+            return
+        canvas_factory = lambda: tk.Canvas(root, bg="black", width=240, height=height, highlightthickness=0)
+    ov = make_headless_overlay(None, canvas_factory=canvas_factory)
+    ov.graph_height.set(height)
+    if root is not None:
+        ov.photo_factory = tk.PhotoImage
+        for c in (ov.canvas_mag, ov.canvas_x, ov.canvas_y, ov.canvas_z):
+            c.pack()
+        root.update()
+    ov.status_msg = "Linked: bench"
+    canvases = (ov.canvas_mag, ov.canvas_x, ov.canvas_y, ov.canvas_z)
+    modes = ("items", "raster") if l8r_graph.RASTER_AVAILABLE else ("items",)
+    for mode in modes:
+        print(f"  {mode} renderer:")
+        ov.graph_raster.set(mode == "raster")
+        ov.reset_graphs()
+        for n in lengths:
+            fill_history(ov, n)
+            # Keep the graphs scrolling: each frame delivers 33 ms worth of new samples
+            dt = 30.0 / n
+            per_frame = max(1, round(0.033 / dt))
+            t_next = ov.history.last_time() + dt
+            ov.update_ui() # First frame creates the canvas items
+            for c in canvases:
+                if isinstance(c, RecordingCanvas): c.calls = 0
+            times = []
+            for _ in range(frames):
+                for _ in range(per_frame):
+                    push_motion(ov, t_next)
+                    t_next += dt
+                t0 = time.perf_counter()
+                ov.update_ui()
+                if root is not None: root.update_idletasks()
+                times.append(time.perf_counter() - t0)
+            calls = sum(c.calls for c in canvases if isinstance(c, RecordingCanvas)) / frames
+            p = percentiles(times)
+            # Frames with nothing new to show (UI stays up, game paused)
+            idle = []
+            for _ in range(frames):
+                t0 = time.perf_counter()
+                ov.update_ui()
+                idle.append(time.perf_counter() - t0)
+            extra = f", {calls:6.0f} canvas calls/frame" if not use_tk else ""
+            print(f"  {n:7d} samples: frame p50 {p[50] * 1000:8.2f} ms  max {max(times) * 1000:8.2f} ms{extra}"
+                  f"  | idle p50 {percentiles(idle)[50] * 1e6:6.1f} us")
+    if root is not None:
+        root.destroy()
+
+    # Storage for a full 30 s window at 1 ms
+    import tracemalloc
+    from collections import deque
+    n = 30000
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    width = len(HISTORY_FIELDS)
+    tuples = deque(tuple(float(i + k) for k in range(width)) for i in range(n))
+    as_tuples = tracemalloc.get_traced_memory()[0] - before
+    del tuples
+    before = tracemalloc.get_traced_memory()[0]
+    history = HistoryBuffer()
+    for i in range(n):
+        history.append(*(float(i + k) for k in range(width)))
+    as_columns = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  history of {n} samples: deque of tuples {as_tuples / n:6.1f} B/sample, "
+          f"HistoryBuffer {as_columns / n:6.1f} B/sample allocated ({len(history.fields) * 8} B live)")
+
+def bench_spans(session=3600.0, rate=1000, frames=20):
+    # Long session in the history pyramid, graphed over growing spans
+    print(f"== Graph spans ({session / 60:.0f} min session at {rate} Hz) ==")
+    ov = make_headless_overlay(None)
+    ov.status_msg = "Linked: bench"
+    t0 = time.perf_counter()
+    fill_history(ov, int(session * rate), duration=session)
+    fill = time.perf_counter() - t0
+    print(f"  fill: {fill:.1f} s ({fill / (session * rate) * 1e6:.2f} us/sample), "
+          f"history {ov.history.nbytes() / (1 << 20):.1f} MB")
+    dt = 1.0 / rate
+    t_next = ov.history.last_time() + dt
+    for label, span, whole in (("30 s", 30, False), ("5 min", 300, False), ("30 min", 1800, False), ("session", 30, True)):
+        ov.graph_span.set(span)
+        ov.graph_session.set(whole)
+        ov.update_ui() # Rebuilds the peaks for the new span
+        times = []
+        for _ in range(frames):
+            for _ in range(int(0.033 * rate)):
+                push_motion(ov, t_next)
+                t_next += dt
+            t0 = time.perf_counter()
+            ov.update_ui()
+            times.append(time.perf_counter() - t0)
+        view = ov.history.view(ov.graph_duration())
+        source = "raw samples" if view.bucket is None else f"{view.bucket:g} s buckets"
+        print(f"  {label:8s}: frame p50 {percentiles(times)[50] * 1000:7.2f} ms  max {max(times) * 1000:7.2f} ms  ({source})")
+
+def write_recording(path, samples, rate=1000, loop=60.0):
+    # A session file of `samples` at `rate` Hz: the scripted run, repeating every `loop` seconds
+    np = l8r_replay.np
+    pattern = np.array([[v for v in motion_sample(i / rate)[2:]] for i in range(int(loop * rate))], dtype=np.float32)
+    with open(path, "wb") as f:
+        f.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, RECORD.size, 0, time.time(), 0.0))
+        for start in range(0, samples, len(pattern)):
+            n = min(len(pattern), samples - start)
+            rows = np.empty(n, dtype=l8r_replay.RECORD_DTYPE)
+            rows["t"] = (start + np.arange(n)) / rate
+            for j, name in enumerate(("vx", "vy", "vz")):
+                rows[name] = pattern[:n, j]
+            f.write(rows.tobytes())
+
+def bench_replay(samples=10000000, frames=60, polls_per_frame=33):
+    print(f"== Replay ({samples / 1e6:g}M samples, {samples * RECORD.size / 2 ** 20:.0f} MB recording) ==")
+    if l8r_replay.np is None:
+        print("  skipped: needs numpy to write the test recording")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.l8r")
+        write_recording(path, samples)
+        t0 = time.perf_counter()
+        recording = Recording(path)
+        print(f"  open:    {(time.perf_counter() - t0) * 1000:8.2f} ms")
+        t0 = time.perf_counter()
+        result = analyze(recording)
+        dt = time.perf_counter() - t0
+        print(f"  analyse: {dt:8.2f} s  ({samples / dt / 1e6:.1f} M samples/s, {len(result['peaks'])} peaks)")
+
+        # As fast as possible through poll_once -> ring -> update_ui (1 ms polls, ~30 fps)
+        ov = make_headless_overlay(None)
+        ov.replay = ReplaySource(recording, None)
+        ui_times = []
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            for _ in range(polls_per_frame):
+                ov.poll_once()
+            f0 = time.perf_counter()
+            ov.update_ui()
+            ui_times.append(time.perf_counter() - f0)
+        dt = time.perf_counter() - t0
+        p = percentiles(ui_times)
+        print(f"  replay @max: {ov.replay.index / dt / 1000:8.1f} k samples/s into the UI, "
+              f"frame p50 {p[50] * 1000:.2f} ms  max {max(ui_times) * 1000:.2f} ms, {ov.ring.dropped} dropped")
+        ov.replay = None
+        recording.close()
+
+def bench_perf(seconds=2.0, frames=60, samples=100000, block=200):
+    # Cost of the performance counters: the same overlay alternates between
+    # HUD off and on every `block` polls / every frame, so machine noise hits
+    # both alike
+    print("== Performance HUD overhead ==")
+    ov = make_headless_overlay(MemoryReader(make_sim(), scan_workers=1))
+    ov.show_perf.set(True)
+    ov.sync_perf()
+    monitor = ov.perf
+    ov.poll_once() # attach + resolve
+    spent = {None: 0.0, monitor: 0.0}
+    polls = {None: 0, monitor: 0}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for perf in (None, monitor):
+            ov.perf = perf
+            t0 = time.perf_counter()
+            for _ in range(block):
+                ov.poll_once()
+            spent[perf] += time.perf_counter() - t0
+            polls[perf] += block
+    poll_off, poll_on = (spent[p] / polls[p] for p in (None, monitor))
+
+    ov.status_msg = "Linked: bench"
+    fill_history(ov, samples)
+    dt = 30.0 / samples
+    t_next = ov.history.last_time() + dt
+    ov.update_ui()
+    times = {None: [], monitor: []}
+    for i in range(2 * frames):
+        for _ in range(round(0.033 / dt)):
+            push_motion(ov, t_next)
+            t_next += dt
+        ov.perf = perf = monitor if i % 2 else None
+        t0 = time.perf_counter()
+        ov.update_ui()
+        times[perf].append(time.perf_counter() - t0)
+    ui_off, ui_on = (percentiles(times[p])[50] for p in (None, monitor))
+    print(f"  HUD off: poll {poll_off * 1e6:7.2f} us, UI frame p50 {ui_off * 1000:6.2f} ms")
+    print(f"  HUD on : poll {poll_on * 1e6:7.2f} us, UI frame p50 {ui_on * 1000:6.2f} ms")
+    ov.report_perf(time.perf_counter())
+    print(f"  HUD row: {ov.label_perf.options.get('text')}")
+    # At the fastest poll rate (1 ms) and 30 fps, as a share of one core
+    load = (poll_on - poll_off) * 1000 + (ui_on - ui_off) * 30
+    print(f"  overhead: poll {poll_on - poll_off:+.2e} s, UI frame {ui_on - ui_off:+.2e} s, "
+          f"{load:+.2%} of a core at 1 kHz polling / 30 fps")
@@ -0,0 +1,226 @@
+import json
+import os
+import time
+
+# ==============================================================================
+#  GAME LAYOUT AND POINTER CHAIN
+# ==============================================================================
+#
+# Where the velocity lives in l8rsk8r.exe, and ChainCache, which finds it.
+# Kept apart from the overlay (no tkinter here) so the headless sampler
+# (l8r_sample.py) and the benchmarks link to the game the same way.
+
+# --- Configuration ------------------------------------------------------------
+
+PROCESS_NAME = "l8rsk8r.exe"
+BASE_MODULE = "UnityPlayer.dll" 
+
+# Fallback Static Pointer (May not work on all PCs)
+BASE_OFFSET = 0x01C67AE8
+POINTER_OFFSETS = [0x100, 0xD0, 0x8, 0x48, 0x288, 0x0] 
+
+# AOB Signature Scanning (Preferred)
+# Set VELOCITY_SIGNATURE to a unique byte pattern found in Cheat Engine.
+# Example: "48 8B 05 ?? ?? ?? ?? 48 8B 88"
+# Use '??' for wildcards.
+VELOCITY_SIGNATURE = None 
+VELOCITY_SIG_OFFSET = 0x0 # Offset from the signature match to the pointer
+# Processes used for signature scans: 0 picks by module size and CPU count
+# (see ParallelSignatureScanner in l8r_scan.py), 1 always scans in-process,
+# N always uses N workers. `python l8r_bench.py scan` compares them.
+SCAN_WORKERS = 0
+# Scan hits are remembered per game build here (set to None to always rescan)
+SIGNATURE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "signature_cache.json")
+# Chains found by the pointer scanner (l8r_pointers.py), tried best first when
+# the static chain and the signature both fail (set to None to ignore)
+POINTER_CHAINS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pointer_chains.json")
+MAX_FALLBACK_CHAINS = 16 # Saved chains tried per resolve
+
+OFFSET_VELOCITY = 0x24C
+OFFSET_GRAVITY = 0x27C
+
+# Player object layout: (name, offset, struct type code).
+# Fields are coalesced into as few reads as possible, so adding more here
+# (position, grounded flag, ...) costs no extra ReadProcessMemory calls.
+PLAYER_FIELDS = [
+    ("vx", OFFSET_VELOCITY, 'f'),
+    ("vy", OFFSET_GRAVITY, 'f'),
+    ("vz", OFFSET_VELOCITY + 8, 'f'),
+]
+
+MAX_SPEED = 100000 # m/s; faster than this is garbage from a stale chain
+
+# --- Saved pointer chains --------------------------------------------------------
+#
+# pointer_chains.json holds the pointer scanner's candidates for one module:
+#   {"module": "UnityPlayer.dll", "chains": [{"root": "0x1C67AE8",
+#    "offsets": ["0x100", ...], "checks": 5, "hits": 5}, ...]}
+# root is relative to the module base; checks/hits count rescans and how
+# many of them the chain survived.
+
+def chain_rank(chain):
+    # Survived the most rescans, then failed the fewest, then shortest, then smallest offsets
+    return (-chain["hits"], chain["checks"] - chain["hits"], len(chain["offsets"]), sum(chain["offsets"]))
+
+def load_pointer_chains(path, module_name=BASE_MODULE):
+    # Best first; [] if the file is missing, unreadable or for another module
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("module", "").lower() != module_name.lower(): return []
+        chains = [{"root": int(c["root"], 16), "offsets": [int(o, 16) for o in c["offsets"]],
+                   "checks": int(c.get("checks", 0)), "hits": int(c.get("hits", 0))} for c in data["chains"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return []
+    return sorted(chains, key=chain_rank)
+
+def save_pointer_chains(path, chains, module_name=BASE_MODULE):
+    data = {"module": module_name, "chains": [
+        {"root": f"0x{c['root']:X}", "offsets": [f"0x{o:X}" for o in c["offsets"]],
+         "checks": c["checks"], "hits": c["hits"]} for c in sorted(chains, key=chain_rank)]}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+def load_fallback_chains(path=POINTER_CHAINS_FILE):
+    # (root offset, offsets) for ChainCache: the best saved chains that haven't only ever failed
+    if not path: return []
+    chains = [c for c in load_pointer_chains(path) if c["hits"] or not c["checks"]]
+    return [(c["root"], c["offsets"]) for c in chains[:MAX_FALLBACK_CHAINS]]
+
+# ------------------------------------------------------------------------------
+
+class ChainCache:
+    # Keeps the module base and the resolved player address between polls so the
+    # hot loop does one root pointer read instead of a module walk + full chain.
+    # The value of the root pointer acts as a generation tag: if the game swaps
+    # the object it points at, the tag changes and the chain is walked again.
+    def __init__(self, mem, max_age=1.0, fallback_chains=()):
+        self.mem = mem
+        self.fallback_chains = list(fallback_chains) # [(root offset, offsets)] from load_fallback_chains()
+        self.fallback = None # Index of the fallback chain currently linked
+        self.fallback_next = 0 # Where the next fallback attempt starts
+        self.offsets = POINTER_OFFSETS # Of the chain currently linked
+        self.max_age = max_age # Full re-walk at least this often (seconds)
+        self.hits = 0
+        self.misses = 0
+        self.breaks = 0 # Cached chain was valid once and then failed validation
+        self.relinks = 0 # ... the same, since the current process was attached
+        self.scans = 0
+        self.last_scan = 0.0 # Seconds the most recent signature scan took
+        self.status = "Resolving chain..."
+        self.reset()
+
+    def new_process(self):
+        # New process: start from scratch and count its re-links from zero
+        # (breaks stays a running total for the perf counters)
+        self.relinks = 0
+        self.reset()
+
+    def reset(self):
+        # Forget everything, including the module base (new process / re-attach)
+        self.module_base = 0
+        self.module_size = 0
+        self.sig_addr = None
+        self.invalidate()
+
+    def invalidate(self):
+        self.root_addr = 0
+        self.root_value = 0
+        self.player_address = 0
+        self.resolved_at = 0.0
+
+    def discard(self, was_linked=False):
+        # Caller found the linked object unusable (bad read, garbage values).
+        # A re-walk that stopped resolving has already cleared player_address,
+        # so get() says whether a chain was linked before it looked.
+        if was_linked or self.player_address:
+            self.breaks += 1
+            self.relinks += 1
+        if self.fallback is not None:
+            self.fallback_next = self.fallback + 1 # Give the next saved chain a turn
+        self.invalidate()
+
+    def get(self, now=None):
+        if now is None: now = time.perf_counter()
+        if self.player_address:
+            if now - self.resolved_at < self.max_age:
+                root = self.mem.read_ptr(self.root_addr)
+                if root and root == self.root_value:
+                    self.hits += 1
+                    return self.player_address
+            else:
+                # Periodic full re-walk catches swaps deeper in the chain
+                old = self.player_address
+                if self.link(self.root_addr, self.offsets, self.fallback) == old:
+                    self.resolved_at = now
+                    self.hits += 1
+                    return old
+            self.discard(was_linked=True)
+
+        self.misses += 1
+        if self.resolve():
+            self.resolved_at = now
+        return self.player_address
+
+    def resolve(self):
+        if not self.module_base:
+            self.module_base, self.module_size = self.mem.get_module(BASE_MODULE)
+            if not self.module_base:
+                self.status = f"Waiting for {BASE_MODULE}..."
+                return 0
+
+        if VELOCITY_SIGNATURE:
+            # Try Signature Scan (only once per module load)
+            if self.sig_addr is None:
+                t0 = time.perf_counter()
+                self.sig_addr = self.mem.scan_pattern(BASE_MODULE, VELOCITY_SIGNATURE) or 0
+                self.last_scan = time.perf_counter() - t0
+                self.scans += 1
+            if self.sig_addr:
+                if self.link(self.sig_addr + VELOCITY_SIG_OFFSET):
+                    self.status = f"Linked (AOB): {hex(self.player_address).upper()}"
+                else:
+                    self.status = "AOB Found, resolving chain..."
+            else:
+                # Fallback to static
+                if self.link(self.module_base + BASE_OFFSET):
+                    self.status = f"Linked (Static): {hex(self.player_address).upper()}"
+                else:
+                    self.status = "Scanning AOB..."
+        else:
+            # Use Static Pointer
+            if self.link(self.module_base + BASE_OFFSET):
+                self.status = f"Linked: {hex(self.player_address).upper()}"
+            else:
+                self.status = "Resolving chain..."
+        if not self.player_address and self.fallback_chains:
+            self.link_fallback()
+        return self.player_address
+
+    def link_fallback(self):
+        # Saved pointer-scan chains, best first, starting after the last one that went bad
+        n = len(self.fallback_chains)
+        for k in range(n):
+            i = (self.fallback_next + k) % n
+            root, offsets = self.fallback_chains[i]
+            if self.link(self.module_base + root, offsets, i):
+                self.status = f"Linked (pointer scan #{i + 1}): {hex(self.player_address).upper()}"
+                return self.player_address
+        return 0
+
+    def link(self, root_addr, offsets=None, fallback=None):
+        offsets = POINTER_OFFSETS if offsets is None else offsets
+        self.player_address = self.mem.resolve_chain(root_addr, offsets)
+        if self.player_address:
+            self.fallback = fallback
+            self.root_addr = root_addr
+            self.root_value = self.mem.read_ptr(root_addr)
+            self.offsets = offsets
+        return self.player_address
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100.0) if total else 0.0
+        return f"chain {rate:.1f}% hit, {self.misses} resolves, {self.breaks} breaks"
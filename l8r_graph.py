@@ -0,0 +1,422 @@
+import math
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; the pure-Python path below is slower but equivalent
+    np = None
+
+# ==============================================================================
+#  GRAPH PIPELINE
+# ==============================================================================
+#
+# Turns the history columns into what a graph canvas actually draws. The
+# canvas is only ~240 px wide, so the visible window is cut into one bucket
+# per pixel column. Each bucket contributes its min and its max, in the order
+# they were reached, so a one-sample spike still shows up. Axis bounds come
+# from the bucket extremes. The polyline is at most 2 points per column
+# however many samples are in the window.
+#
+# Columns are fixed in time: column k holds the samples with
+# floor(t / step) == k, step = duration / width, and the graph scrolls by
+# sliding them left. A column never changes once time has moved past it, so
+# PixelColumns keeps them from one frame to the next: a frame folds in only
+# the samples appended since the last one (HistoryBuffer.appended) and drops
+# the columns that scrolled out. That costs the new samples plus the pixel
+# width, however many samples the window holds. A new span, width or source
+# (another tier, a cleared buffer) rebuilds the columns once.
+#
+# GraphFrame is built once per UI frame and shared by all the graphs. The
+# caller passes in the same `columns` dict every frame; that is where the
+# PixelColumns live.
+#
+# It reads a HistoryView (l8r_history.py): raw samples, where low and high
+# are the same column, or an aggregate tier, where each row already carries
+# a min and a max. Long spans come from coarse tiers, so even a rebuild
+# stays bounded by the pixel width, not by the session length.
+
+class PixelColumns:
+    # Min/max per pixel column of one series, kept between frames
+    def __init__(self):
+        self.source = None # (buffer, epoch, step) the columns were built from
+        self.done = 0 # buffer.appended when they were last brought up to date
+        self.keys = [] # Column numbers, ascending
+        self.mins = []
+        self.maxs = []
+        self.firsts = [] # Low of each column's first and last row: which extreme is drawn first
+        self.lasts = []
+
+    def update(self, view, index, step, start_time):
+        buffer = view.buffer
+        times = view.times
+        first_key = math.floor(start_time / step)
+        oldest = first_key * step
+        if self.source != (buffer, buffer.epoch, step):
+            self.source = (buffer, buffer.epoch, step)
+            self.keys, self.mins, self.maxs, self.firsts, self.lasts = [], [], [], [], []
+            a = bisect_left(times, oldest)
+        else:
+            a = max(len(times) - (buffer.appended - self.done), 0)
+            if a < len(times) and times[a] < oldest:
+                a = bisect_left(times, oldest, a)
+        self.done = buffer.appended
+
+        drop = bisect_left(self.keys, first_key) # Scrolled out
+        if drop:
+            for column in (self.keys, self.mins, self.maxs, self.firsts, self.lasts):
+                del column[:drop]
+        if a < len(times):
+            low, high = view.range(index)
+            if np is not None:
+                self._fold_np(times, low, high, a, step)
+            else:
+                self._fold_py(times, low, high, a, step)
+
+    def _fold_np(self, times, low, high, a, step):
+        t = np.frombuffer(times, dtype=np.float64)[a:]
+        lo = np.frombuffer(low, dtype=np.float64)[a:]
+        hi = lo if high is low else np.frombuffer(high, dtype=np.float64)[a:]
+        key = np.floor(t / step)
+        starts = np.flatnonzero(np.diff(key, prepend=-np.inf))
+        ends = np.append(starts[1:], len(t)) - 1
+        keys = key[starts].astype(np.int64).tolist()
+        mins = np.minimum.reduceat(lo, starts).tolist()
+        maxs = np.maximum.reduceat(hi, starts).tolist()
+        firsts = lo[starts].tolist()
+        lasts = lo[ends].tolist()
+        if self.keys and self.keys[-1] == keys[0]:
+            # The newest column was still filling up last frame
+            self.mins[-1] = min(self.mins[-1], mins[0])
+            self.maxs[-1] = max(self.maxs[-1], maxs[0])
+            self.lasts[-1] = lasts[0]
+            keys, mins, maxs, firsts, lasts = keys[1:], mins[1:], maxs[1:], firsts[1:], lasts[1:]
+        self.keys += keys
+        self.mins += mins
+        self.maxs += maxs
+        self.firsts += firsts
+        self.lasts += lasts
+
+    def _fold_py(self, times, low, high, a, step):
+        keys, mins, maxs, firsts, lasts = self.keys, self.mins, self.maxs, self.firsts, self.lasts
+        for i in range(a, len(times)):
+            key = math.floor(times[i] / step)
+            lo, hi = low[i], high[i]
+            if keys and keys[-1] == key:
+                if lo < mins[-1]: mins[-1] = lo
+                if hi > maxs[-1]: maxs[-1] = hi
+                lasts[-1] = lo
+            else:
+                keys.append(key)
+                mins.append(lo)
+                maxs.append(hi)
+                firsts.append(lo)
+                lasts.append(lo)
+
+class GraphFrame:
+    def __init__(self, view, duration, columns=None):
+        self.view = view
+        self.duration = duration
+        self.times = view.times
+        self.now = view.now if view.now is not None else 0.0
+        self.start_time = self.now - duration
+        self.first = bisect_left(self.times, self.start_time) # First visible row
+        self.columns = {} if columns is None else columns # (index, width) -> PixelColumns, kept by the caller
+
+    def to_x(self, t, width):
+        return (t - self.start_time) / self.duration * width
+
+    def series(self, index, width):
+        # (min, max, xs, values) for the visible window, at most 2 points per pixel column
+        low, high = self.view.range(index)
+        visible = len(self.times) - self.first
+        if visible <= 0:
+            return 0.0, 0.0, [], []
+        if visible <= 2 * width and high is low:
+            # Few enough to draw every sample
+            if np is not None:
+                return self._samples_np(low, width)
+            return self._samples_py(low, width)
+
+        columns = self.columns.get((index, width))
+        if columns is None:
+            columns = self.columns[(index, width)] = PixelColumns()
+        step = self.duration / width
+        columns.update(self.view, index, step, self.start_time)
+        if not columns.keys:
+            return 0.0, 0.0, [], []
+        shift = self.start_time / step # x of a column is its number minus this
+        if np is not None:
+            return self._columns_np(columns, shift)
+        return self._columns_py(columns, shift)
+
+    def _samples_np(self, low, width):
+        t = np.frombuffer(self.times, dtype=np.float64)[self.first:]
+        lo = np.frombuffer(low, dtype=np.float64)[self.first:]
+        return float(lo.min()), float(lo.max()), self.to_x(t, width), lo
+
+    def _samples_py(self, low, width):
+        seg = low[self.first:]
+        xs = [self.to_x(t, width) for t in self.times[self.first:]]
+        return min(seg), max(seg), xs, list(seg)
+
+    def _columns_np(self, columns, shift):
+        mins = np.array(columns.mins)
+        maxs = np.array(columns.maxs)
+        # Rising column: draw min then max; falling: max then min
+        rising = np.array(columns.firsts) <= np.array(columns.lasts)
+        first = np.where(rising, mins, maxs)
+        second = np.where(rising, maxs, mins)
+        xs = np.repeat((np.array(columns.keys, dtype=np.float64) + 0.5) - shift, 2)
+        values = np.column_stack((first, second)).ravel()
+        return float(mins.min()), float(maxs.max()), xs, values
+
+    def _columns_py(self, columns, shift):
+        xs, out = [], []
+        for key, mn, mx, a, b in zip(columns.keys, columns.mins, columns.maxs, columns.firsts, columns.lasts):
+            x = (key + 0.5) - shift
+            xs += (x, x)
+            out += (mn, mx) if a <= b else (mx, mn)
+        return min(columns.mins), max(columns.maxs), xs, out
+
+    def polyline(self, xs, values, min_val, val_range, graph_height):
+        # Flat [x0, y0, x1, y1, ...] list for canvas.create_line
+        if np is not None and isinstance(values, np.ndarray):
+            ys = graph_height - (values - min_val) / val_range * graph_height
+            return np.column_stack((xs, ys)).ravel().tolist()
+        scale = graph_height / val_range
+        points = []
+        for x, v in zip(xs, values):
+            points.append(x)
+            points.append(graph_height - (v - min_val) * scale)
+        return points
+
+# --- Retained scene -------------------------------------------------------------
+#
+# Keeps one canvas's items alive between frames instead of delete("all") and
+# recreating them. Items are addressed by a key (e.g. "trace", ("grid", 20.0))
+# and created the first time the key is drawn. After that, the scene remembers
+# the coords and options it last applied and only sends coords()/itemconfig()
+# for what changed. Keys not drawn in a frame are hidden at end(), so a grid
+# line only appears or disappears when the axis range crosses it. Transient
+# items (peak markers, keyed by peak time) are deleted instead, so the item
+# table doesn't grow as peaks scroll past.
+#
+# Markers pinned to a time only slide left as the window advances. scroll()
+# shifts a whole layer with one canvas.move(), after which their recomputed
+# coords match the cache and cost nothing.
+#
+# Items sit in LAYERS (bottom to top); a newly created item is lowered under
+# the first higher layer so the stacking order matches the old redraw order.
+
+LAYERS = ("grid", "label", "trace", "peak")
+COORD_EPSILON = 0.01 # Pixels; smaller moves aren't worth a Tcl call
+
+class GraphScene:
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = {} # key -> canvas item id
+        self.applied = {} # item id -> [coords, options, layer] last sent to Tk
+        self.transient = set()
+        self.origins = {} # layer -> (start_time, px_per_s) at the last scroll
+        self.layer_used = set()
+        self.drawn = set()
+
+    def begin(self):
+        self.drawn = set()
+
+    def line(self, key, coords, layer="grid", transient=False, **options):
+        self._draw(key, "line", coords, layer, transient, options)
+
+    def text(self, key, coords, layer="label", transient=False, **options):
+        self._draw(key, "text", coords, layer, transient, options)
+
+    def scroll(self, layer, start_time, px_per_s):
+        # Slide every item of `layer` to follow a window now starting at start_time
+        origin = self.origins.get(layer)
+        self.origins[layer] = (start_time, px_per_s)
+        if origin is None or origin[1] != px_per_s or origin[0] == start_time: return
+        if layer not in self.layer_used: return
+        dx = (origin[0] - start_time) * px_per_s
+        self.canvas.move(layer, dx, 0)
+        for applied in self.applied.values():
+            if applied[2] == layer:
+                coords = list(applied[0])
+                coords[0::2] = [x + dx for x in coords[0::2]]
+                applied[0] = coords
+
+    def end(self):
+        # Hide (or, for transient keys, delete) whatever was not drawn this frame
+        for key in [k for k in self.items if k not in self.drawn]:
+            item = self.items[key]
+            if key in self.transient:
+                self.canvas.delete(item)
+                del self.items[key], self.applied[item]
+                self.transient.discard(key)
+                continue
+            applied = self.applied[item][1]
+            if applied.get("state") != "hidden":
+                self.canvas.itemconfig(item, state="hidden")
+                applied["state"] = "hidden"
+
+    def clear(self):
+        self.begin()
+        self.end()
+
+    def _draw(self, key, kind, coords, layer, transient, options):
+        self.drawn.add(key)
+        options["state"] = "normal"
+        item = self.items.get(key)
+        if item is None:
+            create = self.canvas.create_line if kind == "line" else self.canvas.create_text
+            item = create(coords, tags=(layer,), **options)
+            self.items[key] = item
+            self.applied[item] = [coords, options, layer]
+            if transient: self.transient.add(key)
+            self._restack(item, layer)
+            return
+        applied = self.applied[item]
+        if not _same_coords(applied[0], coords):
+            self.canvas.coords(item, coords)
+            applied[0] = coords
+        last = applied[1]
+        changed = {k: v for k, v in options.items() if last.get(k) != v}
+        if changed:
+            self.canvas.itemconfig(item, **changed)
+            last.update(changed)
+
+    def _restack(self, item, layer):
+        self.layer_used.add(layer)
+        for above in LAYERS[LAYERS.index(layer) + 1:]:
+            if above in self.layer_used:
+                self.canvas.tag_lower(item, above)
+                return
+
+def _same_coords(a, b):
+    if len(a) != len(b): return False
+    for x, y in zip(a, b):
+        if abs(x - y) > COORD_EPSILON: return False
+    return True
+
+# --- Raster scene ---------------------------------------------------------------
+#
+# Alternative to GraphScene for dense traces: lines (grid, zero line, trace,
+# peak markers) are rasterised with NumPy into an RGB pixel buffer, and the
+# buffer is pushed to a single PhotoImage per canvas once per frame as binary
+# PPM. Text stays in a retained GraphScene on top of the image, since Tk
+# renders fonts far better than we could. Same interface as GraphScene, so
+# the drawing code doesn't care which one it talks to.
+#
+# Tk 8.6 photos only take raw pixels as PPM (RGB), so there is no alpha
+# channel; the canvases are opaque black anyway, so is the buffer.
+
+RASTER_AVAILABLE = np is not None
+
+def _rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+def _rasterize_axis_line(buf, x0, y0, x1, y1, rgb, width, dash):
+    # Horizontal / vertical line (grid, zero line, peak markers) as slice assignments
+    h, w = buf.shape[:2]
+    horizontal = y0 == y1
+    if horizontal:
+        lo, hi = sorted((int(round(x0)), int(round(x1))))
+        across, limit, length = int(round(y0)), h, w
+    else:
+        lo, hi = sorted((int(round(y0)), int(round(y1))))
+        across, limit, length = int(round(x0)), w, h
+    lo, hi = max(lo, 0), min(hi, length - 1)
+    if lo > hi: return
+    on, period = (dash[0], dash[0] + dash[1]) if dash else (1, 1)
+    for a in range(across - (width - 1) // 2, across - (width - 1) // 2 + width):
+        if not 0 <= a < limit: continue
+        for k in range(on):
+            if horizontal:
+                buf[a, lo + k:hi + 1:period] = rgb
+            else:
+                buf[lo + k:hi + 1:period, a] = rgb
+
+def rasterize_polyline(buf, coords, rgb, width=1, dash=None):
+    # Draw a (dashed) polyline into an HxWx3 uint8 buffer, all segments at once
+    if len(coords) == 4 and (coords[0] == coords[2] or coords[1] == coords[3]):
+        _rasterize_axis_line(buf, *coords, rgb, width, dash)
+        return
+    pts = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(pts) < 2: return
+    p0, p1 = pts[:-1], pts[1:]
+    d = p1 - p0
+    steps = np.maximum(np.ceil(np.abs(d).max(axis=1)), 1).astype(np.int64)
+    total = int(steps.sum())
+    seg = np.repeat(np.arange(len(steps)), steps)
+    first = np.cumsum(steps) - steps
+    frac = (np.arange(total) - first[seg]) / steps[seg]
+    x = p0[seg, 0] + d[seg, 0] * frac
+    y = p0[seg, 1] + d[seg, 1] * frac
+    # Close the path with the final point
+    x = np.append(x, pts[-1, 0])
+    y = np.append(y, pts[-1, 1])
+    seg = np.append(seg, len(steps) - 1)
+    if dash:
+        # Step index along the path is the distance in pixels along the major axis
+        keep = np.arange(total + 1) % (dash[0] + dash[1]) < dash[0]
+        x, y, seg = x[keep], y[keep], seg[keep]
+    xi = np.rint(x).astype(np.int64)
+    yi = np.rint(y).astype(np.int64)
+    if width > 1:
+        # Thicken across the minor axis of each segment
+        mostly_flat = (np.abs(d[:, 0]) >= np.abs(d[:, 1]))[seg]
+        offsets = np.arange(width) - (width - 1) // 2
+        xi = np.concatenate([xi + np.where(mostly_flat, 0, o) for o in offsets])
+        yi = np.concatenate([yi + np.where(mostly_flat, o, 0) for o in offsets])
+    h, w = buf.shape[:2]
+    inside = (xi >= 0) & (xi < w) & (yi >= 0) & (yi < h)
+    buf[yi[inside], xi[inside]] = rgb
+
+class GraphRaster:
+    def __init__(self, canvas, photo_factory):
+        self.canvas = canvas
+        self.photo_factory = photo_factory # e.g. tk.PhotoImage
+        self.labels = GraphScene(canvas)
+        self.photo = None
+        self.image_item = None
+        self.buf = None
+        self.colors = {}
+
+    def begin(self):
+        width = self.canvas.winfo_width()
+        if width <= 1: width = 240
+        height = max(1, self.canvas.winfo_height())
+        if self.buf is None or self.buf.shape[:2] != (height, width):
+            self.buf = np.empty((height, width, 3), dtype=np.uint8)
+            self.header = b"P6 %d %d 255\n" % (width, height)
+        self.buf.fill(0)
+        self.labels.begin()
+
+    def line(self, key, coords, layer="grid", transient=False, fill="#FFFFFF", width=1, dash=None, **options):
+        rgb = self.colors.get(fill)
+        if rgb is None: rgb = self.colors[fill] = _rgb(fill)
+        rasterize_polyline(self.buf, coords, rgb, width, dash)
+
+    def text(self, key, coords, layer="label", transient=False, **options):
+        self.labels.text(key, coords, layer, transient, **options)
+
+    def scroll(self, layer, start_time, px_per_s):
+        self.labels.scroll(layer, start_time, px_per_s)
+
+    def end(self):
+        self.blit()
+        self.labels.end()
+
+    def clear(self):
+        if self.buf is not None:
+            self.buf.fill(0)
+            self.blit()
+        self.labels.clear()
+
+    def blit(self):
+        data = self.header + self.buf.tobytes()
+        if self.photo is None:
+            self.photo = self.photo_factory(data=data, format="PPM")
+            self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+            self.canvas.tag_lower(self.image_item)
+        else:
+            self.photo.configure(data=data, format="PPM")
@@ -0,0 +1,296 @@
+from array import array
+from bisect import bisect_left
+
+from l8r_kinematics import KINEMATIC_FIELDS
+
+# ==============================================================================
+#  SAMPLE HISTORY
+# ==============================================================================
+
+HISTORY_FIELDS = ("t", "speed", "vx", "vy", "vz") + KINEMATIC_FIELDS
+
+# --- History buffer -------------------------------------------------------------
+#
+# Struct-of-arrays history: one array('d') per field, 8 bytes per value, so a
+# sample costs 40 bytes instead of a ~200 byte tuple. The live window
+# [start, end) is always contiguous, so renderers get memoryview slices of
+# the arrays with no copying.
+#
+# Appends go at `end`. When `end` hits the end of the arrays, the live window
+# is slid back to index 0 with one slice assignment (a memmove). The arrays
+# keep `slack` spare slots beyond `capacity`, so that slide happens at most
+# once every `slack` appends: O(1) amortised per sample. Eviction is a
+# bisect on the time column. If the window ever holds more than `capacity`
+# samples, the arrays double.
+
+class HistoryBuffer:
+    def __init__(self, capacity=1 << 15, fields=HISTORY_FIELDS, slack=None):
+        self.fields = fields
+        self.capacity = capacity
+        self.slack = slack or max(1024, capacity // 4)
+        self.columns = [array('d', bytes(8 * (capacity + self.slack))) for _ in fields]
+        self.start = 0
+        self.end = 0
+        self.appended = 0 # Samples ever appended (graphs fold in only what's new since they last looked)
+        self.epoch = 0 # Bumped by clear(), so nobody mistakes new samples for a continuation
+
+    def __len__(self):
+        return self.end - self.start
+
+    def clear(self):
+        self.start = self.end = 0
+        self.epoch += 1
+
+    def append(self, *values):
+        if self.end == len(self.columns[0]):
+            self._make_room(1)
+        i = self.end
+        for column, value in zip(self.columns, values):
+            column[i] = value
+        self.end = i + 1
+        self.appended += 1
+
+    def extend(self, batch):
+        # batch: one sequence per field (e.g. SampleRing.consume() output)
+        n = len(batch[0])
+        if not n: return
+        if self.end + n > len(self.columns[0]):
+            self._make_room(n)
+        for column, values in zip(self.columns, batch):
+            column[self.end:self.end + n] = values if isinstance(values, array) else array('d', values)
+        self.end += n
+        self.appended += n
+
+    def _make_room(self, n):
+        live = self.end - self.start
+        if live + n > self.capacity:
+            self._grow(live + n)
+        # Slide the live window to the front
+        for column in self.columns:
+            column[0:live] = column[self.start:self.end]
+        self.start, self.end = 0, live
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        extra = bytes(8 * (capacity - self.capacity))
+        for column in self.columns:
+            column.frombytes(extra)
+        self.capacity = capacity
+
+    def evict_older_than(self, t_min):
+        # Time column is monotonic, so the cut point is a bisect; returns how many were dropped
+        if self.end > self.start and self.columns[0][self.start] < t_min:
+            start = bisect_left(self.columns[0], t_min, self.start, self.end)
+            dropped, self.start = start - self.start, start
+            return dropped
+        return 0
+
+    def column(self, index):
+        # Zero-copy view of the live window; don't hold it across appends
+        if isinstance(index, str): index = self.fields.index(index)
+        return memoryview(self.columns[index])[self.start:self.end]
+
+    def first_time(self):
+        return self.columns[0][self.start] if self.end > self.start else None
+
+    def last_time(self):
+        return self.columns[0][self.end - 1] if self.end > self.start else None
+
+    def nbytes(self):
+        # Bytes allocated for storage (live data is len(self) * 8 * len(fields))
+        return sum(column.itemsize * len(column) for column in self.columns)
+
+# --- History pyramid ------------------------------------------------------------
+#
+# Whole sessions at 1 kHz don't fit the raw buffer, and a graph spanning an
+# hour can't afford to walk every sample each frame. HistoryPyramid keeps:
+#   raw    the last `raw_seconds` of samples (a HistoryBuffer)
+#   tiers  coarser and coarser buckets, each row (t, then min/max/mean of
+#          every value field), kept for that tier's own span
+#
+# Samples are folded into the first tier as they arrive, a batch at a time
+# (min/max/sum over the slice that falls in the open bucket). When a bucket
+# closes it is appended to its tier and folded into the next one. Memory is
+# bounded by the tier table, not by session length.
+#
+# view(span) picks the source for a graph covering `span` seconds: raw data
+# when it reaches back far enough, otherwise the coarsest tier that still has
+# at least one bucket per pixel column. A frame then costs about the same at
+# 30 s and at 3 h.
+
+RAW_SECONDS = 60.0
+HISTORY_TIERS = ( # (bucket seconds, seconds kept)
+    (0.1, 3600.0),
+    (1.0, 24 * 3600.0),
+    (10.0, 7 * 24 * 3600.0),
+)
+TIER_CAPACITY = 1024 # Initial rows per tier; tiers grow up to their span
+
+def aggregate_fields(fields):
+    # ("t", "speed_min", "speed_max", "speed_mean", "vx_min", ...)
+    out = [fields[0]]
+    for name in fields[1:]:
+        out += (name + "_min", name + "_max", name + "_mean")
+    return tuple(out)
+
+class HistoryView:
+    # One source for a graph: a time column and a (low, high) pair per value field
+    def __init__(self, buffer, now, bucket=None):
+        self.buffer = buffer
+        self.now = now
+        self.bucket = bucket # Seconds per row for an aggregate tier, None for raw samples
+        self.aggregated = bucket is not None
+        self.times = buffer.column(0)
+
+    def range(self, index):
+        if not self.aggregated:
+            column = self.buffer.column(index)
+            return column, column
+        return self.buffer.column(3 * index - 2), self.buffer.column(3 * index - 1)
+
+class HistoryTier:
+    def __init__(self, bucket, keep, fields=HISTORY_FIELDS):
+        self.bucket = bucket
+        self.keep = keep
+        self.values = len(fields) - 1
+        self.buffer = HistoryBuffer(TIER_CAPACITY, aggregate_fields(fields))
+        self.coarser = None # Next tier, fed with every closed bucket
+        self.start = None # Open bucket start time
+        self.count = 0
+        self.lows = self.highs = self.sums = None
+
+    def clear(self):
+        self.buffer.clear()
+        self.start = None
+        self.count = 0
+
+    def add(self, t, lows, highs, sums, count):
+        # Fold one sample (count 1) or one finer bucket into the open bucket
+        self._open(t)
+        self._fold(lows, highs, sums, count)
+
+    def add_batch(self, batch):
+        # Fold a batch of raw samples: one min/max/sum per bucket slice
+        times = batch[0]
+        columns = batch[1:]
+        n = len(times)
+        i = 0
+        while i < n:
+            self._open(times[i])
+            j = bisect_left(times, self.start + self.bucket, i, n)
+            slices = [column[i:j] for column in columns]
+            self._fold([min(s) for s in slices], [max(s) for s in slices], [sum(s) for s in slices], j - i)
+            i = j
+
+    def _open(self, t):
+        if self.start is not None and t >= self.start + self.bucket:
+            self._close()
+        if self.start is None:
+            start = t - t % self.bucket
+            if t >= start + self.bucket: start += self.bucket # t % bucket rounded up to ~bucket
+            self.start = start
+
+    def _fold(self, lows, highs, sums, count):
+        if not self.count:
+            self.lows, self.highs, self.sums = list(lows), list(highs), list(sums)
+        else:
+            self.lows = [min(a, b) for a, b in zip(self.lows, lows)]
+            self.highs = [max(a, b) for a, b in zip(self.highs, highs)]
+            self.sums = [a + b for a, b in zip(self.sums, sums)]
+        self.count += count
+
+    def _close(self):
+        row = [self.start]
+        for lo, hi, total in zip(self.lows, self.highs, self.sums):
+            row += (lo, hi, total / self.count)
+        self.buffer.append(*row)
+        if self.coarser is not None:
+            self.coarser.add(self.start, self.lows, self.highs, self.sums, self.count)
+        self.start = None
+        self.count = 0
+
+class HistoryPyramid:
+    def __init__(self, raw_seconds=RAW_SECONDS, tiers=HISTORY_TIERS, fields=HISTORY_FIELDS):
+        self.fields = fields
+        self.raw_seconds = raw_seconds
+        self.raw = HistoryBuffer(fields=fields)
+        self.tiers = [HistoryTier(bucket, keep, fields) for bucket, keep in tiers]
+        for finer, coarser in zip(self.tiers, self.tiers[1:]):
+            finer.coarser = coarser
+
+    def __len__(self):
+        return len(self.raw)
+
+    def clear(self):
+        self.raw.clear()
+        for tier in self.tiers:
+            tier.clear()
+
+    def append(self, *values):
+        self.raw.append(*values)
+        if self.tiers:
+            sample = values[1:]
+            self.tiers[0].add(values[0], sample, sample, sample, 1)
+
+    def extend(self, batch):
+        if not len(batch[0]): return
+        self.raw.extend(batch)
+        if self.tiers:
+            self.tiers[0].add_batch(batch)
+
+    def evict(self, now):
+        # Trim every level to its span; returns how many raw samples were dropped.
+        # Tier rows leaving sit at the far left of hour-long spans, so they
+        # don't count as a visible change on their own.
+        for tier in self.tiers:
+            tier.buffer.evict_older_than(now - tier.keep)
+        return self.raw.evict_older_than(now - self.raw_seconds)
+
+    def first_time(self):
+        times = [level.first_time() for level in [self.raw] + [tier.buffer for tier in self.tiers]]
+        times = [t for t in times if t is not None]
+        return min(times) if times else None
+
+    def last_time(self):
+        return self.raw.last_time()
+
+    def column(self, index):
+        # Raw samples only (the recent `raw_seconds`)
+        return self.raw.column(index)
+
+    def view(self, span, columns=240):
+        # Best source for a graph showing the last `span` seconds over `columns` pixels
+        now = self.last_time()
+        raw_first = self.raw.first_time()
+        if not self.tiers or span <= self.raw_seconds or (raw_first is not None and raw_first <= self.first_time()):
+            return HistoryView(self.raw, now)
+        covering = [tier for tier in self.tiers if tier.keep >= span] or self.tiers[-1:]
+        fine_enough = [tier for tier in covering if tier.bucket <= span / columns]
+        tier = fine_enough[-1] if fine_enough else covering[0]
+        return HistoryView(tier.buffer, now, tier.bucket)
+
+    def series_since(self, index, t_min):
+        # (times, values) from t_min on: tier maxima where raw data has been
+        # evicted, raw samples after that. Used to rebuild peaks over long spans.
+        raw_t = self.raw.column(0)
+        start = self.raw.first_time()
+        times, values = array('d'), array('d')
+        if start is not None and t_min < start:
+            for tier in self.tiers:
+                first = tier.buffer.first_time()
+                if first is not None and (first <= t_min or tier is self.tiers[-1]):
+                    tier_t = tier.buffer.column(0)
+                    a = bisect_left(tier_t, t_min)
+                    b = bisect_left(tier_t, start)
+                    times.frombytes(tier_t[a:b].cast('B'))
+                    values.frombytes(tier.buffer.column(3 * index - 1)[a:b].cast('B'))
+                    break
+        a = bisect_left(raw_t, t_min)
+        times.frombytes(raw_t[a:].cast('B'))
+        values.frombytes(self.raw.column(index)[a:].cast('B'))
+        return times, values
+
+    def nbytes(self):
+        return self.raw.nbytes() + sum(tier.buffer.nbytes() for tier in self.tiers)
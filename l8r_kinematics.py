@@ -0,0 +1,193 @@
+import math
+from array import array
+from collections import deque
+
+# ==============================================================================
+#  DERIVED KINEMATICS
+# ==============================================================================
+#
+# Kinematics turns each (t, vx, vy, vz) sample into
+#   h_speed  horizontal speed, |(vx, vz)| (vy is the vertical speed already)
+#   accel    |dv/dt|, m/s²
+#   jerk     |d²v/dt²|, m/s³
+# as it arrives on the polling thread, in O(1) per sample, so the graphs and
+# labels read them from the ring/history like any other field.
+#
+# Derivatives are taken against real sample times, so uneven spacing (timer
+# jitter, missed deadlines, replays) doesn't skew them. A gap longer than
+# MAX_GAP (game lost, stall) restarts them instead of reporting a spike.
+#
+# The game updates velocity once per frame while the poller may read it
+# several times in between, so raw differences are mostly zeros and spikes.
+# Smoothing modes:
+#   off     finite differences: accel from consecutive velocities, jerk from
+#           consecutive accelerations (at the midpoints they belong to)
+#   ema     exponential moving average of velocity and then of acceleration,
+#           with alpha = 1 - exp(-dt / tau) so tau means seconds at any rate
+#           (smooth, but lags by about tau per stage)
+#   savgol  Savitzky-Golay: least-squares quadratic through the last `window`
+#           samples at their real times; accel and jerk are its first and
+#           second derivative at the newest sample. Running sums make each
+#           sample O(1); they are rebuilt from the window every `window`
+#           samples, against a fresh time origin, so they never drift.
+
+KINEMATIC_FIELDS = ("h_speed", "accel", "jerk")
+SMOOTHING_MODES = ("off", "ema", "savgol")
+EMA_TAU = 0.05 # Seconds
+SAVGOL_WINDOW = 25 # Samples in the fitted window
+MAX_GAP = 0.25 # Seconds between samples before the derivatives restart
+
+def _norm(x, y, z):
+    return math.sqrt(x*x + y*y + z*z)
+
+class Kinematics:
+    def __init__(self, mode="ema", tau=EMA_TAU, window=SAVGOL_WINDOW):
+        self.configure(mode, tau, window)
+
+    def configure(self, mode, tau=EMA_TAU, window=SAVGOL_WINDOW):
+        if mode not in SMOOTHING_MODES:
+            raise ValueError(f"Unknown smoothing mode {mode!r} (expected one of {', '.join(SMOOTHING_MODES)})")
+        self.mode = mode
+        self.tau = tau
+        self.window = max(3, window)
+        self.reset()
+
+    def reset(self):
+        self.t = None # Previous sample time
+        self.v = None # Previous (smoothed) velocity
+        self.a = None # Previous (smoothed) acceleration vector
+        self.a_t = None # Time that acceleration belongs to (off mode)
+        self.u = self.raw = None # Previous inputs of the two EMA stages
+        self.accel = self.jerk = 0.0
+        self.samples = deque()
+        self.origin = None
+        self.sums = None
+        self.since_rebuild = 0
+
+    def update(self, t, vx, vy, vz):
+        # One sample in, (h_speed, accel, jerk) out
+        h_speed = math.sqrt(vx*vx + vz*vz)
+        if self.t is not None and not 0.0 < t - self.t <= MAX_GAP:
+            if t == self.t: return h_speed, self.accel, self.jerk # Same instant again: nothing new
+            self.reset()
+        if self.mode == "savgol":
+            self._savgol(t, vx, vy, vz)
+        elif self.mode == "ema":
+            self._ema(t, (vx, vy, vz))
+        else:
+            self._difference(t, (vx, vy, vz))
+        self.t = t
+        return h_speed, self.accel, self.jerk
+
+    def extend(self, times, vxs, vys, vzs):
+        # A batch (e.g. a replay chunk) -> one array('d') per KINEMATIC_FIELDS
+        out = tuple(array('d') for _ in KINEMATIC_FIELDS)
+        h_speeds, accels, jerks = out
+        for t, vx, vy, vz in zip(times, vxs, vys, vzs):
+            h, a, j = self.update(float(t), float(vx), float(vy), float(vz))
+            h_speeds.append(h)
+            accels.append(a)
+            jerks.append(j)
+        return out
+
+    def _difference(self, t, v):
+        if self.t is None:
+            self.v = v
+            return
+        dt = t - self.t
+        a = tuple((c - p) / dt for p, c in zip(self.v, v))
+        a_t = t - dt * 0.5 # A difference belongs to the middle of its interval
+        if self.a is not None:
+            self.jerk = _norm(*((c - p) / (a_t - self.a_t) for p, c in zip(self.a, a)))
+        self.v, self.a, self.a_t = v, a, a_t
+        self.accel = _norm(*a)
+
+    def _ema(self, t, v):
+        # Two cascaded EMAs. Differencing a smoothed series divides its tiny,
+        # dt-dependent steps by dt, which is noisy when the spacing is uneven;
+        # an EMA's exact derivative is (input - state) / tau, so use that.
+        # Each stage is stepped exactly for an input that changes linearly
+        # between samples, so uneven spacing doesn't leak into the result.
+        if self.t is None:
+            self.v = self.u = v
+            self.a = self.raw = (0.0, 0.0, 0.0)
+            return
+        dt = t - self.t
+        tau = self.tau
+        decay = math.exp(-dt / tau)
+        hold = 1.0 - decay
+        ramp = 1.0 - tau * hold / dt
+        # Unrolled per axis: this runs on the polling thread for every sample
+        (sx, sy, sz), (ux, uy, uz) = self.v, self.u
+        vx, vy, vz = v
+        sx = decay * sx + hold * ux + ramp * (vx - ux)
+        sy = decay * sy + hold * uy + ramp * (vy - uy)
+        sz = decay * sz + hold * uz + ramp * (vz - uz)
+        rx, ry, rz = (vx - sx) / tau, (vy - sy) / tau, (vz - sz) / tau # d/dt of the smoothed velocity
+        (ax, ay, az), (px, py, pz) = self.a, self.raw
+        ax = decay * ax + hold * px + ramp * (rx - px)
+        ay = decay * ay + hold * py + ramp * (ry - py)
+        az = decay * az + hold * pz + ramp * (rz - pz)
+        self.v, self.u, self.a, self.raw = (sx, sy, sz), v, (ax, ay, az), (rx, ry, rz)
+        self.accel = math.sqrt(ax*ax + ay*ay + az*az)
+        self.jerk = _norm(rx - ax, ry - ay, rz - az) / tau
+
+    def _savgol(self, t, vx, vy, vz):
+        samples = self.samples
+        samples.append((t, vx, vy, vz))
+        if len(samples) > self.window:
+            self._add(samples.popleft(), -1.0)
+        self.since_rebuild += 1
+        if self.sums is None or self.since_rebuild >= self.window:
+            self._rebuild(t)
+        else:
+            self._add(samples[-1], 1.0)
+        if len(samples) < 3: return
+
+        # Normal equations of the quadratic fit v(x) = c0 + c1 x + c2 x², x = t - origin
+        s0, s1, s2, s3, s4 = self.sums[:5]
+        m00 = s2 * s4 - s3 * s3
+        m01 = s2 * s3 - s1 * s4
+        m02 = s1 * s3 - s2 * s2
+        det = s0 * m00 + s1 * m01 + s2 * m02
+        if not det > 0.0: return # Degenerate window (repeated times): keep the last values
+        m11 = s0 * s4 - s2 * s2
+        m12 = s1 * s2 - s0 * s3
+        m22 = s0 * s2 - s1 * s1
+        x = t - self.origin
+        accel, jerk = [], []
+        for k in range(3):
+            y0, y1, y2 = self.sums[5 + 3 * k:8 + 3 * k]
+            c1 = (m01 * y0 + m11 * y1 + m12 * y2) / det
+            c2 = (m02 * y0 + m12 * y1 + m22 * y2) / det
+            accel.append(c1 + 2.0 * c2 * x)
+            jerk.append(2.0 * c2)
+        self.accel = _norm(*accel)
+        self.jerk = _norm(*jerk)
+
+    def _rebuild(self, t):
+        # Fresh origin at the newest sample, sums recomputed from the window
+        self.origin = t
+        self.sums = [0.0] * 14
+        self.since_rebuild = 0
+        for sample in self.samples:
+            self._add(sample, 1.0)
+
+    def _add(self, sample, sign):
+        # sums: Σx⁰..Σx⁴, then Σv, Σxv, Σx²v for vx, vy, vz (sign -1 removes)
+        t, vx, vy, vz = sample
+        x = t - self.origin
+        x2 = x * x
+        sums = self.sums
+        sums[0] += sign
+        sums[1] += sign * x
+        sums[2] += sign * x2
+        sums[3] += sign * x2 * x
+        sums[4] += sign * x2 * x2
+        i = 5
+        for v in (vx, vy, vz):
+            v *= sign
+            sums[i] += v
+            sums[i + 1] += v * x
+            sums[i + 2] += v * x2
+            i += 3
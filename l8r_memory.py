@@ -0,0 +1,605 @@
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from ctypes import wintypes
+
+from l8r_scan import ParallelSignatureScanner, SignatureCache, module_fingerprint
+
+# ==============================================================================
+#  PROCESS MEMORY ACCESS
+# ==============================================================================
+#
+# MemoryReader talks to the game through a backend object. Every backend has
+# the same small interface:
+#
+#   find_process(name)              -> pid or None
+#   open_process(pid)               -> handle or None
+#   close_process(handle)
+#   is_alive(handle)                -> bool
+#   find_module(pid, module_name)   -> (base, size), (None, 0) if missing
+#   read_into(handle, addr, buf, n) -> bool, fills a ctypes buffer in place
+#   read_scatter(handle, requests)  -> bool, requests = [(addr, buf, n), ...]
+#   regions(handle)                 -> [(base, size, prot), ...] readable memory,
+#                                      sorted, prot like "rw" / "rx" / "rwx"
+#   open_waiter(pid)                -> waiter or None, something to wait for exit on
+#   wait_exit(waiter, timeout)      -> bool, blocks until the process exits (True)
+#                                      or `timeout` seconds pass (False)
+#   close_waiter(waiter)
+#
+# Win32Backend is the original toolhelp/ReadProcessMemory path. LinuxBackend
+# reads a Proton/Wine game from /proc and process_vm_readv, where a single
+# syscall can gather any number of scattered fields.
+
+# --- Windows API Definitions ---
+if sys.platform == "win32":
+    kernel32 = ctypes.windll.kernel32
+    user32 = ctypes.windll.user32
+else:
+    kernel32 = user32 = None
+
+TH32CS_SNAPPROCESS = 0x00000002
+TH32CS_SNAPMODULE = 0x00000008
+TH32CS_SNAPMODULE32 = 0x00000010
+PROCESS_VM_READ = 0x0010
+PROCESS_QUERY_INFORMATION = 0x0400
+STILL_ACTIVE = 259
+SYNCHRONIZE = 0x00100000
+WAIT_TIMEOUT = 0x102
+MEM_COMMIT = 0x1000
+PAGE_GUARD = 0x100
+# Protection -> "rwx" letters; anything else (PAGE_NOACCESS, ...) is unreadable
+PAGE_PROTECTIONS = {0x02: "r", 0x04: "rw", 0x08: "rw", 0x20: "rx", 0x40: "rwx", 0x80: "rwx"}
+USER_SPACE_END = 0x7FFFFFFFFFFF
+
+class PROCESSENTRY32(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_void_p),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", ctypes.c_long),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", ctypes.c_char * 260)
+    ]
+
+class MODULEENTRY32(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("th32ModuleID", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("GlblcntUsage", wintypes.DWORD),
+        ("ProccntUsage", wintypes.DWORD),
+        ("modBaseAddr", ctypes.c_void_p),
+        ("modBaseSize", wintypes.DWORD),
+        ("hModule", ctypes.c_void_p),
+        ("szModule", ctypes.c_char * 256),
+        ("szExePath", ctypes.c_char * 260)
+    ]
+
+class MEMORY_BASIC_INFORMATION64(ctypes.Structure):
+    _fields_ = [
+        ("BaseAddress", ctypes.c_ulonglong),
+        ("AllocationBase", ctypes.c_ulonglong),
+        ("AllocationProtect", wintypes.DWORD),
+        ("PartitionId", wintypes.DWORD),
+        ("RegionSize", ctypes.c_ulonglong),
+        ("State", wintypes.DWORD),
+        ("Protect", wintypes.DWORD),
+        ("Type", wintypes.DWORD),
+        ("Alignment2", wintypes.DWORD)
+    ]
+
+def get_pid_by_name(process_name):
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    pid = None
+    entry = PROCESSENTRY32()
+    entry.dwSize = ctypes.sizeof(PROCESSENTRY32)
+    
+    if kernel32.Process32First(snapshot, ctypes.byref(entry)):
+        while True:
+            try:
+                exe_name = entry.szExeFile.decode('utf-8').lower()
+                if process_name.lower() in exe_name:
+                    pid = entry.th32ProcessID
+                    break
+            except:
+                pass
+            if not kernel32.Process32Next(snapshot, ctypes.byref(entry)):
+                break
+    kernel32.CloseHandle(snapshot)
+    return pid
+
+def get_module_base(pid, module_name):
+    try:
+        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPMODULE | TH32CS_SNAPMODULE32, pid)
+        if snapshot == -1 or snapshot == 0: return None, 0
+    except:
+        return None, 0
+
+    base_addr = None
+    base_size = 0
+    entry = MODULEENTRY32()
+    entry.dwSize = ctypes.sizeof(MODULEENTRY32)
+    
+    if kernel32.Module32First(snapshot, ctypes.byref(entry)):
+        while True:
+            try:
+                m_name = entry.szModule.decode('utf-8').lower()
+                if module_name.lower() == m_name:
+                    base_addr = entry.modBaseAddr
+                    base_size = entry.modBaseSize
+                    break
+            except:
+                pass
+            if not kernel32.Module32Next(snapshot, ctypes.byref(entry)):
+                break
+    kernel32.CloseHandle(snapshot)
+    return base_addr, base_size
+
+class Win32Backend:
+    name = "win32"
+
+    def find_process(self, process_name):
+        return get_pid_by_name(process_name)
+
+    def open_process(self, pid):
+        return kernel32.OpenProcess(PROCESS_VM_READ | PROCESS_QUERY_INFORMATION, False, pid) or None
+
+    def close_process(self, handle):
+        if handle: kernel32.CloseHandle(handle)
+
+    def is_alive(self, handle):
+        code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)): return False
+        return code.value == STILL_ACTIVE
+
+    def find_module(self, pid, module_name):
+        return get_module_base(pid, module_name)
+
+    def open_waiter(self, pid):
+        # Separate handle so whoever reads memory can close theirs independently
+        return kernel32.OpenProcess(SYNCHRONIZE, False, pid) or None
+
+    def wait_exit(self, waiter, timeout):
+        # A process handle is signalled when the process exits
+        return kernel32.WaitForSingleObject(waiter, int(timeout * 1000)) != WAIT_TIMEOUT
+
+    def close_waiter(self, waiter):
+        kernel32.CloseHandle(waiter)
+
+    def read_into(self, handle, address, buf, size):
+        return bool(kernel32.ReadProcessMemory(handle, ctypes.c_void_p(address), buf, size, None))
+
+    def read_scatter(self, handle, requests):
+        # No gather API on Windows, one call per range
+        for address, buf, size in requests:
+            if not kernel32.ReadProcessMemory(handle, ctypes.c_void_p(address), buf, size, None):
+                return False
+        return True
+
+    def regions(self, handle):
+        # Walk the address space with VirtualQueryEx; committed, readable, no guard pages
+        query = kernel32.VirtualQueryEx
+        query.restype = ctypes.c_size_t
+        query.argtypes = [wintypes.HANDLE, ctypes.c_void_p, ctypes.POINTER(MEMORY_BASIC_INFORMATION64), ctypes.c_size_t]
+        info = MEMORY_BASIC_INFORMATION64()
+        out = []
+        address = 0
+        while address < USER_SPACE_END:
+            if not query(handle, ctypes.c_void_p(address), ctypes.byref(info), ctypes.sizeof(info)): break
+            prot = PAGE_PROTECTIONS.get(info.Protect & 0xFF)
+            if info.State == MEM_COMMIT and prot and not info.Protect & PAGE_GUARD:
+                if out and out[-1][0] + out[-1][1] == info.BaseAddress and out[-1][2] == prot:
+                    out[-1] = (out[-1][0], out[-1][1] + info.RegionSize, prot) # Merge neighbours
+                else:
+                    out.append((info.BaseAddress, info.RegionSize, prot))
+            if not info.RegionSize: break
+            address = info.BaseAddress + info.RegionSize
+        return out
+
+# --- Linux (Proton / Wine) ---
+
+class iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t)
+    ]
+
+IOV_MAX = 1024
+EXIT_POLL_INTERVAL = 0.05 # Seconds between /proc checks where pidfds aren't available
+
+def _load_process_vm_readv():
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fn = libc.process_vm_readv
+    except (OSError, AttributeError):
+        return None
+    fn.restype = ctypes.c_ssize_t
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(iovec), ctypes.c_ulong,
+                   ctypes.POINTER(iovec), ctypes.c_ulong, ctypes.c_ulong]
+    return fn
+
+class _IovecArrays(threading.local):
+    # One pair of iovec arrays per thread, so a gather doesn't allocate and
+    # two threads reading through the same backend (the sampling thread and
+    # a scan, the attach watcher, a tool) never fill each other's arrays
+    def __init__(self):
+        self.local = (iovec * IOV_MAX)()
+        self.remote = (iovec * IOV_MAX)()
+
+PTR = struct.Struct('<Q') # 64-bit pointer
+FLOAT = struct.Struct('<f')
+
+class _ScalarBuffer(threading.local):
+    # read_ptr/read_float land here instead of a fresh buffer per call. Per
+    # thread, because the sampling thread and the attach watcher can share a
+    # reader and would otherwise decode each other's bytes.
+    def __init__(self):
+        self.buf = ctypes.create_string_buffer(8)
+
+class LinuxBackend:
+    name = "linux"
+
+    def __init__(self):
+        self._vm_readv = _load_process_vm_readv() if sys.platform.startswith("linux") else None
+        self._mem_files = {} # pid -> fd of /proc/<pid>/mem, fallback when process_vm_readv is missing
+        self._iov = _IovecArrays()
+
+    def find_process(self, process_name):
+        # Wine shows the Windows exe in cmdline (Z:\...\l8rsk8r.exe); comm is cut at 15 chars
+        wanted = process_name.lower()
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit(): continue
+            try:
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0].decode("utf-8", "replace")
+                with open(f"/proc/{entry}/comm", "r") as f:
+                    comm = f.read().strip()
+            except OSError:
+                continue
+            exe_name = argv0.replace("\\", "/").rsplit("/", 1)[-1].lower()
+            if wanted in exe_name or (comm and comm.lower() == wanted[:15]):
+                # A zombie keeps its comm until it is reaped: not the game any more
+                if int(entry) != os.getpid() and self.is_alive(int(entry)):
+                    return int(entry)
+        return None
+
+    def open_process(self, pid):
+        return pid if os.path.exists(f"/proc/{pid}") else None
+
+    def close_process(self, handle):
+        fd = self._mem_files.pop(handle, None)
+        if fd is not None: os.close(fd)
+
+    def is_alive(self, handle):
+        try:
+            with open(f"/proc/{handle}/stat", "r") as f:
+                state = f.read().rsplit(")", 1)[1].split()[0]
+            return state not in ("Z", "X")
+        except (OSError, IndexError):
+            return False
+
+    def open_waiter(self, pid):
+        # A pidfd becomes readable when the process exits (Linux 5.3+, Python
+        # 3.9+); without one, wait_exit polls /proc/<pid>/stat
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None:
+            try:
+                return (pid, pidfd_open(pid))
+            except OSError:
+                pass
+        return (pid, None) if self.is_alive(pid) else None
+
+    def wait_exit(self, waiter, timeout):
+        pid, fd = waiter
+        if fd is not None:
+            return bool(select.select([fd], [], [], timeout)[0])
+        deadline = time.monotonic() + timeout
+        while self.is_alive(pid):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: return False
+            time.sleep(min(EXIT_POLL_INTERVAL, remaining))
+        return True
+
+    def close_waiter(self, waiter):
+        if waiter[1] is not None: os.close(waiter[1])
+
+    def find_module(self, pid, module_name):
+        # Lowest mapping of the file is the image base; size spans all its mappings
+        wanted = module_name.lower()
+        base = end = None
+        try:
+            with open(f"/proc/{pid}/maps", "r") as f:
+                for line in f:
+                    parts = line.split(None, 5)
+                    if len(parts) < 6: continue
+                    if parts[5].strip().replace("\\", "/").rsplit("/", 1)[-1].lower() != wanted: continue
+                    lo, hi = (int(x, 16) for x in parts[0].split("-"))
+                    base = lo if base is None else min(base, lo)
+                    end = hi if end is None else max(end, hi)
+        except OSError:
+            return None, 0
+        if base is None: return None, 0
+        return base, end - base
+
+    def regions(self, handle):
+        # Readable mappings from /proc/<pid>/maps. Device mappings (GPU memory)
+        # and the kernel's [vvar]/[vsyscall] pages are skipped: reading them
+        # fails or stalls.
+        out = []
+        try:
+            with open(f"/proc/{handle}/maps", "r") as f:
+                for line in f:
+                    parts = line.split(None, 5)
+                    if len(parts) < 5 or parts[1][0] != "r": continue
+                    path = parts[5].strip() if len(parts) > 5 else ""
+                    if path.startswith("/dev/") or path in ("[vvar]", "[vsyscall]", "[vvar_vclock]"): continue
+                    lo, hi = (int(x, 16) for x in parts[0].split("-"))
+                    prot = "r" + ("w" if parts[1][1] == "w" else "") + ("x" if parts[1][2] == "x" else "")
+                    out.append((lo, hi - lo, prot))
+        except OSError:
+            return []
+        return out
+
+    def read_into(self, handle, address, buf, size):
+        if self._vm_readv is None:
+            return self._pread(handle, address, buf, size)
+        iov = self._iov
+        local, remote = iov.local, iov.remote
+        local[0].iov_base = ctypes.addressof(buf)
+        local[0].iov_len = size
+        remote[0].iov_base = address
+        remote[0].iov_len = size
+        return self._vm_readv(handle, local, 1, remote, 1, 0) == size
+
+    def read_scatter(self, handle, requests):
+        if self._vm_readv is None:
+            return all(self._pread(handle, a, b, n) for a, b, n in requests)
+        iov = self._iov
+        local, remote = iov.local, iov.remote
+        for i in range(0, len(requests), IOV_MAX):
+            batch = requests[i:i + IOV_MAX]
+            total = 0
+            for j, (address, buf, size) in enumerate(batch):
+                local[j].iov_base = ctypes.addressof(buf)
+                local[j].iov_len = size
+                remote[j].iov_base = address
+                remote[j].iov_len = size
+                total += size
+            # process_vm_readv stops at the first unreadable range, so a short count is a failure
+            if self._vm_readv(handle, local, len(batch), remote, len(batch), 0) != total:
+                return False
+        return True
+
+    def _pread(self, handle, address, buf, size):
+        fd = self._mem_files.get(handle)
+        try:
+            if fd is None:
+                fd = os.open(f"/proc/{handle}/mem", os.O_RDONLY)
+                self._mem_files[handle] = fd
+            data = os.pread(fd, size, address)
+        except OSError:
+            return False
+        if len(data) != size: return False
+        ctypes.memmove(buf, data, size)
+        return True
+
+def default_backend():
+    if sys.platform == "win32":
+        return Win32Backend()
+    if sys.platform.startswith("linux"):
+        return LinuxBackend()
+    raise OSError(f"No memory backend for platform '{sys.platform}'")
+
+class MemoryReader:
+    def __init__(self, backend=None, scan_workers=1, signature_cache_file=None):
+        self.backend = backend or default_backend()
+        self.pid = None
+        self.handle = None
+        self.modules = {} # module name (lower case) -> (base, size), for the attached process
+        self.scanner = ParallelSignatureScanner(scan_workers)
+        self.sig_cache = SignatureCache(signature_cache_file) if signature_cache_file else None
+        self._scalar = _ScalarBuffer()
+
+    def attach(self, process_name):
+        pid = self.backend.find_process(process_name)
+        return self.attach_pid(pid) if pid else False
+
+    def attach_pid(self, pid, modules=None):
+        # modules: {name: (base, size)} already looked up for this pid (AttachWatcher)
+        handle = self.backend.open_process(pid)
+        if not handle: return False
+        self.detach()
+        self.pid = pid
+        self.handle = handle
+        self.modules = {name.lower(): module for name, module in (modules or {}).items()}
+        return True
+
+    def detach(self):
+        if self.handle:
+            self.backend.close_process(self.handle)
+        self.pid = None
+        self.handle = None
+        self.modules = {}
+
+    def close(self):
+        # Done with the reader for good: detach and stop the scan workers
+        self.detach()
+        self.scanner.close()
+
+    def regions(self):
+        # [(base, size, prot), ...] of readable memory, sorted by address
+        if not self.handle: return []
+        return sorted(self.backend.regions(self.handle))
+
+    def get_module(self, module_name):
+        # Cached per process: a loaded module doesn't move, and a lookup is a
+        # toolhelp snapshot or a /proc maps parse. Misses aren't cached (the
+        # game may still be loading it).
+        if not self.pid: return 0, 0
+        key = module_name.lower()
+        module = self.modules.get(key)
+        if module is None:
+            module = self.backend.find_module(self.pid, module_name)
+            if module[0]:
+                self.modules[key] = module
+        return module
+
+    def read_bytes(self, address, size):
+        if not self.handle or not address: return None
+        buf = ctypes.create_string_buffer(size)
+        if self.backend.read_into(self.handle, address, buf, size):
+            return buf.raw
+        return None
+
+    def read_into(self, address, buf, size):
+        # Same as read_bytes but fills a caller-owned buffer (no allocation)
+        if not self.handle or not address: return False
+        return self.backend.read_into(self.handle, address, buf, size)
+
+    def read_many(self, requests):
+        # Gather several (address, buf, size) ranges, one syscall on Linux
+        if not self.handle: return False
+        return self.backend.read_scatter(self.handle, requests)
+
+    def read_ptr(self, address):
+        buf = self._scalar.buf
+        if self.read_into(address, buf, 8):
+            return PTR.unpack_from(buf)[0]
+        return 0
+
+    def read_float(self, address):
+        buf = self._scalar.buf
+        if self.read_into(address, buf, 4):
+            return FLOAT.unpack_from(buf)[0]
+        return 0.0
+
+    def scan_pattern(self, module_name, pattern_str):
+        return self.scan_patterns(module_name, [pattern_str]).get(pattern_str)
+
+    def scan_patterns(self, module_name, patterns):
+        # Resolve several signatures in one streamed pass over the module
+        # Returns {pattern: address or None}
+        results = {p: None for p in patterns}
+        if not self.pid: return results
+        base, size = self.get_module(module_name)
+        if not base or not size: return results
+        
+        try:
+            # Same game build as last time? Confirm the cached hits with a tiny read
+            fingerprint = None
+            if self.sig_cache:
+                fingerprint = module_fingerprint(self, base, size)
+                results.update(self.sig_cache.lookup(module_name, fingerprint, self, base, patterns))
+
+            missing = [p for p in patterns if results[p] is None]
+            if missing:
+                hits = self.scanner.scan(self, base, size, missing)
+                for p, found in hits.items():
+                    if found: results[p] = found[0]
+                if self.sig_cache:
+                    self.sig_cache.store(module_name, fingerprint, base, results)
+        except Exception as e:
+            # print(f"Scan error: {e}")
+            pass
+        return results
+
+    def resolve_chain(self, base_addr, offsets):
+        current_addr = self.read_ptr(base_addr)
+        if not current_addr: return 0
+        
+        for i, offset in enumerate(offsets):
+            current_addr = self.read_ptr(current_addr + offset)
+            if not current_addr:
+                return 0
+        return current_addr
+
+class ReadPlan:
+    # Compiles a (name, offset, type) field list into the fewest contiguous
+    # spans, each read into a preallocated buffer and decoded with one
+    # precompiled struct.Struct. Fields closer than max_gap bytes share a span.
+    def __init__(self, fields, max_gap=256):
+        self.names = [f[0] for f in fields]
+        ordered = sorted(fields, key=lambda f: f[1])
+
+        groups = []
+        for name, offset, fmt in ordered:
+            end = offset + struct.calcsize('<' + fmt)
+            if groups and offset - groups[-1][1] <= max_gap:
+                groups[-1][1] = max(groups[-1][1], end)
+                groups[-1][2].append((name, offset, fmt))
+            else:
+                groups.append([offset, end, [(name, offset, fmt)]])
+
+        self.spans = []
+        decoded = []
+        for start, end, members in groups:
+            layout = '<'
+            pos = start
+            for name, offset, fmt in members:
+                if offset < pos:
+                    raise ValueError(f"Overlapping field '{name}' at {hex(offset)}")
+                if offset > pos: layout += f"{offset - pos}x"
+                layout += fmt
+                pos = offset + struct.calcsize('<' + fmt)
+                decoded.append(name)
+            size = end - start
+            self.spans.append((start, size, ctypes.create_string_buffer(size), struct.Struct(layout)))
+
+        # Decoded values come out in offset order; map back to declaration order
+        order = [decoded.index(n) for n in self.names]
+        self._reorder = None if order == list(range(len(order))) else order
+
+    def read(self, mem, base):
+        # Returns a tuple in PLAYER_FIELDS order, or None if any span failed
+        if len(self.spans) == 1:
+            start, size, buf, layout = self.spans[0]
+            if not mem.read_into(base + start, buf, size): return None
+            values = layout.unpack_from(buf)
+        else:
+            # Scattered spans: one gather call where the backend supports it
+            if not mem.read_many([(base + start, buf, size) for start, size, buf, layout in self.spans]):
+                return None
+            values = ()
+            for start, size, buf, layout in self.spans:
+                values += layout.unpack_from(buf)
+        if self._reorder:
+            return tuple(values[i] for i in self._reorder)
+        return values
+
+# --- Benchmark ----------------------------------------------------------------
+
+def benchmark(fields=32, iterations=20000):
+    # Reads scattered floats out of this very process, per field vs one gather
+    backend = default_backend()
+    mem = MemoryReader(backend)
+    mem.pid = os.getpid()
+    mem.handle = backend.open_process(mem.pid)
+    targets = [ctypes.create_string_buffer(struct.pack('<f', float(i)) + b'\0' * 60) for i in range(fields)]
+    addresses = [ctypes.addressof(t) for t in targets]
+    bufs = [ctypes.create_string_buffer(4) for _ in range(fields)]
+    requests = [(a, b, 4) for a, b in zip(addresses, bufs)]
+
+    print(f"Backend: {backend.name}, {fields} scattered 4-byte fields, {iterations} polls")
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        for a, b in zip(addresses, bufs):
+            mem.read_into(a, b, 4)
+    per_field = (time.perf_counter() - t0) / iterations
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        mem.read_many(requests)
+    gathered = (time.perf_counter() - t0) / iterations
+    assert [struct.unpack('<f', b.raw)[0] for b in bufs] == [float(i) for i in range(fields)]
+    print(f"  per-field read_into : {per_field * 1e6:8.2f} us/poll ({fields} syscalls)")
+    print(f"  read_many (gather)  : {gathered * 1e6:8.2f} us/poll (1 syscall)  x{per_field / gathered:.1f}")
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
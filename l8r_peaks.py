@@ -0,0 +1,161 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError: # Optional; only speeds up finding maxima in large batches
+    np = None
+
+# ==============================================================================
+#  STREAMING PEAKS
+# ==============================================================================
+#
+# The graphs mark the highest speed of each stretch of play. The rule is:
+# local maxima above PEAK_THRESHOLD, at least `spacing` seconds apart, with
+# the higher peak winning a conflict and nothing shown until it is `delay`
+# seconds old.
+#
+# PeakTracker applies that rule as samples arrive instead of rescanning the
+# whole history every frame:
+#   feed()     finds local maxima in the new batch (one sample of lag, since
+#              a maximum needs its right neighbour) and queues them
+#   advance()  promotes queued maxima once they are `delay` old
+#   expire()   drops peaks that scrolled out of the window
+#
+# The old pass sorted every peak by height and kept each one not within
+# `spacing` of a higher kept peak. Equivalently, a peak is selected iff no
+# selected peak within `spacing` beats it. A new or expiring peak can only
+# change that for its neighbours, so _settle() re-decides just those, highest
+# first, rippling down through whatever it displaces. Selected peaks stay in
+# a time-sorted list the renderer slices in O(visible peaks). The result is
+# identical to the old pass, except at the very edge of the window, where a
+# peak stays although its left neighbour sample has already been evicted.
+
+PEAK_THRESHOLD = 1.0 # Ignore local maxima smaller than this (noise)
+WITHIN_PAD = 1e-6 # Seconds; far above float rounding at perf_counter magnitudes
+
+def local_maxima(times, values, threshold=PEAK_THRESHOLD):
+    # [(t, v)] where v is above both neighbours and |v| > threshold
+    n = len(values)
+    if n < 3: return []
+    if np is not None and n > 64:
+        t = np.asarray(times, dtype=np.float64)
+        v = np.asarray(values, dtype=np.float64)
+        mid = v[1:-1]
+        idx = np.nonzero((mid > v[:-2]) & (mid > v[2:]) & (np.abs(mid) > threshold))[0] + 1
+        return list(zip(t[idx].tolist(), v[idx].tolist()))
+    found = []
+    for i in range(1, n - 1):
+        s = values[i]
+        if s > values[i - 1] and s > values[i + 1] and abs(s) > threshold:
+            found.append((times[i], s))
+    return found
+
+def _beats(a, b):
+    # Greedy order: higher value first, earlier time breaks ties
+    return a[1] > b[1] or (a[1] == b[1] and a[0] < b[0])
+
+class PeakTracker:
+    def __init__(self, spacing=None, delay=None, threshold=PEAK_THRESHOLD):
+        # Unconfigured by default, so the first configure() asks for a rebuild
+        self.spacing = spacing
+        self.delay = delay
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.tail_t = [] # Last two samples, carried over to the next batch
+        self.tail_v = []
+        self.pending = deque() # Maxima waiting out the display delay, time order
+        self.cand_t = [] # Promoted maxima (time order), selected or not
+        self.cand_v = []
+        self.sel_t = [] # Selected peaks, time order, >= spacing apart
+        self.sel_v = []
+
+    def configure(self, spacing, delay):
+        # True if the rule changed (the caller should rebuild from history)
+        if spacing == self.spacing and delay == self.delay: return False
+        self.spacing, self.delay = spacing, delay
+        return True
+
+    def rebuild(self, times, values, now):
+        self.reset()
+        self.feed(times, values)
+        self.advance(now)
+
+    def feed(self, times, values):
+        # times/values: any float sequence (ring batch arrays, history memoryviews)
+        if not len(times): return
+        if np is not None and len(times) > 64:
+            t = np.concatenate((self.tail_t, np.asarray(times, dtype=np.float64)))
+            v = np.concatenate((self.tail_v, np.asarray(values, dtype=np.float64)))
+        else:
+            t = self.tail_t + list(times)
+            v = self.tail_v + list(values)
+        self.pending.extend(local_maxima(t, v, self.threshold))
+        self.tail_t = [float(x) for x in t[-2:]]
+        self.tail_v = [float(x) for x in v[-2:]]
+
+    def advance(self, now):
+        pending = self.pending
+        while pending and now - pending[0][0] >= self.delay:
+            t, v = pending.popleft()
+            self.cand_t.append(t)
+            self.cand_v.append(v)
+            self._settle([(t, v)])
+
+    def _settle(self, todo):
+        # Re-decide candidates that may have just become unblocked, highest
+        # first. Selecting one unblocks whatever the peaks it displaces were
+        # blocking, and so on down; heights only decrease, so it terminates.
+        heap = [(-v, t) for t, v in todo]
+        heapq.heapify(heap)
+        while heap:
+            v, t = heapq.heappop(heap)
+            x = (t, -v)
+            lo, hi = self._within(self.sel_t, t)
+            if any(self.sel_t[i] == t or _beats((self.sel_t[i], self.sel_v[i]), x) for i in range(lo, hi)):
+                continue
+            if lo == hi: lo = hi = bisect_left(self.sel_t, t)
+            displaced = list(zip(self.sel_t[lo:hi], self.sel_v[lo:hi]))
+            self.sel_t[lo:hi] = [t]
+            self.sel_v[lo:hi] = [x[1]]
+            for z in displaced:
+                for r in self._neighbours(z):
+                    if r != x and _beats(z, r):
+                        heapq.heappush(heap, (-r[1], r[0]))
+
+    def _neighbours(self, peak):
+        lo, hi = self._within(self.cand_t, peak[0])
+        return [(self.cand_t[i], self.cand_v[i]) for i in range(lo, hi)]
+
+    def _within(self, ts, t):
+        # Index range of ts with |ts[i] - t| < spacing. Bisect on a padded
+        # window, then trim with the exact test so rounding can't disagree
+        # with the comparison the greedy rule is defined by.
+        d = self.spacing
+        lo = bisect_left(ts, t - d - WITHIN_PAD)
+        hi = bisect_right(ts, t + d + WITHIN_PAD)
+        while lo < hi and not abs(ts[lo] - t) < d: lo += 1
+        while hi > lo and not abs(ts[hi - 1] - t) < d: hi -= 1
+        return lo, hi
+
+    def expire(self, t_min):
+        while self.pending and self.pending[0][0] < t_min:
+            self.pending.popleft()
+        n = bisect_left(self.cand_t, t_min)
+        if n:
+            del self.cand_t[:n], self.cand_v[:n]
+        n = bisect_left(self.sel_t, t_min)
+        if n:
+            gone = list(zip(self.sel_t[:n], self.sel_v[:n]))
+            del self.sel_t[:n], self.sel_v[:n]
+            # Whatever those peaks were blocking may show up now
+            freed = [r for z in gone for r in self._neighbours(z) if _beats(z, r)]
+            if freed: self._settle(freed)
+
+    def visible(self, start_time):
+        # Selected peaks at or after start_time; O(visible peaks)
+        i = bisect_left(self.sel_t, start_time)
+        return list(zip(self.sel_t[i:], self.sel_v[i:]))
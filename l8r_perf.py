@@ -0,0 +1,141 @@
+import json
+import math
+import time
+from array import array
+from bisect import bisect_left
+
+# ==============================================================================
+#  PERFORMANCE COUNTERS
+# ==============================================================================
+#
+# PerfMonitor collects what the HUD row and the JSON-lines log report:
+#   read     per-poll ReadProcessMemory / process_vm_readv latency (polling thread)
+#   render   per-graph draw time, by graph title (Tk thread)
+#   frame    interval between update_ui calls, i.e. the real UI frame time
+#   queue    samples waiting in the SampleRing when a frame starts
+# plus counters that already exist elsewhere (scheduler ticks and lateness,
+# chain resolves, ring drops, scan time), which are only read when a report
+# is made, so they cost nothing per sample.
+#
+# Latencies are appended raw to an array('d') (about as cheap as Python
+# gets on the hot path); sorting, percentiles and the half-octave histogram
+# happen once per report. Each LatencySamples has a single writer thread;
+# report() swaps in a fresh one, which at worst loses the one value being
+# added at that instant.
+#
+# The overlay keeps `perf` at None while the HUD and the log are both off,
+# so the hot paths pay one attribute check and nothing else.
+
+SQRT_TWO = math.sqrt(2.0) # Histogram buckets are half an octave wide
+
+class LatencySamples:
+    __slots__ = ("values", "add")
+
+    def __init__(self):
+        self.values = array('d')
+        self.add = self.values.append # add(seconds)
+
+    def summary(self, scale=1e6):
+        # {"n", "mean", "p50", "p99", "max", "hist"} in microseconds (scale=1e3
+        # for ms); hist is [[upper edge, count], ...] over half-octave buckets
+        n = len(self.values)
+        if not n:
+            return {"n": 0}
+        ordered = sorted(self.values)
+        hist = []
+        edge = 1.0 / scale # Start at 1 us / 1 ms
+        i = 0
+        while i < n:
+            j = bisect_left(ordered, edge, i)
+            if j > i:
+                hist.append([round(edge * scale, 2), j - i])
+            i = j
+            edge *= SQRT_TWO
+        return {
+            "n": n,
+            "mean": round(sum(ordered) / n * scale, 2),
+            "p50": round(ordered[n // 2] * scale, 2),
+            "p99": round(ordered[min(n - 1, int(n * 0.99))] * scale, 2),
+            "max": round(ordered[-1] * scale, 2),
+            "hist": hist,
+        }
+
+class PerfMonitor:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.read = LatencySamples() # Polling thread
+        self.frame = LatencySamples() # Tk thread from here on
+        self.render = {}
+        self.queue_total = 0
+        self.queue_frames = 0
+        self.queue_max = 0
+        self.last_frame = None
+        self.started = clock()
+        self.counters = {}
+
+    def frame_start(self, now, queued):
+        # Start of update_ui: frame interval and ring backlog
+        if self.last_frame is not None:
+            self.frame.add(now - self.last_frame)
+        self.last_frame = now
+        self.queue_total += queued
+        self.queue_frames += 1
+        if queued > self.queue_max: self.queue_max = queued
+
+    def rendered(self, name, seconds):
+        samples = self.render.get(name)
+        if samples is None:
+            samples = self.render[name] = LatencySamples()
+        samples.add(seconds)
+
+    def report(self, now, counters, scheduler=None):
+        # Snapshot since the last report, as a JSON-ready dict. `counters`
+        # holds running totals (polls, resolves, drops, ...); they're reported
+        # as per-second rates over the window.
+        elapsed = max(now - self.started, 1e-9)
+        rates = {}
+        for name, total in counters.items():
+            rates[name + "_per_s"] = round((total - self.counters.get(name, total)) / elapsed, 2)
+        report = {
+            "time": round(time.time(), 3),
+            "window_s": round(elapsed, 3),
+            "read_us": self.read.summary(),
+            "frame_ms": self.frame.summary(1e3),
+            "render_ms": {name: samples.summary(1e3) for name, samples in self.render.items()},
+            "queue_mean": round(self.queue_total / self.queue_frames, 1) if self.queue_frames else 0.0,
+            "queue_max": self.queue_max,
+        }
+        report.update(rates)
+        if scheduler is not None:
+            stats = scheduler.stats()
+            report["poll_hz"] = round(stats["rate_hz"], 1)
+            report["lateness_p99_us"] = round(stats["jitter_p99_ms"] * 1000.0, 1)
+
+        self.read = LatencySamples()
+        self.frame = LatencySamples()
+        self.render = {}
+        self.queue_total = self.queue_frames = self.queue_max = 0
+        self.started = now
+        self.counters = dict(counters)
+        return report
+
+def hud_text(report):
+    # One compact line for the overlay
+    read = report["read_us"]
+    frame = report["frame_ms"]
+    draw = sum(summary.get("mean", 0.0) for summary in report["render_ms"].values())
+    parts = [f"poll {report.get('poll_hz', 0):.0f}Hz late99 {report.get('lateness_p99_us', 0):.0f}us"]
+    if read["n"]:
+        parts.append(f"read {read['p50']:.0f}/{read['p99']:.0f}us")
+    parts.append(f"res {report.get('resolves_per_s', 0):g}/s")
+    if report.get("scan_ms"):
+        parts.append(f"scan {report['scan_ms']:.0f}ms")
+    parts.append(f"q {report['queue_max']} drop {report.get('dropped_per_s', 0):g}/s")
+    parts.append(f"draw {draw:.1f}ms")
+    if frame["n"]:
+        parts.append(f"frame {frame['p50']:.0f}/{frame['max']:.0f}ms")
+    return " | ".join(parts)
+
+def write_jsonl(f, report):
+    f.write(json.dumps(report, separators=(",", ":")) + "\n")
+    f.flush()
@@ -0,0 +1,393 @@
+import argparse
+import ctypes
+import math
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError: # Required here (the overlay itself runs without it)
+    np = None
+
+from l8r_game import (BASE_MODULE, MAX_SPEED, PLAYER_FIELDS, POINTER_CHAINS_FILE, PROCESS_NAME, chain_rank,
+                      load_pointer_chains, save_pointer_chains)
+from l8r_memory import MemoryReader, ReadPlan
+from l8r_scan import attach_shared_memory
+
+# ==============================================================================
+#  POINTER SCANNER
+# ==============================================================================
+#
+# Finds new pointer chains when a game update breaks BASE_OFFSET /
+# POINTER_OFFSETS, the way a Cheat Engine pointer scan would:
+#
+#   python l8r_pointers.py scan 0x1D400006000   # player object address (e.g. from Cheat Engine)
+#   python l8r_pointers.py rescan               # after each restart / respawn / level change
+#   python l8r_pointers.py list
+#
+# Candidates go to POINTER_CHAINS_FILE, and ChainCache tries the best of them
+# whenever the configured chain doesn't link, so the overlay keeps working
+# until l8r_game.py is updated.
+#
+# 1. Snapshot. Every readable region is read in SNAPSHOT_CHUNK pieces and
+#    viewed as 8-byte slots. A slot is a pointer if its value is 8-aligned
+#    and lands inside a readable region. The map keeps the values sorted,
+#    each with the slot it was read from as an index into the snapshot
+#    (uint32 up to 32 GB of readable memory), so 12 bytes per pointer. It
+#    stops at `budget` bytes and says so (truncated), so a multi-GB process
+#    can't run the machine out of memory; sorting peaks at about 2.7x that.
+# 2. Search. Backwards from the target, one level per pointer hop: level 0
+#    is every slot holding the target, level k+1 every slot holding a value
+#    at most max_offset below a level-k slot. A level is one batch of
+#    searchsorted calls over the whole frontier; big frontiers are split
+#    across a process pool that reads the map from shared memory. Slots in
+#    BASE_MODULE are roots (finished chains) and aren't followed further, a
+#    slot already seen is dropped, and a level keeps at most MAX_FRONTIER
+#    slots (smallest offsets first).
+# 3. Rank. A scan usually finds several chains that work right now. rescan
+#    resolves each one again and counts whether it still reaches the player:
+#    the exact address if one is given, otherwise an object whose velocity
+#    fields read as sane floats. Chains rank by rescans survived (chain_rank
+#    in l8r_game.py); ones that keep failing are dropped.
+
+POINTER_MAP_BUDGET = 512 << 20 # Bytes of pointer map (~44M pointers)
+SNAPSHOT_CHUNK = 4 << 20 # Bytes per read while snapshotting
+MAX_DEPTH = 6 # Offsets per chain (the configured chain has 6)
+MAX_OFFSET = 0x1000 # Largest field offset followed per hop
+MAX_FRONTIER = 1 << 20 # Slots carried from one level to the next
+MAX_CHAINS = 5000 # Candidates kept from one scan
+DROP_AFTER_FAILS = 3 # Rescans a chain may fail (beyond its successes) before it's dropped
+SEARCH_SLICE = 1 << 16 # Frontier slots expanded per batch
+PARALLEL_MIN_FRONTIER = 1 << 14 # Smaller levels aren't worth the worker round trip
+TASKS_PER_WORKER = 4
+
+def slot_addresses(slots, bases, slot_starts):
+    # Snapshot slot indices -> addresses
+    region = np.searchsorted(slot_starts, slots, side="right") - 1
+    return bases[region] + (slots - slot_starts[region]) * np.uint64(8)
+
+class PointerMap:
+    def __init__(self, values, slots, bases, slot_starts, truncated=False, scanned=0):
+        self.values = values # Pointer values, sorted (uint64)
+        self.slots = slots # Where each one was read, as a snapshot slot index
+        self.bases = bases # Region bases (uint64, sorted)
+        self.slot_starts = slot_starts # First slot index of each region
+        self.truncated = truncated # Ran into the budget; pointers past that point are missing
+        self.scanned = scanned # Bytes read
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.slots.nbytes
+
+    @classmethod
+    def snapshot(cls, mem, budget=POINTER_MAP_BUDGET, chunk=SNAPSHOT_CHUNK):
+        regions = [(base, size & ~7) for base, size, prot in mem.regions() if size >= 8]
+        if not regions:
+            raise OSError("No readable memory (not attached?)")
+        bases = np.array([base for base, size in regions], dtype=np.uint64)
+        sizes = np.array([size for base, size in regions], dtype=np.uint64)
+        ends = bases + sizes
+        slot_starts = np.concatenate(([0], np.cumsum(sizes // np.uint64(8))[:-1])).astype(np.uint64)
+        total_slots = int(sizes.sum()) // 8
+        slot_dtype = np.uint32 if total_slots < 1 << 32 else np.uint64
+        limit = budget // (8 + np.dtype(slot_dtype).itemsize)
+
+        chunk &= ~7
+        buf = ctypes.create_string_buffer(chunk)
+        view = np.frombuffer(buf, dtype="<u8")
+        lowest, span = bases[0], ends[-1] - bases[0]
+        found_values, found_slots = [], []
+        count = scanned = 0
+        truncated = False
+        for r, (base, size) in enumerate(regions):
+            for offset in range(0, size, chunk):
+                n = min(chunk, size - offset)
+                if not mem.read_into(base + offset, buf, n): continue # Unreadable page in the range
+                scanned += n
+                words = view[:n // 8]
+                # lowest <= word < highest as one unsigned compare (smaller words wrap around)
+                hit = np.flatnonzero((words - lowest) < span)
+                if not hit.size: continue
+                values = words[hit]
+                inside = ((values & np.uint64(7)) == 0) & (values < ends[np.searchsorted(bases, values, side="right") - 1])
+                hit, values = hit[inside], values[inside]
+                if count + len(values) > limit:
+                    hit, values = hit[:limit - count], values[:limit - count]
+                    truncated = True
+                found_values.append(values)
+                found_slots.append((hit.astype(np.uint64) + (slot_starts[r] + np.uint64(offset // 8))).astype(slot_dtype))
+                count += len(values)
+                if truncated: break
+            if truncated: break
+
+        values = np.concatenate(found_values) if found_values else np.empty(0, np.uint64)
+        slots = np.concatenate(found_slots) if found_slots else np.empty(0, slot_dtype)
+        del found_values, found_slots
+        order = np.argsort(values)
+        return cls(values[order], slots[order], bases, slot_starts, truncated, scanned)
+
+def _closest(parent, found, offsets):
+    # One entry per slot address: the one with the smallest offset
+    if not len(found): return parent, found, offsets
+    lowest = found.min()
+    bits = int(offsets.max()).bit_length()
+    if int(found.max() - lowest).bit_length() + bits <= 64:
+        # Address and offset packed into one key: a single sort instead of lexsort's two passes
+        order = np.argsort(((found - lowest) << np.uint64(bits)) | offsets)
+    else:
+        order = np.lexsort((offsets, found))
+    parent, found, offsets = parent[order], found[order], offsets[order]
+    first = np.ones(len(found), dtype=bool)
+    first[1:] = found[1:] != found[:-1]
+    return parent[first], found[first], offsets[first]
+
+def _referrers(values, slots, bases, slot_starts, frontier, max_offset, start=0):
+    # Every slot holding a value in [s - max_offset, s] for a frontier slot s,
+    # as (frontier index + start, slot address, offset = s - value), one entry
+    # per slot. Done SEARCH_SLICE frontier slots at a time: a dense heap can
+    # have thousands of candidates per frontier slot before deduplication.
+    parts = []
+    for lo in range(0, len(frontier), SEARCH_SLICE):
+        part = frontier[lo:lo + SEARCH_SLICE]
+        low = np.where(part > max_offset, part - np.uint64(max_offset), np.uint64(0))
+        first = np.searchsorted(values, low, side="left")
+        counts = np.searchsorted(values, part, side="right") - first
+        parent = np.repeat(np.arange(len(part)), counts)
+        index = first[parent] + (np.arange(len(parent)) - (np.cumsum(counts) - counts)[parent])
+        parts.append(_closest(parent + (start + lo), slot_addresses(slots[index], bases, slot_starts),
+                              part[parent] - values[index]))
+    if not parts:
+        return np.empty(0, np.int64), np.empty(0, np.uint64), np.empty(0, np.uint64)
+    return _closest(*(np.concatenate(column) for column in zip(*parts))) if len(parts) > 1 else parts[0]
+
+# --- Pool workers ---------------------------------------------------------------
+
+_worker_map = None # (block names, shared blocks, values, slots) in a pool worker
+
+def _attach_map(names, count, slot_dtype):
+    global _worker_map
+    if _worker_map is None or _worker_map[0] != names:
+        if _worker_map is not None:
+            blocks = _worker_map[1]
+            _worker_map = None # Drop the array views first so the blocks can close
+            for block in blocks:
+                block.close()
+        blocks = [attach_shared_memory(name) for name in names] # Owned and unlinked by the parent
+        _worker_map = (names, blocks, np.ndarray(count, np.uint64, blocks[0].buf),
+                       np.ndarray(count, slot_dtype, blocks[1].buf))
+    return _worker_map[2], _worker_map[3]
+
+def _referrers_task(names, count, slot_dtype, bases, slot_starts, frontier, max_offset, start):
+    values, slots = _attach_map(names, count, slot_dtype)
+    return _referrers(values, slots, bases, slot_starts, frontier, max_offset, start)
+
+class PointerScanner:
+    # Same pool-and-shared-block approach as ParallelSignatureScanner: both
+    # live between searches, so rescanning a map doesn't pay for them again
+    def __init__(self, workers=0):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.shared = None # (map, blocks) while a map is exported to the workers
+        self.level_sizes = [] # Frontier size per level of the last search
+        self.last_duration = 0.0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        self._release()
+
+    def search(self, pmap, target, module_base, module_size, depth=MAX_DEPTH, max_offset=MAX_OFFSET,
+               max_chains=MAX_CHAINS):
+        # Candidate chains to `target`, rooted in [module_base, module_base +
+        # module_size): [{"root", "offsets", "checks", "hits"}], shortest first
+        t0 = time.perf_counter()
+        module_end = module_base + module_size
+        frontier = np.array([target], dtype=np.uint64)
+        seen = np.empty(0, dtype=np.uint64)
+        history = [] # (parent, offsets) of each level's frontier, to walk chains back
+        chains = []
+        self.level_sizes = []
+        for level in range(depth + 1):
+            # Level 0 wants the target itself: resolve_chain ends on a pointer, not pointer + offset
+            parent, found, offsets = self._expand(pmap, frontier, max_offset if level else 0)
+            if seen.size and found.size:
+                index = np.minimum(np.searchsorted(seen, found), len(seen) - 1)
+                fresh = seen[index] != found
+                parent, found, offsets = parent[fresh], found[fresh], offsets[fresh]
+
+            root = (found >= np.uint64(module_base)) & (found < np.uint64(module_end))
+            for i in np.flatnonzero(root)[:max_chains - len(chains)]:
+                chains.append({"root": int(found[i]) - module_base, "checks": 0, "hits": 0,
+                               "offsets": self._walk(history, level, int(parent[i]), int(offsets[i]))})
+            seen = np.union1d(seen, found)
+            parent, found, offsets = parent[~root], found[~root], offsets[~root]
+            if len(found) > MAX_FRONTIER:
+                keep = np.sort(np.argsort(offsets, kind="stable")[:MAX_FRONTIER])
+                parent, found, offsets = parent[keep], found[keep], offsets[keep]
+            history.append((parent, offsets))
+            frontier = found
+            self.level_sizes.append(len(found))
+            if len(chains) >= max_chains or not len(frontier): break
+        self.last_duration = time.perf_counter() - t0
+        chains.sort(key=chain_rank)
+        return chains
+
+    def _walk(self, history, level, parent, offset):
+        # Offsets of a root found at `level`, from the root down to the slot
+        # holding the target (whose own offset is 0 and isn't part of the chain)
+        if level == 0: return []
+        offsets = [offset]
+        for k in range(level - 1, 0, -1):
+            parents, level_offsets = history[k]
+            offsets.append(int(level_offsets[parent]))
+            parent = int(parents[parent])
+        return offsets
+
+    def _expand(self, pmap, frontier, max_offset):
+        if self.workers <= 1 or len(frontier) < PARALLEL_MIN_FRONTIER:
+            return _referrers(pmap.values, pmap.slots, pmap.bases, pmap.slot_starts, frontier, max_offset)
+        names = self._share(pmap)
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor # Imported on first use
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        step = -(-len(frontier) // (self.workers * TASKS_PER_WORKER))
+        futures = [self.pool.submit(_referrers_task, names, len(pmap), pmap.slots.dtype, pmap.bases,
+                                    pmap.slot_starts, frontier[lo:lo + step], max_offset, lo)
+                   for lo in range(0, len(frontier), step)]
+        parts = [future.result() for future in futures]
+        return _closest(*(np.concatenate(column) for column in zip(*parts)))
+
+    def _share(self, pmap):
+        # Copy the map into shared memory once; workers map it by name
+        if self.shared is None or self.shared[0] is not pmap:
+            from multiprocessing import shared_memory
+            self._release()
+            blocks = []
+            for array in (pmap.values, pmap.slots):
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                np.ndarray(array.shape, array.dtype, block.buf)[:] = array
+                blocks.append(block)
+            self.shared = (pmap, blocks)
+        return tuple(block.name for block in self.shared[1])
+
+    def _release(self):
+        if self.shared is not None:
+            for block in self.shared[1]:
+                block.close()
+                block.unlink()
+            self.shared = None
+
+# --- Rescans --------------------------------------------------------------------
+
+def plausible_player(mem, plan, address):
+    # Velocity fields read back as sane floats (for rescans without a known address)
+    fields = plan.read(mem, address) if address else None
+    if not fields: return False
+    if not all(math.isfinite(v) and (v == 0.0 or abs(v) > 1e-20) for v in fields): return False
+    return math.sqrt(sum(v * v for v in fields)) < MAX_SPEED
+
+def rescan(mem, chains, module_base, target=None):
+    # One more check for every chain; returns how many survived it
+    plan = ReadPlan(PLAYER_FIELDS)
+    alive = 0
+    for chain in chains:
+        address = mem.resolve_chain(module_base + chain["root"], chain["offsets"])
+        ok = address == target if target else plausible_player(mem, plan, address)
+        chain["checks"] += 1
+        chain["hits"] += ok
+        alive += ok
+    return alive
+
+def merge_chains(old, new):
+    # New scan results, keeping the rescan history of chains seen before
+    known = {(c["root"], tuple(c["offsets"])): c for c in old}
+    merged = {key: dict(c) for key, c in known.items()}
+    for c in new:
+        merged.setdefault((c["root"], tuple(c["offsets"])), c)
+    return sorted(merged.values(), key=chain_rank)
+
+def format_chain(chain, module_name=BASE_MODULE):
+    path = " -> ".join(f"{o:X}" for o in chain["offsets"])
+    score = f"{chain['hits']}/{chain['checks']}" if chain["checks"] else "new"
+    return f'"{module_name}"+{chain["root"]:X}' + (f" -> {path}" if path else "") + f"   [{score}]"
+
+# --- Command line ---------------------------------------------------------------
+
+def _attach(parser, mem):
+    if not mem.attach(PROCESS_NAME):
+        parser.exit(1, f"{PROCESS_NAME} is not running\n")
+    base, size = mem.get_module(BASE_MODULE)
+    if not base:
+        parser.exit(1, f"{BASE_MODULE} not loaded in {PROCESS_NAME}\n")
+    return base, size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find and rank pointer chains to the player object")
+    parser.add_argument("--file", default=POINTER_CHAINS_FILE, help="candidate chains (default: pointer_chains.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan = commands.add_parser("scan", help="snapshot the game and search for chains to ADDRESS")
+    scan.add_argument("address", type=lambda x: int(x, 0), help="player object address, e.g. 0x1D400006000")
+    scan.add_argument("--depth", type=int, default=MAX_DEPTH, help=f"offsets per chain (default: {MAX_DEPTH})")
+    scan.add_argument("--max-offset", type=lambda x: int(x, 0), default=MAX_OFFSET,
+                      help=f"largest offset per hop (default: 0x{MAX_OFFSET:X})")
+    scan.add_argument("--workers", type=int, default=0, help="search processes (default: one per CPU core)")
+    scan.add_argument("--budget-mb", type=int, default=POINTER_MAP_BUDGET >> 20, help="pointer map memory limit")
+    again = commands.add_parser("rescan", help="check the saved chains again (after a restart, respawn, ...)")
+    again.add_argument("address", nargs="?", type=lambda x: int(x, 0), help="player address now, if known")
+    again.add_argument("--rounds", type=int, default=1, help="checks to run (default: 1)")
+    again.add_argument("--interval", type=float, default=1.0, help="seconds between rounds")
+    show = commands.add_parser("list", help="show the saved chains, best first")
+    show.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    chains = load_pointer_chains(args.file)
+    if args.command == "list":
+        for chain in chains[:args.top]:
+            print(format_chain(chain))
+        print(f"{len(chains)} chains in {args.file}")
+        return 0
+    if np is None:
+        parser.exit(1, "The pointer scanner needs numpy (pip install numpy)\n")
+
+    mem = MemoryReader()
+    module_base, module_size = _attach(parser, mem)
+    if args.command == "scan":
+        t0 = time.perf_counter()
+        pmap = PointerMap.snapshot(mem, args.budget_mb << 20)
+        elapsed = time.perf_counter() - t0
+        print(f"Snapshot: {pmap.scanned / (1 << 20):.0f} MB read in {elapsed:.1f} s, {len(pmap)} pointers, "
+              f"map {pmap.nbytes / (1 << 20):.0f} MB" + ("  (budget reached: map is incomplete)" if pmap.truncated else ""))
+        scanner = PointerScanner(args.workers)
+        try:
+            found = scanner.search(pmap, args.address, module_base, module_size, args.depth, args.max_offset)
+        finally:
+            scanner.close()
+        rescan(mem, found, module_base, args.address) # Memory moved on since the snapshot
+        found = [c for c in found if c["hits"]]
+        print(f"Search: {scanner.last_duration:.2f} s, frontier per level {scanner.level_sizes}, {len(found)} chains")
+        chains = merge_chains(chains, found)
+    else:
+        for i in range(args.rounds):
+            if i: time.sleep(args.interval)
+            alive = rescan(mem, chains, module_base, args.address)
+            print(f"Rescan {i + 1}: {alive} of {len(chains)} chains reach the player")
+        chains = [c for c in chains if c["checks"] - c["hits"] < DROP_AFTER_FAILS]
+    mem.close()
+
+    chains.sort(key=chain_rank)
+    try:
+        save_pointer_chains(args.file, chains)
+    except OSError as e:
+        parser.exit(1, f"{e}\n")
+    for chain in chains[:10]:
+        print("  " + format_chain(chain))
+    print(f"{len(chains)} chains saved to {args.file}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+
+# ==============================================================================
+#  SESSION RECORDING
+# ==============================================================================
+#
+# File layout (little-endian):
+#   header   RECORD_HEADER: magic, version, record size, then the wall clock
+#            and perf_counter readings taken at the same instant, so sample
+#            times (perf_counter seconds) can be mapped to real dates
+#   records  RECORD: t as a double, vx/vy/vz as floats, back to back
+#
+# 20 bytes per sample. The game stores velocity as 32-bit floats, so the
+# floats are lossless, and speed isn't stored: it's sqrt(vx² + vy² + vz²) of
+# those same floats, recomputed exactly on load.
+#
+# SessionRecorder runs on the polling thread. record() packs into a
+# preallocated chunk, nothing else; full chunks (or every
+# RECORD_FLUSH_INTERVAL, so a crash loses little) are handed to a writer
+# thread through a SimpleQueue, and the writer gives them back for reuse.
+# The file is opened, written and closed only on the writer thread.
+
+RECORD_MAGIC = b"L8RSESS\x00"
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct("<8sHHIdd") # magic, version, record size, reserved, wall time, perf_counter
+RECORD = struct.Struct("<dfff") # t, vx, vy, vz
+RECORD_FIELDS = ("t", "vx", "vy", "vz")
+RECORD_CHUNK = 4096 # Records per chunk handed to the writer (80 KB, ~4 s at 1 kHz)
+RECORD_FLUSH_INTERVAL = 1.0 # Seconds; hand over partial chunks at least this often
+
+def session_filename(wall_time=None):
+    return time.strftime("session-%Y%m%d-%H%M%S.l8r", time.localtime(wall_time))
+
+class SessionRecorder:
+    def __init__(self, path, chunk_records=RECORD_CHUNK, flush_interval=RECORD_FLUSH_INTERVAL, clock=time.perf_counter):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.chunk_bytes = chunk_records * RECORD.size
+        self.chunk = bytearray(self.chunk_bytes)
+        self.offset = 0
+        self.spare = deque() # Chunks the writer has finished with (deque ops are thread-safe)
+        self.queue = queue.SimpleQueue() # (chunk, length), then None to finish
+        self.records = 0 # Samples recorded (polling thread)
+        self.bytes_written = 0 # Bytes on disk (writer thread)
+        self.error = None # Set by the writer if the file can't be written
+        self.closed = False
+
+        origin = clock()
+        header = RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, RECORD.size, 0, time.time(), origin)
+        self.next_flush = origin + flush_interval
+        self.thread = threading.Thread(target=self._writer, args=(header,), daemon=True)
+        self.thread.start()
+
+    def record(self, t, vx, vy, vz):
+        # Polling thread only; t is the sample's perf_counter time
+        if self.closed: return
+        RECORD.pack_into(self.chunk, self.offset, t, vx, vy, vz)
+        self.offset += RECORD.size
+        self.records += 1
+        if self.offset == self.chunk_bytes or t >= self.next_flush:
+            self._hand_off()
+            self.next_flush = t + self.flush_interval
+
+    def _hand_off(self):
+        if not self.offset: return
+        self.queue.put((self.chunk, self.offset))
+        self.chunk = self.spare.popleft() if self.spare else bytearray(self.chunk_bytes)
+        self.offset = 0
+
+    def close(self):
+        # Call from the thread that records (or once it has stopped); the
+        # writer finishes the file on its own, so this never waits on disk
+        if self.closed: return
+        self.closed = True
+        self._hand_off()
+        self.queue.put(None)
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def _writer(self, header):
+        f = None
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(self.path, "wb", buffering=0)
+            f.write(header)
+            self.bytes_written = len(header)
+            while True:
+                item = self.queue.get()
+                if item is None: break
+                chunk, length = item
+                f.write(memoryview(chunk)[:length])
+                self.bytes_written += length
+                self.spare.append(chunk)
+        except OSError as e:
+            self.error = str(e)
+            self.closed = True # Stop packing samples nobody will write
+        finally:
+            if f is not None:
+                f.close()
@@ -0,0 +1,296 @@
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError: # Optional; analysis falls back to struct unpacking (much slower)
+    np = None
+
+from l8r_peaks import PeakTracker
+from l8r_record import RECORD, RECORD_FIELDS, RECORD_HEADER, RECORD_MAGIC, RECORD_VERSION
+
+# ==============================================================================
+#  SESSION REPLAY AND ANALYSIS
+# ==============================================================================
+#
+# Recording maps a file written by SessionRecorder (l8r_record.py) read-only.
+# Opening one reads the 32-byte header and nothing else. With numpy the
+# records are a structured array straight over the mapping, so slicing a
+# multi-GB session costs only the pages actually touched.
+#
+#   python L8R_Velocity_Overlay.py --replay FILE [--speed 4|max]   # watch it
+#   python l8r_replay.py FILE [--threshold 20]                     # summarise it
+#
+# ReplaySource stands in for the game on the polling thread: each poll it
+# returns every sample the replay clock has passed, re-stamped onto the live
+# perf_counter clock, and poll_once pushes them into the SampleRing like live
+# samples, so update_ui, the history and the peak trackers can't tell a
+# replay from the game.
+
+REPLAY_BATCH = 4096 # Samples per poll when replaying as fast as possible
+ANALYSIS_CHUNK = 1 << 20 # Records per pass of the offline analysis (~20 MB mapped, ~40 MB of columns)
+MAX_GAP = 0.5 # Seconds; longer gaps between samples (game lost, paused) don't count as time spent
+
+RECORD_DTYPE = np.dtype([(name, "<f8" if name == "t" else "<f4") for name in RECORD_FIELDS]) if np is not None else None
+
+class _RecordTimes:
+    # Sequence over the time column without numpy (enough for bisect)
+    def __init__(self, recording):
+        self.map = recording.map
+        self.count = recording.count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return struct.unpack_from("<d", self.map, RECORD_HEADER.size + i * RECORD.size)[0]
+
+class Recording:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+        self.records = None
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if size < RECORD_HEADER.size:
+                raise ValueError(f"{path}: too short for a session recording")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, _, self.wall_time, self.origin = RECORD_HEADER.unpack_from(self.map)
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"{path}: not a session recording")
+            if version != RECORD_VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path}: unsupported recording version {version} ({record_size} B records)")
+        except Exception:
+            self.close()
+            raise
+        # A record torn by a crash mid-write is ignored
+        self.count = (size - RECORD_HEADER.size) // RECORD.size
+        if np is not None:
+            self.records = np.frombuffer(self.map, RECORD_DTYPE, self.count, RECORD_HEADER.size)
+            self.times = self.records["t"]
+        else:
+            self.times = _RecordTimes(self)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.records = self.times = None # Views must go before the mapping can close
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def duration(self):
+        return float(self.times[self.count - 1] - self.times[0]) if self.count > 1 else 0.0
+
+    def index_after(self, t):
+        # Number of records with time <= t
+        if np is not None:
+            return int(np.searchsorted(self.times, t, side="right"))
+        return bisect_right(self.times, t)
+
+    def columns(self, start=0, stop=None):
+        # (t, speed, vx, vy, vz) for records [start, stop), as float64 numpy
+        # arrays (array('d') without numpy). Speed is recomputed exactly as
+        # poll_once computed it from the same float32 velocities.
+        stop = self.count if stop is None else min(stop, self.count)
+        start = min(start, stop)
+        if np is not None:
+            rows = self.records[start:stop]
+            t, vx, vy, vz = (np.ascontiguousarray(rows[name], dtype=np.float64) for name in RECORD_FIELDS)
+            return t, np.sqrt(vx * vx + vy * vy + vz * vz), vx, vy, vz
+        offset = RECORD_HEADER.size + start * RECORD.size
+        rows = RECORD.iter_unpack(self.map[offset:offset + (stop - start) * RECORD.size])
+        t, vx, vy, vz = (array('d', column) for column in zip(*rows)) if stop > start else (array('d') for _ in RECORD_FIELDS)
+        speed = array('d', [math.sqrt(x*x + y*y + z*z) for x, y, z in zip(vx, vy, vz)])
+        return t, speed, vx, vy, vz
+
+def parse_speed(text):
+    # "1", "4", "0.5" -> multiplier; "max" (or 0) -> None, as fast as possible
+    if str(text).lower() in ("max", "0"):
+        return None
+    speed = float(text)
+    if not speed > 0:
+        raise ValueError(f"Replay speed must be positive or 'max', not {text!r}")
+    return speed
+
+class ReplaySource:
+    def __init__(self, recording, speed=1.0, batch=REPLAY_BATCH):
+        self.recording = recording
+        self.speed = speed # None = as fast as possible
+        self.batch = batch
+        self.index = 0 # Next record to push
+        self.start = None # Live clock when playback started
+        self.last = None # Live clock at the previous poll
+        self.first = float(recording.times[0]) if len(recording) else 0.0
+        self.period = recording.duration() / (len(recording) - 1) if len(recording) > 1 else 0.0 # Recorded sample spacing
+        self.status = "Replay loading..."
+
+    def done(self):
+        return self.index >= len(self.recording)
+
+    def poll(self, now, room):
+        # Polling thread: (t, speed, vx, vy, vz) the replay clock has reached,
+        # at most `room` samples, or None
+        rec = self.recording
+        if self.done():
+            self.status = f"Replay finished ({rec.duration():.1f} s)"
+            return None
+        first_poll = self.start is None
+        if first_poll:
+            self.start = self.last = now
+        if self.speed:
+            stop = min(rec.index_after(self.first + (now - self.start) * self.speed), self.index + max(room, 0))
+        else:
+            stop = min(self.index + self.batch, self.index + max(room, 0), len(rec))
+        batch = None
+        if stop > self.index:
+            if first_poll and not self.speed:
+                # No previous poll to spread the first batch from: give it
+                # the recording's own spacing, ending now
+                self.last = now - (stop - self.index) * self.period
+            batch = rec.columns(self.index, stop)
+            self.index = stop
+            position = batch[0][-1] - self.first
+            label = f"{self.speed:g}x" if self.speed else "max"
+            self.status = f"Linked to replay ({label}): {position:.1f} / {rec.duration():.1f} s"
+            batch = (self._restamp(batch[0], now),) + batch[1:]
+        self.last = now
+        return batch
+
+    def _restamp(self, t, now):
+        # Recording time -> live clock. At a fixed speed the replay clock
+        # maps it; at max speed the batch is spread over the time since the
+        # last poll, which keeps timestamps increasing.
+        n = len(t)
+        if self.speed:
+            start, first, scale = self.start, self.first, 1.0 / self.speed
+            if np is not None:
+                return start + (t - first) * scale
+            return array('d', [start + (x - first) * scale for x in t])
+        step = (now - self.last) / n
+        if np is not None:
+            return self.last + step * np.arange(1, n + 1)
+        return array('d', [self.last + step * (i + 1) for i in range(n)])
+
+# --- Offline analysis -----------------------------------------------------------
+
+def analyze(recording, threshold=20.0, spacing=2.0, bin_width=1.0, chunk=ANALYSIS_CHUNK):
+    # One streaming pass, `chunk` records at a time. Peaks follow the graph
+    # rule (PeakTracker: local maxima, `spacing` apart, higher one wins).
+    tracker = PeakTracker(spacing, 0.0)
+    top_speed, top_time = None, None
+    time_above = 0.0
+    counts = np.zeros(0, dtype=np.int64) if np is not None else []
+    prev_t = prev_speed = None
+    for start in range(0, len(recording), chunk):
+        t, speed = recording.columns(start, start + chunk)[:2]
+        tracker.feed(t, speed)
+        tracker.advance(t[-1])
+        if np is not None:
+            i = int(np.argmax(speed))
+            if top_speed is None or speed[i] > top_speed:
+                top_speed, top_time = float(speed[i]), float(t[i])
+            binned = np.bincount((speed / bin_width).astype(np.int64))
+            if len(binned) > len(counts):
+                binned[:len(counts)] += counts
+                counts = binned
+            else:
+                counts[:len(binned)] += binned
+            # Each sample holds until the next one
+            if prev_t is not None:
+                t, speed = np.concatenate(([prev_t], t)), np.concatenate(([prev_speed], speed))
+            dt = np.diff(t)
+            time_above += float(dt[(speed[:-1] > threshold) & (dt <= MAX_GAP)].sum())
+        else:
+            for x, s in zip(t, speed):
+                if top_speed is None or s > top_speed:
+                    top_speed, top_time = s, x
+                if prev_t is not None and prev_speed > threshold and x - prev_t <= MAX_GAP:
+                    time_above += x - prev_t
+                prev_t, prev_speed = x, s
+                b = int(s / bin_width)
+                if b >= len(counts): counts.extend([0] * (b + 1 - len(counts)))
+                counts[b] += 1
+        prev_t, prev_speed = float(t[-1]), float(speed[-1])
+    return {
+        "samples": len(recording),
+        "duration": recording.duration(),
+        "top_speed": top_speed,
+        "top_time": top_time,
+        "time_above": time_above,
+        "threshold": threshold,
+        "peaks": list(zip(tracker.sel_t, tracker.sel_v)),
+        "bin_width": bin_width,
+        "histogram": [int(c) for c in counts],
+    }
+
+def format_offset(seconds):
+    minutes, seconds = divmod(seconds, 60.0)
+    return f"{int(minutes):3d}:{seconds:05.2f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a recorded L8R session")
+    parser.add_argument("file", help="recording written by the overlay (sessions/*.l8r)")
+    parser.add_argument("--threshold", type=float, default=20.0, help="speed (m/s) for 'time above'")
+    parser.add_argument("--spacing", type=float, default=2.0, help="minimum seconds between peaks (Top Speed Update)")
+    parser.add_argument("--bin-width", type=float, default=1.0, help="speed histogram bin width (m/s)")
+    parser.add_argument("--peaks", type=int, default=10, help="how many of the highest peaks to list")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        recording = Recording(args.file)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{e}\n")
+    opened = time.perf_counter() - t0
+    with recording:
+        size_mb = os.path.getsize(args.file) / (1024 * 1024)
+        print(f"{args.file}: {len(recording)} samples, {recording.duration():.1f} s, {size_mb:.1f} MB "
+              f"(opened in {opened * 1000:.2f} ms)")
+        print(f"  recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(recording.wall_time))}")
+        if not len(recording):
+            return
+        t0 = time.perf_counter()
+        result = analyze(recording, args.threshold, args.spacing, args.bin_width)
+        elapsed = time.perf_counter() - t0
+        first = float(recording.times[0])
+
+    print(f"  analysed in {elapsed:.2f} s ({result['samples'] / elapsed / 1e6:.1f} M samples/s)")
+    print(f"  top speed: {result['top_speed']:.2f} m/s at {format_offset(result['top_time'] - first)}")
+    share = result['time_above'] / result['duration'] if result['duration'] else 0.0
+    print(f"  above {args.threshold:g} m/s: {result['time_above']:.1f} s ({share:.0%})")
+
+    peaks = result["peaks"]
+    highest = sorted(sorted(peaks, key=lambda p: -p[1])[:args.peaks])
+    print(f"  peaks ({args.spacing:g} s apart): {len(peaks)}, highest {len(highest)}:")
+    for t, v in highest:
+        print(f"    {format_offset(t - first)}  {v:8.2f} m/s")
+
+    counts = result["histogram"]
+    total = sum(counts) or 1
+    widest = max(counts) or 1
+    print(f"  speed histogram ({args.bin_width:g} m/s bins):")
+    for b, c in enumerate(counts):
+        if not c: continue
+        lo = b * args.bin_width
+        bar = "#" * max(1, round(40 * c / widest))
+        print(f"    {lo:6.1f}-{lo + args.bin_width:<6.1f} {c / total:6.1%}  {bar}")
+
+if __name__ == "__main__":
+    sys.exit(main())
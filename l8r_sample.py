@@ -0,0 +1,252 @@
+import argparse
+import math
+import sys
+import time
+
+from l8r_game import (MAX_SPEED, PLAYER_FIELDS, POINTER_CHAINS_FILE, PROCESS_NAME, SCAN_WORKERS, SIGNATURE_CACHE_FILE,
+                      ChainCache, load_fallback_chains)
+from l8r_kinematics import KINEMATIC_FIELDS, SMOOTHING_MODES, Kinematics
+from l8r_memory import MemoryReader, ReadPlan
+from l8r_record import RECORD, RECORD_HEADER, RECORD_MAGIC, RECORD_VERSION
+from l8r_sampling import PrecisionScheduler
+from l8r_watch import AttachWatcher
+
+# ==============================================================================
+#  HEADLESS SAMPLER
+# ==============================================================================
+#
+# The overlay's attach -> resolve -> read path without the overlay: no
+# tkinter, no graphs, no numpy. For rigs that only want the numbers.
+#
+#   python l8r_sample.py --rate 1 > run.ndjson              # 1 kHz, NDJSON to stdout
+#   python l8r_sample.py --rate 0 --format csv -o run.csv   # as fast as the game can be read
+#   python l8r_sample.py --format bin -o run.l8r --duration 60
+#
+# Formats:
+#   ndjson  one {"t": ..., "speed": ..., ...} object per line
+#   csv     header row, then one row per sample
+#   bin     the session recording format (l8r_record.py), so l8r_replay.py and
+#           --replay read it directly; t, vx, vy, vz only (derived fields are
+#           recomputed on load)
+# In the text formats t is seconds since the sampler started, and --derived
+# adds h_speed, accel and jerk (l8r_kinematics.py).
+#
+# Samples are written into an OUTPUT_BUFFER-sized buffer, so the disk or pipe
+# sees a few large writes; a partial buffer is pushed out every
+# OUTPUT_FLUSH_INTERVAL so a reader on the other end of a pipe isn't starved.
+# Status messages go to stderr, never into the data.
+
+OUTPUT_FORMATS = ("ndjson", "csv", "bin")
+OUTPUT_BUFFER = 1 << 20 # Bytes
+OUTPUT_FLUSH_INTERVAL = 1.0 # Seconds
+LINK_RETRY = 0.05 # Seconds between attach / resolve attempts while the game isn't linked
+
+class SampleWriter:
+    def __init__(self, f, fmt="ndjson", derived=False, origin=0.0):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        self.f = f
+        self.format = fmt
+        self.derived = derived and fmt != "bin"
+        self.origin = origin # perf_counter time that becomes t = 0 in the text formats
+        self.fields = ("t", "speed", "vx", "vy", "vz") + (KINEMATIC_FIELDS if self.derived else ())
+        self.write = getattr(self, "_write_" + fmt) # write(t, speed, vx, vy, vz[, h_speed, accel, jerk])
+
+    def begin(self):
+        if self.format == "bin":
+            self.f.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, RECORD.size, 0, time.time(), self.origin))
+        elif self.format == "csv":
+            self.f.write((",".join(self.fields) + "\n").encode())
+
+    def flush(self):
+        self.f.flush()
+
+    def _write_ndjson(self, t, speed, vx, vy, vz, *derived):
+        line = f'{{"t":{t - self.origin:.6f},"speed":{speed:.7g},"vx":{vx:.7g},"vy":{vy:.7g},"vz":{vz:.7g}'
+        if self.derived:
+            h_speed, accel, jerk = derived
+            line += f',"h_speed":{h_speed:.7g},"accel":{accel:.7g},"jerk":{jerk:.7g}'
+        self.f.write((line + "}\n").encode())
+
+    def _write_csv(self, t, speed, vx, vy, vz, *derived):
+        line = f"{t - self.origin:.6f},{speed:.7g},{vx:.7g},{vy:.7g},{vz:.7g}"
+        if self.derived:
+            h_speed, accel, jerk = derived
+            line += f",{h_speed:.7g},{accel:.7g},{jerk:.7g}"
+        self.f.write((line + "\n").encode())
+
+    def _write_bin(self, t, speed, vx, vy, vz, *derived):
+        self.f.write(RECORD.pack(t, vx, vy, vz))
+
+class HeadlessSampler:
+    def __init__(self, mem, writer, period=0.001, smoothing=None, log=None, clock=time.perf_counter,
+                 fallback_chains=(), watcher=None):
+        # period 0 samples back to back; smoothing None skips the derived fields;
+        # fallback_chains as for ChainCache; watcher: a started AttachWatcher,
+        # or None to look for the game inline
+        self.mem = mem
+        self.watcher = watcher
+        self.writer = writer
+        self.chain = ChainCache(mem, fallback_chains=fallback_chains)
+        self.plan = ReadPlan(PLAYER_FIELDS)
+        self.scheduler = PrecisionScheduler(period, clock) if period > 0 else None
+        self.kinematics = Kinematics(smoothing) if smoothing and writer.derived else None
+        self.log = log # log(message) on every status change, or None
+        self.clock = clock
+        self.attached = False
+        self.status = ""
+        self.samples = 0
+        self.first_sample = None # Clock time of the first sample written
+        self.running = True
+
+    def set_status(self, status):
+        if status != self.status:
+            self.status = status
+            if self.log is not None:
+                self.log(status)
+
+    def run(self, duration=None, count=None):
+        # Until `duration` seconds have passed, `count` samples are written or
+        # self.running goes False
+        clock = self.clock
+        scheduler = self.scheduler
+        writer = self.writer
+        write = writer.write
+        kinematics = self.kinematics
+        deadline = clock() + duration if duration else None
+        next_flush = clock() + OUTPUT_FLUSH_INTERVAL
+        if scheduler is not None:
+            scheduler.begin_timer_period()
+            scheduler.reset()
+        try:
+            while self.running:
+                now = scheduler.wait() if scheduler is not None else clock()
+                if deadline is not None and now >= deadline: break
+                try:
+                    address = self.link(now)
+                    if not address:
+                        if self.watcher is not None:
+                            self.watcher.posted.wait(LINK_RETRY) # Wakes as soon as the game shows up
+                        else:
+                            time.sleep(LINK_RETRY)
+                        if scheduler is not None: scheduler.reset()
+                        continue
+                    fields = self.plan.read(self.mem, address)
+                except Exception as e:
+                    self.attached = self.attached and self.watcher is not None # Attach state belongs to the watcher
+                    self.chain.reset()
+                    self.set_status(f"Error reading memory: {e}")
+                    time.sleep(1)
+                    if scheduler is not None: scheduler.reset()
+                    continue
+                if fields:
+                    vx, vy, vz = fields
+                    speed = math.sqrt(vx*vx + vy*vy + vz*vz)
+                if not fields or not speed < MAX_SPEED:
+                    # Unreadable or garbage velocity means the cached chain went stale
+                    self.chain.discard()
+                    continue
+                if kinematics is None:
+                    write(now, speed, vx, vy, vz)
+                else:
+                    write(now, speed, vx, vy, vz, *kinematics.update(now, vx, vy, vz))
+                self.samples += 1
+                if self.first_sample is None:
+                    self.first_sample = now
+                    writer.flush() # Let whoever is waiting on the pipe see the stream start
+                if count and self.samples >= count: break
+                if now >= next_flush:
+                    writer.flush()
+                    next_flush = now + OUTPUT_FLUSH_INTERVAL
+        finally:
+            if scheduler is not None:
+                scheduler.end_timer_period()
+            writer.flush()
+
+    def link(self, now):
+        # Player address, attaching and resolving as needed (0 while not linked)
+        watcher = self.watcher
+        if watcher is not None:
+            if watcher.events:
+                attached = watcher.apply(self.mem)
+                if attached is not None:
+                    self.attached = attached
+                    self.chain.new_process()
+            if not self.attached:
+                self.set_status(watcher.status)
+                return 0
+        elif not self.attached:
+            if not self.mem.attach(PROCESS_NAME):
+                self.set_status("Game not found...")
+                return 0
+            self.attached = True
+            self.chain.new_process()
+        address = self.chain.get(now)
+        self.set_status(self.chain.status)
+        return address
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sample L8R SK8R velocity without the overlay")
+    parser.add_argument("--rate", type=float, default=1.0, help="ms between samples, 0 = as fast as possible (default: 1)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="ndjson", help="output format (default: ndjson)")
+    parser.add_argument("-o", "--output", metavar="FILE", help="write here instead of stdout")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--count", type=int, help="stop after this many samples")
+    parser.add_argument("--derived", action="store_true", help="add h_speed, accel and jerk (text formats)")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES, default="ema", help="accel/jerk smoothing for --derived")
+    parser.add_argument("--simulate", action="store_true", help="read a simulated game (l8r_sim.py) to try a pipeline out")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no status messages on stderr")
+    args = parser.parse_args(argv)
+    if args.rate < 0:
+        parser.error("--rate can't be negative")
+
+    fallback_chains = ()
+    if args.simulate:
+        from l8r_game import BASE_OFFSET, POINTER_OFFSETS
+        from l8r_sim import SimGame
+        mem = MemoryReader(SimGame(BASE_OFFSET, POINTER_OFFSETS, PLAYER_FIELDS), scan_workers=1)
+    else:
+        mem = MemoryReader(scan_workers=SCAN_WORKERS, signature_cache_file=SIGNATURE_CACHE_FILE)
+        fallback_chains = load_fallback_chains(POINTER_CHAINS_FILE)
+
+    try:
+        if args.output:
+            out = open(args.output, "wb", buffering=OUTPUT_BUFFER)
+        else:
+            out = open(sys.stdout.fileno(), "wb", buffering=OUTPUT_BUFFER, closefd=False)
+    except OSError as e:
+        parser.exit(1, f"{e}\n")
+    log = None if args.quiet else (lambda message: print(message, file=sys.stderr, flush=True))
+    writer = SampleWriter(out, args.format, args.derived, time.perf_counter())
+    watcher = AttachWatcher(mem.backend).start()
+    sampler = HeadlessSampler(mem, writer, args.rate / 1000.0, args.smoothing if args.derived else None, log,
+                              fallback_chains=fallback_chains, watcher=watcher)
+    started = time.perf_counter()
+    try:
+        writer.begin()
+        sampler.run(args.duration, args.count)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Reader went away (e.g. `| head`); nothing left to report to
+        sys.stderr.close()
+        return 0
+    finally:
+        try:
+            out.close()
+        except BrokenPipeError:
+            pass
+        watcher.stop()
+        mem.close()
+
+    elapsed = time.perf_counter() - started
+    if log is not None:
+        line = f"{sampler.samples} samples in {elapsed:.2f} s ({sampler.samples / max(elapsed, 1e-9):.0f}/s)"
+        if sampler.scheduler is not None:
+            st = sampler.scheduler.stats()
+            line += f", lateness p99 {st['jitter_p99_ms'] * 1000:.0f} us, missed {st['missed']}"
+        log(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import sys
+import time
+from array import array
+from collections import deque
+
+from l8r_kinematics import KINEMATIC_FIELDS
+
+# ==============================================================================
+#  SAMPLING THREAD HELPERS
+# ==============================================================================
+
+# --- Precision scheduler --------------------------------------------------------
+#
+# Paces the polling thread on absolute deadlines (deadline += period) instead
+# of sleeping a fixed amount after the work, so read time and timer slack no
+# longer add up into drift. It sleeps most of the way with time.sleep and then
+# spins on perf_counter for the last stretch. The spin margin adapts to how
+# far the OS tends to oversleep, so the spin costs microseconds, not a core.
+
+JITTER_WINDOW = 1000 # Recent ticks kept for jitter / rate statistics
+MAX_SPIN = 0.002 # Never spin longer than this before a deadline
+MIN_SPIN = 0.00005
+MAX_SPIN_FRACTION = 0.5
+
+class PrecisionScheduler:
+    def __init__(self, period, clock=time.perf_counter):
+        self.clock = clock
+        self.period = period
+        self.spin_margin = MIN_SPIN * 4
+        self.lateness = deque(maxlen=JITTER_WINDOW) # Seconds past each deadline at wake-up
+        self.ticks_window = deque(maxlen=JITTER_WINDOW) # Wake-up timestamps
+        self.ticks = 0
+        self.missed = 0 # Deadlines skipped because a tick ran more than a period late
+        self._timer_period = False
+        self.reset()
+
+    def reset(self):
+        # Start a fresh deadline train (after a stall, error back-off, etc.)
+        self.deadline = self.clock() + self.period
+
+    def set_period(self, period):
+        if period == self.period: return
+        self.period = period
+        self.reset()
+
+    def wait(self):
+        # Block until the next deadline; returns the wake-up time on self.clock
+        clock = self.clock
+        deadline = self.deadline
+        remaining = deadline - clock()
+        # Spin at most half a period so fast rates still sleep part of the time
+        margin = min(self.spin_margin, self.period * MAX_SPIN_FRACTION)
+        if remaining > margin:
+            requested = remaining - margin
+            t0 = clock()
+            time.sleep(requested)
+            # Track oversleep to size the spin margin (slow EMA, clamped)
+            oversleep = clock() - t0 - requested
+            margin = self.spin_margin * 0.9 + (oversleep * 1.5 + MIN_SPIN) * 0.1
+            self.spin_margin = min(MAX_SPIN, max(MIN_SPIN, margin))
+        now = clock()
+        while now < deadline:
+            now = clock()
+
+        late = now - deadline
+        self.lateness.append(late)
+        self.ticks_window.append(now)
+        self.ticks += 1
+        if late > self.period:
+            # Too far behind to catch up: count the skipped slots and resync
+            skipped = int(late / self.period)
+            self.missed += skipped
+            self.deadline = deadline + (skipped + 1) * self.period
+        else:
+            self.deadline = deadline + self.period
+        return now
+
+    def stats(self):
+        window = self.ticks_window
+        rate = (len(window) - 1) / (window[-1] - window[0]) if len(window) > 1 and window[-1] > window[0] else 0.0
+        late = sorted(self.lateness)
+        if late:
+            mean = sum(late) / len(late)
+            p99 = late[min(len(late) - 1, int(len(late) * 0.99))]
+            worst = late[-1]
+        else:
+            mean = p99 = worst = 0.0
+        return {
+            "target_hz": 1.0 / self.period if self.period else 0.0,
+            "rate_hz": rate,
+            "jitter_mean_ms": mean * 1000.0,
+            "jitter_p99_ms": p99 * 1000.0,
+            "jitter_max_ms": worst * 1000.0,
+            "missed": self.missed,
+            "ticks": self.ticks,
+        }
+
+    def begin_timer_period(self):
+        # Windows before 3.11 sleeps in 15.6 ms steps unless the timer resolution is raised
+        if sys.platform == "win32" and not self._timer_period:
+            try:
+                import ctypes
+                ctypes.windll.winmm.timeBeginPeriod(1)
+                self._timer_period = True
+            except (AttributeError, OSError):
+                pass
+
+    def end_timer_period(self):
+        if self._timer_period:
+            import ctypes
+            ctypes.windll.winmm.timeEndPeriod(1)
+            self._timer_period = False
+
+# --- Sample ring ----------------------------------------------------------------
+#
+# Hand-off from the polling thread to the Tk thread without a lock per sample.
+# One producer and one consumer share preallocated array('d') columns. The
+# producer writes a slot and then bumps `head`; the consumer copies every
+# slot between its cursor and `head` in one batch. Under the GIL an int
+# attribute store is atomic, so nothing else has to be synchronised.
+#
+# When the UI stalls, the producer keeps overwriting the oldest slots
+# (drop-oldest). The consumer notices on its next read, skips what was lost
+# and adds it to `dropped`, so memory never grows.
+#
+# extend() publishes a whole batch at once (replays push thousands of
+# samples per poll). It announces the slots it is about to overwrite in
+# `reserved` first, so the consumer can discard them like a half-written push.
+
+RING_FIELDS = ("t", "speed", "vx", "vy", "vz") + KINEMATIC_FIELDS
+
+class SampleRing:
+    def __init__(self, capacity=1 << 16, fields=RING_FIELDS):
+        if capacity & (capacity - 1):
+            raise ValueError("SampleRing capacity must be a power of two")
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.fields = fields
+        self.columns = [array('d', bytes(8 * capacity)) for _ in fields]
+        self.head = 0 # Samples ever written (producer only)
+        self.tail = 0 # Samples ever consumed or dropped (consumer only)
+        self.reserved = 0 # head + batch size while extend() is writing (producer only)
+        self.dropped = 0
+
+    def push(self, *values):
+        i = self.head & self.mask
+        for column, value in zip(self.columns, values):
+            column[i] = value
+        self.head += 1 # Publish after the slot is complete
+
+    def extend(self, batch):
+        # batch: one float64 buffer per field (array('d') or numpy arrays), all the same length
+        n = len(batch[0])
+        if not n: return
+        if n > self.capacity:
+            batch = tuple(values[n - self.capacity:] for values in batch)
+            n = self.capacity
+        self.reserved = self.head + n
+        lo = self.head & self.mask
+        first = min(n, self.capacity - lo)
+        for column, values in zip(self.columns, batch):
+            dest, src = memoryview(column), memoryview(values)
+            dest[lo:lo + first] = src[:first]
+            if first < n:
+                dest[:n - first] = src[first:]
+        self.head += n
+
+    def pending(self):
+        return self.head - self.tail
+
+    def consume(self):
+        # Everything since the last call as a tuple of array('d') columns (possibly empty)
+        head = self.head
+        start = max(self.tail, head - self.capacity)
+        batch = self._copy(start, head)
+
+        # Slots the producer lapped while we copied are garbage; drop them too.
+        # The +1 covers the slot it may be half way through writing right now,
+        # `reserved` a batch extend() may be half way through.
+        valid_from = max(self.head + 1, self.reserved) - self.capacity
+        if valid_from > start:
+            cut = min(valid_from, head) - start
+            batch = tuple(column[cut:] for column in batch)
+            start += cut
+        self.dropped += start - self.tail
+        self.tail = head
+        return batch
+
+    def _copy(self, start, end):
+        if end <= start:
+            return tuple(array('d') for _ in self.columns)
+        lo, hi = start & self.mask, end & self.mask
+        if lo < hi:
+            return tuple(column[lo:hi] for column in self.columns)
+        # Wrapped around the end of the buffer
+        return tuple(column[lo:] + column[:hi] for column in self.columns)
+
+# --- Display refresh ------------------------------------------------------------
+
+def monitor_refresh_rate():
+    # Primary monitor refresh rate in Hz, or None if it can't be determined
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        VREFRESH = 116
+        user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+        hdc = user32.GetDC(0)
+        try:
+            hz = gdi32.GetDeviceCaps(hdc, VREFRESH)
+        finally:
+            user32.ReleaseDC(0, hdc)
+    except (AttributeError, OSError):
+        return None
+    return hz if hz > 1 else None # 0 / 1 mean "hardware default"
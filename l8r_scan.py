@@ -0,0 +1,545 @@
+import ctypes
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import weakref
+
+# ==============================================================================
+#  AOB SIGNATURE SCANNER
+# ==============================================================================
+#
+# Signatures use the Cheat Engine style "48 8B 05 ?? ?? ?? ?? 48 8B 88".
+# They are compiled once and cached. Each one gets an "anchor": the run of
+# concrete bytes that is least likely to show up in x86-64 code. A plain
+# bytes.find() hunts for the anchor and the wildcard regex only runs at
+# those candidate sites. The module is streamed through one reusable
+# buffer, with enough overlap that no match gets split between chunks.
+
+SCAN_CHUNK_SIZE = 1 << 20 # 1 MB per read
+MAX_ANCHOR_LEN = 16
+PARALLEL_MIN_SIZE = 4 << 20 # Smaller modules aren't worth the worker round trip
+POOL_START_MIN_SIZE = 128 << 20 # workers=0: smallest module worth starting a pool for (~0.1 s)
+TASKS_PER_WORKER = 4 # Finer slices keep workers busy when some finish early
+
+# Bytes that show up constantly in x64 code (REX prefixes, mov/lea/call,
+# padding, small immediates). An anchor made of these gives too many
+# candidates, so they count for less when picking one.
+COMMON_CODE_BYTES = frozenset(bytes.fromhex(
+    "00 FF CC 90 48 49 4C 4D 8B 89 8D 0F 83 85 E8 E9 C3 24 44 45 40 41 74 75 01 08 10 20 C7 33"
+))
+
+_signature_cache = {}
+
+class Signature:
+    def __init__(self, pattern_str):
+        self.text = pattern_str
+        parts = pattern_str.split()
+        if not parts:
+            raise ValueError("Empty signature")
+
+        regex_parts = []
+        mask = [] # None for wildcard, int for concrete byte
+        for part in parts:
+            if part == '??' or part == '?':
+                regex_parts.append(b'.')
+                mask.append(None)
+            else:
+                byte = bytes.fromhex(part)
+                regex_parts.append(re.escape(byte))
+                mask.append(byte[0])
+        self.length = len(mask)
+        # DOTALL so a wildcard can also match 0x0A
+        self.regex = re.compile(b''.join(regex_parts), re.DOTALL)
+        self.anchor, self.anchor_offset = pick_anchor(mask)
+        # Split at the anchor: sre scans for the literal prefix of the tail in C,
+        # so candidates are found without a Python-level loop. The head (bytes
+        # before the anchor) is only checked at those candidates.
+        a = self.anchor_offset
+        self.tail_regex = re.compile(b''.join(regex_parts[a:]), re.DOTALL)
+        self.head_regex = re.compile(b''.join(regex_parts[:a]), re.DOTALL) if a else None
+
+    def __repr__(self):
+        return f"Signature({self.text!r}, anchor={self.anchor.hex(' ').upper()} @+{self.anchor_offset})"
+
+def pick_anchor(mask):
+    # Score every run of concrete bytes (rare bytes score 4, common ones 1)
+    # and keep the best. Longer runs win naturally; bytes.find() is faster
+    # with a longer needle anyway.
+    best, best_score, best_offset = b'', -1, 0
+    run_start = None
+    for i in range(len(mask) + 1):
+        concrete = i < len(mask) and mask[i] is not None
+        if concrete and run_start is None:
+            run_start = i
+        elif not concrete and run_start is not None:
+            run = bytes(mask[run_start:i])
+            # Long runs: slide a MAX_ANCHOR_LEN window and keep its best spot
+            for j in range(max(1, len(run) - MAX_ANCHOR_LEN + 1)):
+                piece = run[j:j + MAX_ANCHOR_LEN]
+                score = sum(1 if b in COMMON_CODE_BYTES else 4 for b in piece)
+                if score > best_score:
+                    best, best_score, best_offset = piece, score, run_start + j
+            run_start = None
+    return best, best_offset
+
+def compile_signature(pattern_str):
+    sig = _signature_cache.get(pattern_str)
+    if sig is None:
+        sig = Signature(pattern_str)
+        _signature_cache[pattern_str] = sig
+    return sig
+
+def find_in_buffer(buf, sig, start, end, min_end=0):
+    # Yield match offsets of sig inside buf[start:end]. Matches ending at or
+    # before min_end were already reported by the previous chunk.
+    if not sig.anchor:
+        # All wildcards: every position matches, nothing to anchor on
+        pos = max(start, min_end - sig.length + 1)
+        while pos + sig.length <= end:
+            yield pos
+            pos += 1
+        return
+
+    anchor_offset, length = sig.anchor_offset, sig.length
+    search = sig.tail_regex.search
+    head = sig.head_regex.match if sig.head_regex else None
+    # The tail can't start before the anchor position of the earliest viable hit
+    pos = max(start, min_end - length + 1) + anchor_offset
+    while True:
+        m = search(buf, pos, end)
+        if not m:
+            return
+        hit = m.start() - anchor_offset
+        if head is None or head(buf, hit):
+            yield hit
+        pos = m.start() + 1
+
+class SignatureScanner:
+    # Streams [base, base + size) through a single reusable buffer and
+    # resolves every signature in one pass over the module.
+    def __init__(self, chunk_size=SCAN_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.bytes_scanned = 0
+        self.last_duration = 0.0
+
+    def scan(self, reader, base, size, patterns, first_only=True):
+        # Returns {pattern: [addresses]} (a single address each when first_only)
+        sigs = [compile_signature(p) for p in patterns]
+        results = {sig.text: [] for sig in sigs}
+        if not sigs or not base or not size:
+            return results
+        overlap = max(sig.length for sig in sigs) - 1
+
+        t0 = time.perf_counter()
+        buf = bytearray(self.chunk_size + overlap)
+        # ctypes view into buf just past the carried-over tail, for read_into
+        target = (ctypes.c_char * self.chunk_size).from_buffer(buf, overlap)
+
+        pending = list(sigs)
+        carried = 0 # Valid bytes at buf[overlap - carried:overlap] from the previous chunk
+        offset = 0
+        while offset < size and pending:
+            n = min(self.chunk_size, size - offset)
+            if not reader.read_into(base + offset, target, n):
+                # Unreadable range (guard page / discarded section); restart the overlap
+                carried = 0
+                offset += n
+                continue
+            self.bytes_scanned += n
+
+            start = overlap - carried
+            end = overlap + n
+            still_pending = []
+            for sig in pending:
+                found = results[sig.text]
+                for hit in find_in_buffer(buf, sig, start, end, min_end=overlap):
+                    found.append(base + offset + hit - overlap)
+                    if first_only: break
+                if not (first_only and found):
+                    still_pending.append(sig)
+            pending = still_pending
+
+            # Carry the tail forward so matches straddling the boundary are seen
+            carried = min(overlap, carried + n)
+            if overlap:
+                buf[overlap - carried:overlap] = buf[end - carried:end]
+            offset += n
+
+        self.last_duration = time.perf_counter() - t0
+        return results
+
+# --- Parallel scanning ----------------------------------------------------------
+#
+# The module image is read once into a shared memory block. Worker processes
+# map the same block by name and scan address-ordered slices of it, so the
+# only things pickled are slice bounds and pattern strings. Slices overlap
+# by (longest signature - 1) bytes; a worker only reports hits that start
+# inside its own slice, so merging the slices in order gives sorted,
+# duplicate-free results.
+
+_worker_segments = {}
+
+def attach_shared_memory(name):
+    # Map a block another process created and will unlink, without
+    # registering it with the resource tracker. Before 3.13 every
+    # SharedMemory(name=...) registers, and pool workers report to the
+    # parent's tracker, whose registry is a set: a worker's REGISTER arriving
+    # after the parent's unlink leaves a stale entry (a "leaked
+    # shared_memory" warning and a second unlink at exit), and unregistering
+    # from the worker instead would drop the parent's own entry. So the
+    # block is opened without SharedMemory: track=False from 3.13, before
+    # that shm_open + mmap by hand (_MappedBlock). Windows has no tracker;
+    # the block lives until its last handle closes.
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if os.name == "nt":
+        return shared_memory.SharedMemory(name=name)
+    return _MappedBlock(name)
+
+class _MappedBlock:
+    # The parts of SharedMemory the workers use (name, size, buf, close)
+    def __init__(self, name):
+        import _posixshmem
+        import mmap
+        fd = _posixshmem.shm_open("/" + name, os.O_RDWR, mode=0o600)
+        try:
+            self.size = os.fstat(fd).st_size
+            self._mmap = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.name = name
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+            self._mmap.close()
+
+def _attach_shared(name):
+    shm = _worker_segments.get(name)
+    if shm is None:
+        for old in _worker_segments.values():
+            old.close()
+        _worker_segments.clear()
+        shm = attach_shared_memory(name) # The parent owns and unlinks the block
+        _worker_segments[name] = shm
+    return shm.buf
+
+def _scan_slice(shm_name, lo, hi, end, patterns, first_only):
+    buf = _attach_shared(shm_name)
+    out = []
+    for p in patterns:
+        hits = []
+        for hit in find_in_buffer(buf, compile_signature(p), lo, end):
+            if hit >= hi: break
+            hits.append(hit)
+            if first_only: break
+        out.append(hits)
+    return out
+
+class ParallelSignatureScanner:
+    # Same interface as SignatureScanner, spread over a process pool. The
+    # pool and shared block are kept between scans so a re-attach after a
+    # game restart doesn't pay for process startup again. close() releases
+    # them; finalizers do the same if the scanner is dropped or the
+    # interpreter exits first, so a block is never left behind in /dev/shm.
+    #
+    # workers=0 picks for itself: one worker per CPU core, and a pool is only
+    # started for a module of POOL_START_MIN_SIZE or more, where the split
+    # scan wins back the process startup. A 30 MB UnityPlayer.dll reads in
+    # ~25 ms in-process, less than the pool takes to start, so it stays
+    # in-process; so does everything on a single core.
+    def __init__(self, workers=0, chunk_size=SCAN_CHUNK_SIZE):
+        self.auto = not workers
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.serial = SignatureScanner(chunk_size)
+        self.pool = None
+        self.shm = None
+        self._pool_finalizer = None
+        self._shm_finalizer = None
+        self.bytes_scanned = 0
+        self.last_duration = 0.0
+
+    def use_pool(self, size):
+        if self.workers <= 1 or size < PARALLEL_MIN_SIZE: return False
+        return self.pool is not None or not self.auto or size >= POOL_START_MIN_SIZE
+
+    def scan(self, reader, base, size, patterns, first_only=True):
+        if not self.use_pool(size):
+            results = self.serial.scan(reader, base, size, patterns, first_only)
+            self.last_duration = self.serial.last_duration
+            return results
+
+        sigs = [compile_signature(p) for p in patterns]
+        results = {sig.text: [] for sig in sigs}
+        if not sigs or not base:
+            return results
+        overlap = max(sig.length for sig in sigs) - 1
+
+        t0 = time.perf_counter()
+        runs = self._load(reader, base, size)
+        tasks = []
+        for run_lo, run_hi in runs:
+            step = max(self.chunk_size, -(-size // (self.workers * TASKS_PER_WORKER)))
+            for lo in range(run_lo, run_hi, step):
+                hi = min(lo + step, run_hi)
+                tasks.append((lo, hi, min(hi + overlap, run_hi)))
+
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor # Imported on first use: ~25 ms nobody needs at startup
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._pool_finalizer = weakref.finalize(self, self.pool.shutdown, wait=False, cancel_futures=True)
+        texts = [sig.text for sig in sigs]
+        futures = [self.pool.submit(_scan_slice, self.shm.name, lo, hi, end, texts, first_only)
+                   for lo, hi, end in tasks]
+
+        # Futures are in address order, so appending keeps every list sorted
+        pending = set(texts)
+        for i, future in enumerate(futures):
+            for text, hits in zip(texts, future.result()):
+                if first_only and results[text]: continue
+                results[text].extend(base + h for h in hits)
+                if hits: pending.discard(text)
+            if first_only and not pending:
+                for rest in futures[i + 1:]:
+                    rest.cancel()
+                break
+
+        self.last_duration = time.perf_counter() - t0
+        return results
+
+    def _load(self, reader, base, size):
+        # Copy the module into the shared block; returns the readable [lo, hi) runs
+        if self.shm is None or self.shm.size < size:
+            self._release_shm()
+            from multiprocessing import shared_memory
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self._shm_finalizer = weakref.finalize(self, _unlink_shared, self.shm)
+        runs = []
+        for offset in range(0, size, self.chunk_size):
+            n = min(self.chunk_size, size - offset)
+            target = (ctypes.c_char * n).from_buffer(self.shm.buf, offset)
+            ok = reader.read_into(base + offset, target, n)
+            del target # Release the export so the block can be closed later
+            if not ok: continue
+            self.bytes_scanned += n
+            if runs and runs[-1][1] == offset:
+                runs[-1][1] = offset + n
+            else:
+                runs.append([offset, offset + n])
+        return runs
+
+    def _release_shm(self):
+        if self.shm is not None:
+            self._shm_finalizer() # Closes and unlinks, once
+            self.shm = None
+
+    def close(self):
+        if self.pool is not None:
+            self._pool_finalizer() # pool.shutdown(wait=False, cancel_futures=True), once
+            self.pool = None
+        self._release_shm()
+
+def _unlink_shared(shm):
+    shm.close()
+    shm.unlink()
+
+# --- Persistent signature cache -------------------------------------------------
+#
+# Game builds rarely change, so scan hits are stored on disk as module-relative
+# offsets, keyed by a fingerprint of the module (image size + PE header hash;
+# the header carries the link timestamp, checksum and section table). On the
+# next start a cached hit is confirmed with one small read of the signature
+# bytes instead of a full scan. A new fingerprint drops the module's entry.
+
+FINGERPRINT_BYTES = 4096
+
+def module_fingerprint(reader, base, size):
+    header = ctypes.create_string_buffer(FINGERPRINT_BYTES)
+    n = min(FINGERPRINT_BYTES, size)
+    if not n or not reader.read_into(base, header, n): return None
+    return f"{size:x}-{hashlib.sha1(header.raw[:n]).hexdigest()}"
+
+class SignatureCache:
+    def __init__(self, path):
+        self.path = path
+        self.entries = None # {module_name: {"fingerprint": str, "signatures": {pattern: offset}}}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def _save(self):
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass # Read-only install dir etc., just scan again next time
+
+    def lookup(self, module_name, fingerprint, reader, base, patterns):
+        # Returns {pattern: address} for cached hits that still verify
+        entry = self._load().get(module_name.lower())
+        found = {}
+        if not entry or not fingerprint or entry.get("fingerprint") != fingerprint:
+            self.misses += len(patterns)
+            return found
+        signatures = entry.get("signatures", {})
+        for p in patterns:
+            offset = signatures.get(p)
+            if offset is not None and self.verify(reader, base + offset, p):
+                found[p] = base + offset
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def verify(self, reader, address, pattern):
+        sig = compile_signature(pattern)
+        buf = ctypes.create_string_buffer(sig.length)
+        if not reader.read_into(address, buf, sig.length): return False
+        return sig.regex.match(buf.raw) is not None
+
+    def store(self, module_name, fingerprint, base, hits):
+        # hits: {pattern: address}; a different fingerprint evicts the old entry
+        if not fingerprint: return
+        entries = self._load()
+        key = module_name.lower()
+        entry = entries.get(key)
+        changed = False
+        if not entry or entry.get("fingerprint") != fingerprint:
+            entry = {"fingerprint": fingerprint, "signatures": {}}
+            entries[key] = entry
+            changed = True
+        for p, address in hits.items():
+            if address is not None and entry["signatures"].get(p) != address - base:
+                entry["signatures"][p] = address - base
+                changed = True
+        if changed:
+            self._save()
+
+class BufferReader:
+    # read_into() over a local bytes-like object, used for offline scans and benchmarks
+    def __init__(self, data, base=0x7FF000000000):
+        self.raw = (ctypes.c_char * len(data)).from_buffer_copy(data)
+        self.size = len(data)
+        self.base = base
+
+    def read_into(self, address, buf, size):
+        start = address - self.base
+        if start < 0 or start + size > self.size: return False
+        ctypes.memmove(buf, ctypes.addressof(self.raw) + start, size)
+        return True
+
+# --- Benchmark ----------------------------------------------------------------
+
+def make_code_like_buffer(size, seed=1234):
+    # Random bytes with x64-ish noise sprinkled in so common anchors get candidates
+    import random
+    rng = random.Random(seed)
+    data = bytearray(rng.randbytes(size))
+    for step, seq in ((16, b'\x48\x8B'), (64, b'\x48\x8B\x05'), (4096, b'\xCC' * 16)):
+        for pos in range(rng.randrange(step), size - len(seq), step):
+            data[pos:pos + len(seq)] = seq
+    return data
+
+def legacy_scan(reader, base, size, pattern_str):
+    # The original scan_pattern approach: read the whole image into one bytes
+    # object, rebuild the regex and search it, once per signature
+    buf = ctypes.create_string_buffer(size)
+    if not reader.read_into(base, buf, size): return None
+    data = buf.raw
+    regex_parts = []
+    for part in pattern_str.split():
+        if part == '??' or part == '?':
+            regex_parts.append(b'.')
+        else:
+            regex_parts.append(re.escape(bytes.fromhex(part)))
+    match = re.search(b''.join(regex_parts), data)
+    return base + match.start() if match else None
+
+def benchmark(size_mb=30, repeat=3):
+    size = size_mb * 1024 * 1024
+    data = make_code_like_buffer(size)
+    patterns = [
+        "48 8B 05 ?? ?? ?? ?? 48 8B 88 ?? ?? ?? ?? 48 85 C9",
+        "F3 0F 10 81 4C 02 00 00 ?? ?? F3 0F 10 89",
+        "0F 28 ?? ?? 0F 29 ?? ?? 8B 87 7C 02 00 00",
+        "?? ?? ?? 89 5C 24 ?? 57 48 83 EC 20 8B 81 4C 02",
+    ]
+    # Plant each signature near the end so every scan walks (almost) everything
+    for i, p in enumerate(patterns):
+        sig = bytes(0x90 if t in ('??', '?') else int(t, 16) for t in p.split())
+        pos = size - (i + 1) * 4096 - 123
+        data[pos:pos + len(sig)] = sig
+    reader = BufferReader(data)
+    mb = size / (1024 * 1024)
+
+    def best_of(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    print(f"Synthetic module: {mb:.0f} MB, {len(patterns)} signatures (times resolve all of them)")
+    for p in patterns:
+        t = best_of(lambda: legacy_scan(reader, reader.base, size, p))
+        print(f"  legacy, {p[:23]:23s}... : {t * 1000:8.1f} ms  {mb / t:8.1f} MB/s")
+    t = best_of(lambda: [legacy_scan(reader, reader.base, size, p) for p in patterns])
+    print(f"  legacy, all signatures (peak ~{2 * mb:.0f} MB) : {t * 1000:8.1f} ms  {mb / t:8.1f} MB/s")
+    for chunk in (256 * 1024, SCAN_CHUNK_SIZE, 4 * SCAN_CHUNK_SIZE):
+        scanner = SignatureScanner(chunk)
+        t = best_of(lambda: scanner.scan(reader, reader.base, size, patterns))
+        print(f"  streamed, {chunk // 1024:5d} KB chunks, single pass : {t * 1000:8.1f} ms  {mb / t:8.1f} MB/s")
+    for p in patterns:
+        print(f"    {compile_signature(p)!r}")
+
+def benchmark_parallel(size_mb=30, max_workers=0, repeat=3):
+    max_workers = max_workers or os.cpu_count() or 1
+    size = size_mb * 1024 * 1024
+    data = make_code_like_buffer(size)
+    # Worst case for a re-attach: the signature is near the very end
+    pattern = "?? ?? ?? 89 5C 24 ?? 57 48 83 EC 20 8B 81 4C 02"
+    sig = bytes(0x90 if t == '??' else int(t, 16) for t in pattern.split())
+    data[size - 4096:size - 4096 + len(sig)] = sig
+    reader = BufferReader(data)
+    mb = size / (1024 * 1024)
+
+    print(f"Parallel scan: {mb:.0f} MB, {os.cpu_count()} CPU(s) visible")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        scanner = ParallelSignatureScanner(workers) if workers > 1 else SignatureScanner()
+        t0 = time.perf_counter()
+        scanner.scan(reader, reader.base, size, [pattern])
+        cold = time.perf_counter() - t0
+        warm = float('inf')
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            scanner.scan(reader, reader.base, size, [pattern])
+            warm = min(warm, time.perf_counter() - t0)
+        if baseline is None: baseline = warm
+        print(f"  {workers:2d} worker(s): first scan {cold * 1000:8.1f} ms, "
+              f"re-attach {warm * 1000:8.1f} ms  {mb / warm:8.1f} MB/s  x{baseline / warm:.2f}")
+        if workers > 1: scanner.close()
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    benchmark(size_mb)
+    print()
+    benchmark_parallel(size_mb, int(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,197 @@
+import ctypes
+import math
+import struct
+import threading
+import time
+
+from l8r_scan import make_code_like_buffer
+
+# ==============================================================================
+#  SIMULATED GAME PROCESS
+# ==============================================================================
+#
+# SimGame is an in-process stand-in for l8rsk8r.exe. It implements the same
+# backend interface as Win32Backend / LinuxBackend (see l8r_memory.py), so a
+# MemoryReader built on it drives the real attach -> scan -> chain ->
+# read-plan path without the game.
+#
+# Memory layout:
+#   module  synthetic UnityPlayer.dll image (code-like noise), with the root
+#           pointer at base_offset and optionally a planted AOB signature
+#   heap    one node per pointer hop, then the player object; the velocity
+#           fields are rewritten from the motion script whenever they are read
+#   extra   whatever map_region() adds (the benchmarks map decoy heaps)
+
+SIM_PID = 4242
+SIM_MODULE_BASE = 0x7FFA10000000
+SIM_HEAP_BASE = 0x000001D400000000
+SIM_NODE_STRIDE = 0x1000
+SIM_SIGNATURE = "4C 38 52 53 4B 38 52 ?? ?? 56 45 4C 4F"
+
+def skate_motion(t):
+    # Scripted run: carving turns, pumping for speed and a jump every 3 s
+    carve = 0.35 * t
+    pump = 1.0 + 0.25 * math.sin(2.1 * t) + 0.1 * math.sin(7.3 * t)
+    speed = 14.0 * pump
+    phase = t % 3.0
+    vy = 9.0 - 19.6 * phase if phase < 0.92 else 0.0
+    return {"vx": speed * math.cos(carve), "vy": vy, "vz": speed * math.sin(carve)}
+
+class SimGame:
+    name = "sim"
+
+    def __init__(self, base_offset, pointer_offsets, fields, process_name="l8rsk8r.exe",
+                 module_name="UnityPlayer.dll", module_size=30 * 1024 * 1024,
+                 motion=skate_motion, clock=None, signature=SIM_SIGNATURE):
+        self.process_name = process_name.lower()
+        self.module_name = module_name.lower()
+        self.pointer_offsets = list(pointer_offsets)
+        self.motion = motion
+        self.clock = clock or time.perf_counter
+        self.t0 = self.clock()
+        self.pid = SIM_PID
+        self.running = True
+        self.exited = threading.Event() # Set by exit(): what wait_exit() blocks on
+        self.reads = 0
+        self.syscalls = 0
+
+        if base_offset + 8 > module_size:
+            module_size = base_offset + 0x10000
+        image = make_code_like_buffer(module_size)
+        self.module_base = SIM_MODULE_BASE
+        self.module = (ctypes.c_char * module_size).from_buffer(image)
+        self._image = image
+        self.root_addr = SIM_MODULE_BASE + base_offset
+
+        # AOB hit such that hit + signature_offset is the root slot
+        self.signature = signature
+        self.signature_offset = 0
+        if signature:
+            sig_pos = base_offset - 0x400
+            sig = bytes(0x90 if t in ('??', '?') else int(t, 16) for t in signature.split())
+            image[sig_pos:sig_pos + len(sig)] = sig
+            self.signature_offset = base_offset - sig_pos
+
+        self.fields = [(name, offset, struct.Struct('<' + fmt)) for name, offset, fmt in fields]
+        object_size = max(offset + s.size for _, offset, s in self.fields) if self.fields else 0
+        self.heap_size = SIM_NODE_STRIDE * (len(self.pointer_offsets) + 4) + object_size
+        self.heap = (ctypes.c_char * self.heap_size)()
+        self.extra = [] # (base, ctypes buffer) added with map_region()
+        self.generation = 0
+        self.link_chain()
+
+    # --- scripted events ---
+
+    def link_chain(self, slot=0):
+        # (Re)build the pointer chain; a new slot moves every node, like a respawn
+        ctypes.memset(self.heap, 0, self.heap_size)
+        nodes = len(self.pointer_offsets)
+        base = SIM_HEAP_BASE + slot * 0x100
+        addrs = [base + i * SIM_NODE_STRIDE for i in range(nodes + 1)]
+        self._poke(self.root_addr, struct.pack('<Q', addrs[0]))
+        for i, offset in enumerate(self.pointer_offsets):
+            self._poke(addrs[i] + offset, struct.pack('<Q', addrs[i + 1]))
+        self.player_address = addrs[-1]
+        self.generation += 1
+
+    def map_region(self, base, data):
+        # Extra readable memory at `base` (e.g. pointer-dense decoy heap for the
+        # pointer scanner); `data` is any writable buffer, shared, not copied
+        region = (ctypes.c_char * len(data)).from_buffer(data)
+        self.extra.append((base, region))
+        self.extra.sort(key=lambda entry: entry[0])
+        return region
+
+    def respawn(self):
+        self.link_chain(slot=self.generation % 8)
+
+    def exit(self):
+        self.running = False
+        self.exited.set()
+
+    def restart(self):
+        self.pid += 1
+        self.exited.clear()
+        self.running = True
+        self.t0 = self.clock()
+        self.link_chain()
+
+    def _poke(self, address, data):
+        region, offset = self._locate(address, len(data))
+        ctypes.memmove(ctypes.addressof(region) + offset, data, len(data))
+
+    def _locate(self, address, size):
+        off = address - self.module_base
+        if 0 <= off and off + size <= len(self.module):
+            return self.module, off
+        off = address - SIM_HEAP_BASE
+        if 0 <= off and off + size <= self.heap_size:
+            return self.heap, off
+        for base, region in self.extra:
+            off = address - base
+            if 0 <= off and off + size <= len(region):
+                return region, off
+        return None, 0
+
+    def _update_player(self):
+        values = self.motion(self.clock() - self.t0)
+        base = ctypes.addressof(self.heap) + (self.player_address - SIM_HEAP_BASE)
+        for name, offset, layout in self.fields:
+            if name in values:
+                ctypes.memmove(base + offset, layout.pack(values[name]), layout.size)
+
+    # --- backend interface ---
+
+    def find_process(self, process_name):
+        if self.running and process_name.lower() in self.process_name:
+            return self.pid
+        return None
+
+    def open_process(self, pid):
+        return pid if self.running and pid == self.pid else None
+
+    def close_process(self, handle):
+        pass
+
+    def is_alive(self, handle):
+        return self.running and handle == self.pid
+
+    def find_module(self, pid, module_name):
+        if not self.is_alive(pid) or module_name.lower() != self.module_name:
+            return None, 0
+        return self.module_base, len(self.module)
+
+    def open_waiter(self, pid):
+        return pid if self.is_alive(pid) else None
+
+    def wait_exit(self, waiter, timeout):
+        if self.is_alive(waiter):
+            self.exited.wait(timeout)
+        return not self.is_alive(waiter)
+
+    def close_waiter(self, waiter):
+        pass
+
+    def regions(self, handle):
+        if not self.is_alive(handle): return []
+        out = [(self.module_base, len(self.module), "rw"), (SIM_HEAP_BASE, self.heap_size, "rw")]
+        out += [(base, len(region), "rw") for base, region in self.extra]
+        return sorted(out)
+
+    def read_into(self, handle, address, buf, size):
+        self.syscalls += 1
+        return self._read(handle, address, buf, size)
+
+    def read_scatter(self, handle, requests):
+        self.syscalls += 1
+        return all(self._read(handle, a, b, n) for a, b, n in requests)
+
+    def _read(self, handle, address, buf, size):
+        if not self.is_alive(handle): return False
+        region, offset = self._locate(address, size)
+        if region is None: return False
+        if region is self.heap and address + size > self.player_address:
+            self._update_player()
+        self.reads += 1
+        ctypes.memmove(buf, ctypes.addressof(region) + offset, size)
+        return True
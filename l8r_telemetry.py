@@ -0,0 +1,317 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+
+from l8r_sampling import RING_FIELDS, SampleRing
+
+# ==============================================================================
+#  TELEMETRY SERVER
+# ==============================================================================
+#
+# Streams samples to other programs on this machine (stream overlays, browser
+# sources, analysis tools) over WebSocket: ws://127.0.0.1:8765/
+#
+# On connect a client gets one text message describing the stream:
+#   {"fields": ["t", "speed", ...], "record": "<dfffffff", "header": "<4sBBH"}
+# then binary messages, one per tick that had samples:
+#   header  TELEMETRY_HEADER: b"L8RT", version, field count, record count
+#   records TELEMETRY_RECORD each: t as a double (perf_counter seconds, same
+#           clock as the overlay), every other field as a float
+#
+# The polling thread only pushes into a SampleRing of its own (no locks, no
+# syscalls). The server runs an asyncio loop on its own thread; every
+# TELEMETRY_TICK it drains that ring, encodes the batch once, and offers
+# the same bytes to every client.
+#
+# Backpressure: each client holds at most one pending message. If the last
+# one hasn't gone out by the next tick (the client isn't reading, so its
+# socket and transport buffers are full), the backlog is replaced by a
+# message with just the newest sample and the rest counts as dropped. A slow
+# or stuck client never costs more than its transport buffer plus one
+# message, and never delays anyone else.
+# A connection reset while a client is backed up surfaces in drain(); the
+# client's send task closes the socket, and its handler drops it.
+
+TELEMETRY_HOST = "127.0.0.1"
+TELEMETRY_PORT = 8765
+TELEMETRY_TICK = 0.002 # Seconds between batches while clients are connected
+TELEMETRY_IDLE_TICK = 0.05 # ... and while nobody is listening
+TELEMETRY_HIGH_WATER = 64 * 1024 # Transport bytes buffered per client before drain() waits
+TELEMETRY_RING_CAPACITY = 1 << 14
+
+TELEMETRY_VERSION = 1
+TELEMETRY_HEADER = struct.Struct("<4sBBH")
+TELEMETRY_RECORD = struct.Struct("<d" + "f" * (len(RING_FIELDS) - 1))
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def encode_batch(batch, start=0):
+    # Ring batch (one column per field) -> binary message payload
+    rows = list(zip(*batch))[start:]
+    out = bytearray(TELEMETRY_HEADER.size + len(rows) * TELEMETRY_RECORD.size)
+    TELEMETRY_HEADER.pack_into(out, 0, b"L8RT", TELEMETRY_VERSION, len(RING_FIELDS), len(rows))
+    offset = TELEMETRY_HEADER.size
+    for row in rows:
+        TELEMETRY_RECORD.pack_into(out, offset, *row)
+        offset += TELEMETRY_RECORD.size
+    return bytes(out)
+
+def decode_batch(payload):
+    # Binary message payload -> list of records (tuples in RING_FIELDS order)
+    magic, version, fields, count = TELEMETRY_HEADER.unpack_from(payload)
+    if magic != b"L8RT" or version != TELEMETRY_VERSION or fields != len(RING_FIELDS):
+        raise ValueError("Not an L8R telemetry message (or a different version)")
+    return list(TELEMETRY_RECORD.iter_unpack(memoryview(payload)[TELEMETRY_HEADER.size:]))
+
+# --- WebSocket framing (RFC 6455, just what a telemetry feed needs) -------------
+
+def ws_frame(payload, opcode=0x2, mask=False):
+    # One unfragmented frame. Servers send unmasked, clients must mask.
+    n = len(payload)
+    head = bytearray([0x80 | opcode])
+    bit = 0x80 if mask else 0
+    if n < 126:
+        head.append(bit | n)
+    elif n < 1 << 16:
+        head.append(bit | 126)
+        head += n.to_bytes(2, "big")
+    else:
+        head.append(bit | 127)
+        head += n.to_bytes(8, "big")
+    if mask:
+        key = os.urandom(4)
+        head += key
+        payload = _unmask(payload, key)
+    return bytes(head) + payload
+
+def _unmask(payload, key):
+    n = len(payload)
+    stream = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(stream, "little")).to_bytes(n, "little")
+
+async def ws_read(reader):
+    # (opcode, payload) of the next frame
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), "big")
+    key = await reader.readexactly(4) if b1 & 0x80 else None
+    payload = await reader.readexactly(n)
+    return b0 & 0x0F, _unmask(payload, key) if key else payload
+
+def ws_accept_key(key):
+    return base64.b64encode(hashlib.sha1(key.strip() + WS_GUID).digest()).decode()
+
+# --- Server ---------------------------------------------------------------------
+
+class _Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.transport = writer.transport
+        self.pending = None # (message, sample count) waiting for the transport to drain
+        self.ready = asyncio.Event()
+        self.sent = 0 # Samples delivered
+        self.dropped = 0 # Samples skipped because the client fell behind
+
+    def offer(self, message, count, latest):
+        if self.transport.is_closing(): return # Gone; its handler drops it from the server
+        # Keeping up: straight to the socket, no task switch per client
+        if self.pending is None and self.transport.get_write_buffer_size() <= TELEMETRY_HIGH_WATER:
+            self.transport.write(message)
+            self.sent += count
+            return
+        if self.pending is not None:
+            # Still stuck on the previous message: keep only the newest sample
+            self.dropped += self.pending[1] + count - 1
+            message, count = latest(), 1
+        self.pending = (message, count)
+        self.ready.set()
+
+    async def send_loop(self):
+        # Only backed-up clients get here. Returns if the connection breaks.
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            try:
+                await self.writer.drain() # Returns once the transport is below its low-water mark
+            except (ConnectionError, OSError):
+                # Reset or broken pipe while backed up: close it, and the
+                # handler's read sees EOF and drops the client
+                if self.pending is not None:
+                    self.dropped += self.pending[1]
+                    self.pending = None
+                self.writer.close()
+                return
+            if self.pending is None: continue
+            message, count = self.pending
+            self.pending = None
+            self.transport.write(message)
+            self.sent += count
+
+class TelemetryServer:
+    def __init__(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT, tick=TELEMETRY_TICK,
+                 ring_capacity=TELEMETRY_RING_CAPACITY):
+        self.host = host
+        self.port = port # 0 picks a free port; the real one is set once started
+        self.tick = tick
+        self.ring = SampleRing(ring_capacity) # Polling thread -> server thread
+        self.clients = set()
+        self.handlers = {} # Connection handler task -> its writer, handshake included
+        self.error = None
+        self.batches = 0
+        self._stopping = False
+        self._started = threading.Event()
+        self._thread = None
+
+    def start(self, timeout=5.0):
+        # Returns once listening (or failed: see self.error)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait(timeout)
+        return self.error is None
+
+    def stop(self, timeout=2.0):
+        self._stopping = True # Seen at the next tick
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def push(self, *values):
+        # Polling thread: one sample, RING_FIELDS order
+        self.ring.push(*values)
+
+    def stats(self):
+        clients = list(self.clients)
+        return {
+            "clients": len(clients),
+            "sent": sum(c.sent for c in clients),
+            "dropped": sum(c.dropped for c in clients),
+            "ring_dropped": self.ring.dropped,
+        }
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self._started.set()
+
+    async def _main(self):
+        server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            while not self._stopping:
+                await asyncio.sleep(self.tick if self.clients else TELEMETRY_IDLE_TICK)
+                batch = self.ring.consume() # Drained even with nobody listening, so nothing stale is sent later
+                if self.clients and batch[0]:
+                    self._publish(batch)
+        finally:
+            server.close()
+            # Closing the sockets lets every handler see EOF and finish on its
+            # own; cancelling them instead logs a spurious error on 3.11
+            for writer in self.handlers.values():
+                writer.close()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            await server.wait_closed()
+
+    def _publish(self, batch):
+        count = len(batch[0])
+        message = ws_frame(encode_batch(batch))
+        latest = []
+        def newest():
+            # Built at most once per tick, and only if some client is behind
+            if not latest:
+                latest.append(ws_frame(encode_batch(batch, count - 1)))
+            return latest[0]
+        for client in self.clients:
+            client.offer(message, count, newest)
+        self.batches += 1
+
+    async def _serve_client(self, reader, writer):
+        handler = asyncio.current_task()
+        self.handlers[handler] = writer
+        try:
+            await self._session(reader, writer)
+        finally:
+            del self.handlers[handler]
+
+    async def _session(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        key = None
+        for line in request.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"sec-websocket-key":
+                key = value.strip()
+        if not key:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + ws_accept_key(key).encode() + b"\r\n\r\n")
+        hello = {"fields": list(RING_FIELDS), "record": TELEMETRY_RECORD.format, "header": TELEMETRY_HEADER.format}
+        writer.write(ws_frame(json.dumps(hello).encode(), opcode=0x1))
+        writer.transport.set_write_buffer_limits(high=TELEMETRY_HIGH_WATER)
+
+        client = _Subscriber(writer)
+        self.clients.add(client)
+        sender = asyncio.create_task(client.send_loop())
+        try:
+            # Clients only send control frames: answer pings, stop on close
+            while True:
+                opcode, payload = await ws_read(reader)
+                if opcode == 0x8:
+                    writer.write(ws_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True) # Collected, so nothing it raised goes unseen
+            writer.close()
+
+# --- Client ---------------------------------------------------------------------
+
+async def connect(host=TELEMETRY_HOST, port=TELEMETRY_PORT):
+    # -> (reader, writer, hello dict); then read binary messages with ws_read()
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16))
+    writer.write(b"GET / HTTP/1.1\r\nHost: " + f"{host}:{port}".encode() + b"\r\nUpgrade: websocket\r\n"
+                 b"Connection: Upgrade\r\nSec-WebSocket-Key: " + key + b"\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    response = await reader.readuntil(b"\r\n\r\n")
+    if not response.startswith(b"HTTP/1.1 101") or ws_accept_key(key).encode() not in response:
+        writer.close()
+        raise ConnectionError("Telemetry server refused the WebSocket handshake")
+    opcode, payload = await ws_read(reader)
+    return reader, writer, json.loads(payload)
+
+async def _print_feed(host, port):
+    reader, writer, hello = await connect(host, port)
+    print(f"Connected: {hello['fields']}")
+    while True:
+        opcode, payload = await ws_read(reader)
+        if opcode == 0x2:
+            for record in decode_batch(payload)[-1:]:
+                print("  ".join(f"{name}={value:.3f}" for name, value in zip(hello["fields"], record)))
+        elif opcode == 0x8:
+            break
+
+if __name__ == "__main__":
+    # Minimal consumer: prints the newest sample of every message
+    import sys
+    try:
+        asyncio.run(_print_feed(TELEMETRY_HOST, int(sys.argv[1]) if len(sys.argv) > 1 else TELEMETRY_PORT))
+    except KeyboardInterrupt:
+        pass
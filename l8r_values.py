@@ -0,0 +1,283 @@
+import argparse
+import ctypes
+import shlex
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError: # Required here (the overlay itself runs without it)
+    np = None
+
+from l8r_game import PLAYER_FIELDS, POINTER_CHAINS_FILE, PROCESS_NAME, ChainCache, load_fallback_chains
+from l8r_memory import MemoryReader
+
+# ==============================================================================
+#  VALUE SCANNER
+# ==============================================================================
+#
+# Cheat Engine-style first / next scans for float32 values, to find
+# OFFSET_VELOCITY (and friends) again after a game update:
+#
+#   python l8r_values.py
+#   > first unknown            # or: first range -50 50 / first exact 12.5
+#   > next changed             # skate around...
+#   > next unchanged           # ...stand still
+#   > next exact 0             # ~0 within the tolerance (default FLOAT_TOLERANCE)
+#   > list                     # what's left, with current values
+#   > offsets                  # the same, relative to the player object
+#
+# A first scan reads every writable region (MemoryReader.regions()) in
+# SCAN_CHUNK pieces and compares a float32 view of each piece in one numpy
+# expression. Candidates are kept per region as a sorted uint32 slot index
+# plus the float32 last seen there, 8 bytes per address; "first unknown"
+# keeps just the values (4 bytes per slot in scanned memory) until the
+# first next scan turns them into an index. Both stop at `budget` bytes.
+#
+# A next scan only reads the NEXT_CHUNK pieces that still hold candidates,
+# so narrowing down gets cheaper with every scan. An address that can't be
+# read any more reads as NaN, which matches no condition, so it drops out.
+#
+# Values are 4-byte aligned; NaN and infinity never match.
+
+SCAN_CHUNK = 4 << 20 # Bytes per read in a first scan
+NEXT_CHUNK = 64 << 10 # Bytes per read in a next scan (only pieces with candidates are read)
+FLOAT_TOLERANCE = 0.01 # "exact" matches within this much
+VALUE_SCAN_BUDGET = 1 << 30 # Bytes of candidates / snapshot kept between scans
+MAX_FIELD_OFFSET = 0x1000 # `offsets` shows candidates this close past the player object
+
+FIRST_CONDITIONS = ("exact", "range", "unknown")
+NEXT_CONDITIONS = ("exact", "range", "changed", "unchanged", "increased", "decreased")
+
+def matches(condition, values, previous=None, a=None, b=None):
+    # Boolean mask over float32 `values`. exact: |value - a| <= b (the
+    # tolerance); range: a <= value <= b; the rest compare with `previous`.
+    finite = np.isfinite(values)
+    if condition == "exact":
+        with np.errstate(invalid="ignore", over="ignore"): # inf - x; masked out by `finite` anyway
+            return finite & (np.abs(values - np.float32(a)) <= np.float32(b))
+    if condition == "range":
+        return finite & (values >= np.float32(a)) & (values <= np.float32(b))
+    if condition == "changed":
+        return finite & (values != previous)
+    if condition == "unchanged":
+        return finite & (values == previous)
+    if condition == "increased":
+        return finite & (values > previous)
+    if condition == "decreased":
+        return finite & (values < previous)
+    raise ValueError(f"Unknown scan condition {condition!r}")
+
+class ValueScanner:
+    def __init__(self, mem, budget=VALUE_SCAN_BUDGET, writable_only=True):
+        self.mem = mem
+        self.budget = budget
+        self.writable_only = writable_only # Game state lives in writable memory; skips code and constants
+        # [(base, size, index, values)]: index is a sorted uint32 array of
+        # 4-byte slots from base, or None for "every slot" (first unknown)
+        self.regions = []
+        self.scans = 0
+        self.last_duration = 0.0
+        self.last_read = 0 # Bytes read by the last scan
+
+    def __len__(self):
+        return sum(len(values) for _, _, _, values in self.regions)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes + (index.nbytes if index is not None else 0) for _, _, index, values in self.regions)
+
+    def reset(self):
+        self.regions = []
+        self.scans = 0
+
+    def first(self, condition, a=None, b=FLOAT_TOLERANCE):
+        if condition not in FIRST_CONDITIONS:
+            raise ValueError(f"First scans are {', '.join(FIRST_CONDITIONS)}, not {condition!r}")
+        t0 = time.perf_counter()
+        regions = [(base, size & ~3) for base, size, prot in self.mem.regions()
+                   if size >= 4 and (not self.writable_only or "w" in prot)]
+        buf = ctypes.create_string_buffer(SCAN_CHUNK)
+        view = np.frombuffer(buf, dtype="<f4")
+        found = []
+        kept = read = 0
+        for base, size in regions:
+            parts, slots = [], []
+            for offset in range(0, size, SCAN_CHUNK):
+                n = min(SCAN_CHUNK, size - offset)
+                ok = self.mem.read_into(base + offset, buf, n)
+                read += n if ok else 0
+                if condition == "unknown":
+                    parts.append(view[:n // 4].copy() if ok else np.full(n // 4, np.nan, np.float32))
+                    kept += n
+                elif ok:
+                    values = view[:n // 4]
+                    hit = np.flatnonzero(matches(condition, values, None, a, b))
+                    if hit.size:
+                        parts.append(values[hit])
+                        slots.append((hit + offset // 4).astype(np.uint32))
+                        kept += hit.size * 8
+                if kept > self.budget:
+                    raise ValueError(f"Over {self.budget >> 20} MB of candidates; "
+                                     "start with a narrower exact or range scan")
+            if parts:
+                values = np.concatenate(parts)
+                found.append((base, size, None if condition == "unknown" else np.concatenate(slots), values))
+        self.regions = found
+        self.scans = 1
+        self.last_read = read
+        self.last_duration = time.perf_counter() - t0
+        return len(self)
+
+    def next(self, condition, a=None, b=FLOAT_TOLERANCE):
+        if condition not in NEXT_CONDITIONS:
+            raise ValueError(f"Next scans are {', '.join(NEXT_CONDITIONS)}, not {condition!r}")
+        if not self.scans:
+            raise ValueError("No first scan yet")
+        t0 = time.perf_counter()
+        self.last_read = 0
+        kept = []
+        for base, size, index, previous in self.regions:
+            values = self.read_values(base, size, index)
+            hit = matches(condition, values, previous, a, b)
+            index = np.flatnonzero(hit).astype(np.uint32) if index is None else index[hit]
+            if index.size:
+                kept.append((base, size, index, values[hit]))
+        self.regions = kept
+        self.scans += 1
+        self.last_duration = time.perf_counter() - t0
+        return len(self)
+
+    def read_values(self, base, size, index=None):
+        # Current float32 at every slot in `index` (every slot if None), NaN where unreadable
+        chunk = SCAN_CHUNK if index is None else NEXT_CHUNK # Every slot: read like a first scan
+        step = chunk // 4
+        if index is None:
+            out = np.empty(size // 4, np.float32)
+            chunks = [(first, 0, 0) for first in range(0, len(out), step)]
+        else:
+            # Candidates are sorted, so each chunk's are one run of `index`
+            out = np.empty(len(index), np.float32)
+            chunk_of = index // np.uint32(step)
+            starts = np.flatnonzero(np.diff(chunk_of, prepend=np.uint32(0xFFFFFFFF))) # Where a new chunk begins
+            ends = np.append(starts[1:], len(index))
+            chunks = zip((chunk_of[starts] * np.uint32(step)).tolist(), starts.tolist(), ends.tolist())
+        buf = ctypes.create_string_buffer(chunk)
+        view = np.frombuffer(buf, dtype="<f4")
+        for first_slot, lo, hi in chunks:
+            n = min(chunk, size - first_slot * 4)
+            ok = self.mem.read_into(base + first_slot * 4, buf, n)
+            self.last_read += n if ok else 0
+            if index is None:
+                out[first_slot:first_slot + n // 4] = view[:n // 4] if ok else np.nan
+            else:
+                out[lo:hi] = view[index[lo:hi] - np.uint32(first_slot)] if ok else np.nan
+        return out
+
+    def candidates(self, limit=None):
+        # [(address, last value)], lowest address first
+        out = []
+        for base, size, index, values in self.regions:
+            slots = range(len(values)) if index is None else index
+            for slot, value in zip(slots, values):
+                out.append((base + int(slot) * 4, float(value)))
+                if limit is not None and len(out) >= limit: return out
+        return out
+
+# --- Command line ---------------------------------------------------------------
+
+HELP = """\
+  first unknown | first exact VALUE [TOLERANCE] | first range LOW HIGH
+  next changed | unchanged | increased | decreased | exact VALUE [TOLERANCE] | range LOW HIGH
+  list [N]     candidates with their current values
+  offsets      candidates within 0x1000 past the player object (pointer chain in l8r_game.py)
+  reset, help, quit"""
+
+def player_address(mem):
+    chain = ChainCache(mem, fallback_chains=load_fallback_chains(POINTER_CHAINS_FILE))
+    return chain.get(time.perf_counter()), chain.status
+
+def run_command(scanner, words, out=print):
+    # One command line (already split); returns False to quit
+    command, args = words[0].lower(), words[1:]
+    if command in ("quit", "exit", "q"):
+        return False
+    if command in ("first", "next"):
+        if not args:
+            raise ValueError(f"{command} what? (see help)")
+        numbers = [float(x) for x in args[1:]]
+        if args[0] == "exact" and len(numbers) == 1:
+            numbers.append(FLOAT_TOLERANCE)
+        if args[0] in ("exact", "range") and len(numbers) != 2:
+            raise ValueError(f"{args[0]} needs {'VALUE [TOLERANCE]' if args[0] == 'exact' else 'LOW HIGH'}")
+        scan = scanner.first if command == "first" else scanner.next
+        count = scan(args[0], *numbers)
+        out(f"{count} candidates ({scanner.last_read / (1 << 20):.0f} MB read in {scanner.last_duration:.2f} s, "
+            f"{scanner.nbytes / (1 << 20):.1f} MB kept)")
+    elif command == "list":
+        limit = int(args[0]) if args else 20
+        for address, value in scanner.candidates(limit):
+            now = scanner.mem.read_bytes(address, 4)
+            current = np.frombuffer(now, "<f4")[0] if now else float("nan")
+            out(f"  {address:016X}  {value:12.4f}  now {current:12.4f}")
+        out(f"{len(scanner)} candidates")
+    elif command == "offsets":
+        address, status = player_address(scanner.mem)
+        if not address:
+            raise ValueError(f"Player object not found ({status})")
+        names = {offset: name for name, offset, _ in PLAYER_FIELDS}
+        out(f"player object {address:X} [{status}]")
+        for base, size, index, values in scanner.regions:
+            if not (base <= address + MAX_FIELD_OFFSET and address < base + size): continue
+            slots = np.arange(len(values), dtype=np.uint64) if index is None else index.astype(np.uint64)
+            offsets = (np.uint64(base) + slots * np.uint64(4)).astype(np.int64) - address
+            for i in np.flatnonzero((offsets >= 0) & (offsets < MAX_FIELD_OFFSET)):
+                offset = int(offsets[i])
+                note = f"  (currently {names[offset]})" if offset in names else ""
+                out(f"  +0x{offset:X}  {float(values[i]):12.4f}{note}")
+    elif command == "reset":
+        scanner.reset()
+    elif command == "help":
+        out(HELP)
+    else:
+        raise ValueError(f"Unknown command {command!r} (try help)")
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="First/next float scans over the game's memory")
+    parser.add_argument("--budget-mb", type=int, default=VALUE_SCAN_BUDGET >> 20, help="memory for candidates")
+    parser.add_argument("--all-regions", action="store_true", help="scan read-only memory too")
+    parser.add_argument("--simulate", action="store_true", help="scan a simulated game (l8r_sim.py)")
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.exit(1, "The value scanner needs numpy (pip install numpy)\n")
+
+    if args.simulate:
+        from l8r_game import BASE_OFFSET, POINTER_OFFSETS
+        from l8r_sim import SimGame
+        mem = MemoryReader(SimGame(BASE_OFFSET, POINTER_OFFSETS, PLAYER_FIELDS), scan_workers=1)
+    else:
+        mem = MemoryReader()
+    if not mem.attach(PROCESS_NAME):
+        parser.exit(1, f"{PROCESS_NAME} is not running\n")
+    scanner = ValueScanner(mem, args.budget_mb << 20, not args.all_regions)
+    print(f"Attached to {PROCESS_NAME}; type help for commands")
+    try:
+        while True:
+            try:
+                line = input("> ").strip()
+            except EOFError:
+                break
+            if not line: continue
+            try:
+                if not run_command(scanner, shlex.split(line)): break
+            except ValueError as e:
+                print(e)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mem.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
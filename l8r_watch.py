@@ -0,0 +1,134 @@
+import threading
+from collections import deque
+
+from l8r_game import BASE_MODULE, PROCESS_NAME
+
+# ==============================================================================
+#  ATTACH WATCHER
+# ==============================================================================
+#
+# Finds the game, waits for it to load, notices when it exits, and tells the
+# sampling thread, so the sampling thread itself never walks the process or
+# module lists and never waits:
+#
+#   searching   find_process every ATTACH_BACKOFF_MIN, doubling up to
+#               ATTACH_BACKOFF_MAX while the game stays closed
+#   loading     found; find_module for `modules` with the same backoff
+#               (UnityPlayer.dll loads a moment after the process starts)
+#   attached    "attach" posted; blocked in wait_exit on the process (a
+#               signalled handle on Windows, a pidfd on Linux), waking every
+#               EXIT_WAIT only to see if it should stop
+#   exited      "detach" posted; back to searching at the shortest backoff,
+#               so a relaunch right after a crash is picked up quickly. A
+#               process that exits before it is attached doesn't reset the
+#               backoff, so one that keeps being found dead can't spin it.
+#
+# Events are (kind, pid, modules) tuples on a deque (appends and pops are
+# atomic). The sampling thread checks `events` once per poll, which costs
+# an attribute load while nothing happens, and calls apply() to act on
+# them: attach_pid with the module bases the watcher already looked up, or
+# detach. The watcher opens its own waiter on the process, never the
+# reading handle, so the two sides can close theirs independently.
+
+ATTACH_BACKOFF_MIN = 0.002 # Seconds between process searches right after start / exit
+ATTACH_BACKOFF_MAX = 0.25 # ... growing to this while the game stays closed
+EXIT_WAIT = 0.25 # Longest single wait_exit call (how quickly stop() is noticed)
+
+class AttachWatcher:
+    def __init__(self, backend, process_name=PROCESS_NAME, modules=(BASE_MODULE,)):
+        self.backend = backend
+        self.process_name = process_name
+        self.modules = modules
+        self.events = deque() # (kind, pid, modules); watcher thread appends, sampling thread pops
+        self.posted = threading.Event() # Set with every event, for samplers that sleep while detached
+        self.status = "Game not found..."
+        self.pid = None # Process being watched (found, maybe not attached yet)
+        self.searches = 0 # find_process calls
+        self.lookups = 0 # find_module calls
+        self.retry = False # Sampling thread couldn't open the process: post the attach again
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=0.0):
+        # The thread notices within EXIT_WAIT; pass a timeout to wait for that
+        self._stopping.set()
+        if timeout and self._thread is not None:
+            self._thread.join(timeout)
+
+    def apply(self, mem):
+        # Sampling thread: act on posted events. Returns True (now attached),
+        # False (now detached) or None (no change).
+        self.posted.clear()
+        changed = None
+        while self.events:
+            kind, pid, modules = self.events.popleft()
+            if kind == "attach":
+                changed = mem.attach_pid(pid, modules)
+                if not changed:
+                    self.status = f"Can't open {self.process_name} (try running as administrator)"
+                    self.retry = True
+            elif mem.pid == pid:
+                mem.detach()
+                changed = False
+        return changed
+
+    def _post(self, kind, pid, modules=None):
+        self.events.append((kind, pid, modules))
+        self.posted.set()
+
+    def _run(self):
+        backoff = ATTACH_BACKOFF_MIN
+        stopping = self._stopping
+        while not stopping.is_set():
+            self.searches += 1
+            pid = self.backend.find_process(self.process_name)
+            waiter = self.backend.open_waiter(pid) if pid else None
+            if waiter is None:
+                stopping.wait(backoff)
+                backoff = min(backoff * 2, ATTACH_BACKOFF_MAX)
+                continue
+            self.pid = pid
+            try:
+                attached = self._watch(pid, waiter)
+            finally:
+                self.backend.close_waiter(waiter)
+                self.pid = None
+            if attached:
+                backoff = ATTACH_BACKOFF_MIN
+            else:
+                # Gone before it finished loading (or a process that has
+                # already exited was found): keep backing off, don't spin
+                stopping.wait(backoff)
+                backoff = min(backoff * 2, ATTACH_BACKOFF_MAX)
+
+    def _watch(self, pid, waiter):
+        # Wait for the modules, attach, wait for the exit. True once attached.
+        backoff = ATTACH_BACKOFF_MIN
+        modules = {}
+        while len(modules) < len(self.modules):
+            self.status = f"Waiting for {', '.join(name for name in self.modules if name not in modules)}..."
+            for name in self.modules:
+                if name not in modules:
+                    self.lookups += 1
+                    base, size = self.backend.find_module(pid, name)
+                    if base: modules[name] = (base, size)
+            if len(modules) == len(self.modules): break
+            if self._stopping.is_set() or self.backend.wait_exit(waiter, backoff): return False # Closed while loading
+            backoff = min(backoff * 2, ATTACH_BACKOFF_MAX)
+
+        self.status = "Attached"
+        self._post("attach", pid, modules)
+        while not self._stopping.is_set():
+            if self.backend.wait_exit(waiter, ATTACH_BACKOFF_MAX if self.retry else EXIT_WAIT):
+                self.status = "Game closed, waiting for it to start again..."
+                self._post("detach", pid)
+                return True
+            if self.retry:
+                self.retry = False
+                self._post("attach", pid, modules)
+        return True
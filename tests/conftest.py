@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The l8r_* modules sit next to the overlay script, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
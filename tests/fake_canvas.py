@@ -0,0 +1,56 @@
+# Minimal stand-in for tk.Canvas: records every call, keeps item state
+
+class FakeCanvas:
+    def __init__(self, width=240, height=140):
+        self.width, self.height = width, height
+        self.items = {} # id -> {"kind", "coords", "options", "tags"}
+        self.calls = []
+        self.next_id = 1
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kind, coords, tags=(), **options):
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = {"kind": kind, "coords": list(coords), "options": dict(options), "tags": tags}
+        self.calls.append(("create_" + kind, item))
+        return item
+
+    def create_line(self, coords, tags=(), **options):
+        return self._create("line", coords, tags, **options)
+
+    def create_text(self, coords, tags=(), **options):
+        return self._create("text", coords, tags, **options)
+
+    def create_image(self, x, y, **options):
+        return self._create("image", (x, y), (), **options)
+
+    def coords(self, item, coords):
+        self.items[item]["coords"] = list(coords)
+        self.calls.append(("coords", item))
+
+    def itemconfig(self, item, **options):
+        self.items[item]["options"].update(options)
+        self.calls.append(("itemconfig", item, tuple(sorted(options))))
+
+    def delete(self, item):
+        del self.items[item]
+        self.calls.append(("delete", item))
+
+    def move(self, tag, dx, dy):
+        for state in self.items.values():
+            if tag in state["tags"]:
+                state["coords"][0::2] = [x + dx for x in state["coords"][0::2]]
+                state["coords"][1::2] = [y + dy for y in state["coords"][1::2]]
+        self.calls.append(("move", tag, dx, dy))
+
+    def tag_lower(self, item, below=None):
+        self.calls.append(("tag_lower", item, below))
+
+    def take_calls(self):
+        calls, self.calls = self.calls, []
+        return calls
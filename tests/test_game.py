@@ -0,0 +1,58 @@
+import struct
+
+import pytest
+
+import l8r_game
+from l8r_game import PLAYER_FIELDS, PROCESS_NAME, ChainCache
+from l8r_memory import MemoryReader
+from l8r_sim import SimGame
+
+OFFSETS = [0x100, 0xD0, 0x8]
+
+@pytest.fixture
+def linked(monkeypatch):
+    # A small sim module with the chain at a made-up static offset
+    monkeypatch.setattr(l8r_game, "BASE_OFFSET", 0x3000)
+    monkeypatch.setattr(l8r_game, "POINTER_OFFSETS", OFFSETS)
+    monkeypatch.setattr(l8r_game, "VELOCITY_SIGNATURE", None)
+    sim = SimGame(0x3000, OFFSETS, PLAYER_FIELDS, module_size=1 << 20)
+    mem = MemoryReader(sim)
+    assert mem.attach(PROCESS_NAME)
+    chain = ChainCache(mem, max_age=1.0)
+    chain.offsets = OFFSETS
+    assert chain.get(10.0) == sim.player_address
+    yield sim, chain
+    mem.close()
+
+def test_fast_path_counts_a_respawn(linked):
+    sim, chain = linked
+    assert chain.get(10.5) == sim.player_address and chain.hits == 1
+    sim.respawn() # Root pointer value changes
+    assert chain.get(10.6) == sim.player_address
+    assert chain.breaks == 1
+
+def test_rewalk_counts_a_respawn(linked):
+    sim, chain = linked
+    sim.respawn()
+    assert chain.get(11.5) == sim.player_address # Past max_age: re-walked, not the fast path
+    assert chain.breaks == 1
+
+def test_rewalk_counts_a_chain_that_stopped_resolving(linked):
+    sim, chain = linked
+    sim._poke(sim.root_addr, struct.pack('<Q', 0)) # Nothing to walk any more
+    assert chain.get(11.5) == 0
+    assert chain.breaks == 1
+    assert chain.get(11.6) == 0
+    assert chain.breaks == 1 # Not linked since: nothing more to count
+
+def test_relinks_count_from_the_current_process(linked):
+    sim, chain = linked
+    sim.respawn()
+    chain.get(10.6)
+    assert (chain.breaks, chain.relinks) == (1, 1)
+    sim.exit()
+    sim.restart()
+    assert chain.mem.attach(PROCESS_NAME) # What the watcher's attach event does
+    chain.new_process()
+    assert chain.get(20.0) == sim.player_address
+    assert (chain.breaks, chain.relinks) == (1, 0)
@@ -0,0 +1,111 @@
+import math
+import random
+
+import pytest
+
+import l8r_graph
+from l8r_graph import GraphFrame
+from l8r_history import HistoryBuffer, HistoryView
+
+WIDTH = 240
+
+@pytest.fixture(params=["numpy", "pure Python"])
+def pipeline(request, monkeypatch):
+    if request.param == "pure Python":
+        monkeypatch.setattr(l8r_graph, "np", None)
+    return request.param
+
+def make_view(n, seed=3, span=30.0, aggregated=False):
+    # n samples over `span` seconds ending at `now`, with spikes; an
+    # aggregated view has (t, low, high, mean) rows like a history tier
+    rng = random.Random(seed)
+    now = 5000.0
+    times = sorted(now - rng.uniform(0.0, span * 1.5) for _ in range(n - 1)) + [now]
+    values = [rng.gauss(0.0, 5.0) + (80.0 if rng.random() < 0.002 else 0.0) for _ in range(n)]
+    if aggregated:
+        buf = HistoryBuffer(max(16, n), fields=("t", "v_min", "v_max", "v_mean"))
+        for t, v in zip(times, values):
+            spread = rng.uniform(0.0, 3.0)
+            buf.append(t, v - spread, v + spread, v)
+        return HistoryView(buf, now, bucket=0.1)
+    buf = HistoryBuffer(max(16, n), fields=("t", "v"))
+    for t, v in zip(times, values):
+        buf.append(t, v)
+    return HistoryView(buf, now)
+
+def reference(view, duration, width):
+    # Brute force: every sample from the first visible pixel column on, into
+    # the column floor(t / step) it belongs to
+    start = view.now - duration
+    step = duration / width
+    first_key = math.floor(start / step)
+    low, high = view.range(1)
+    columns = {}
+    for i, t in enumerate(view.times):
+        key = math.floor(t / step)
+        if key >= first_key:
+            columns.setdefault(key, []).append(i)
+    xs, values = [], []
+    for key in sorted(columns):
+        rows = columns[key]
+        mn, mx = min(low[i] for i in rows), max(high[i] for i in rows)
+        x = (key + 0.5) - start / step
+        xs += (x, x)
+        values += (mn, mx) if low[rows[0]] <= low[rows[-1]] else (mx, mn)
+    return min(values), max(values), xs, values
+
+@pytest.mark.parametrize("n", [2000, 50000])
+@pytest.mark.parametrize("aggregated", [False, True])
+def test_decimation_matches_brute_force(pipeline, n, aggregated):
+    view = make_view(n, aggregated=aggregated)
+    frame = GraphFrame(view, 30.0)
+    mn, mx, xs, values = frame.series(1, WIDTH)
+    ref_mn, ref_mx, ref_xs, ref_values = reference(view, 30.0, WIDTH)
+    assert (mn, mx) == (ref_mn, ref_mx)
+    assert list(xs) == ref_xs
+    assert list(values) == ref_values
+    assert len(xs) <= 2 * (WIDTH + 1) # The oldest column can be partly scrolled out
+
+def test_columns_kept_between_frames_match_a_rebuild(pipeline):
+    # Samples arrive a frame at a time while the window scrolls; the kept
+    # columns must draw exactly what a from-scratch pass would
+    full = make_view(20000, seed=5)
+    times, values = list(full.times), list(full.range(1)[0])
+    buf = HistoryBuffer(1 << 15, fields=("t", "v"))
+    columns = {}
+    n = 0
+    for end in list(range(12000, len(times), 157)) + [len(times)]:
+        buf.extend([times[n:end], values[n:end]])
+        n = end
+        buf.evict_older_than(times[end - 1] - 40.0)
+        view = HistoryView(buf, times[end - 1])
+        kept = GraphFrame(view, 30.0, columns).series(1, WIDTH)
+        fresh = GraphFrame(view, 30.0).series(1, WIDTH)
+        assert kept[:2] == fresh[:2]
+        assert list(kept[2]) == list(fresh[2]) and list(kept[3]) == list(fresh[3])
+    assert len(columns[(1, WIDTH)].keys) <= WIDTH + 1
+
+    # A cleared buffer starts the columns over
+    buf.clear()
+    buf.extend([[t - 100.0 for t in times[:10000]], values[:10000]])
+    view = HistoryView(buf, times[9999] - 100.0)
+    assert list(GraphFrame(view, 30.0, columns).series(1, WIDTH)[3]) == reference(view, 30.0, WIDTH)[3]
+
+def test_short_windows_draw_every_sample(pipeline):
+    view = make_view(300, span=20.0)
+    frame = GraphFrame(view, 30.0) # Everything visible, fewer than 2 points per column
+    mn, mx, xs, values = frame.series(1, WIDTH)
+    times, column = list(view.times), list(view.range(1)[0])
+    assert list(values) == column
+    assert list(xs) == pytest.approx([frame.to_x(t, WIDTH) for t in times])
+    assert (mn, mx) == (min(column), max(column))
+
+def test_empty_window(pipeline):
+    buf = HistoryBuffer(16, fields=("t", "v"))
+    buf.append(1.0, 3.0)
+    frame = GraphFrame(HistoryView(buf, 100.0), 30.0)
+    assert frame.series(1, WIDTH) == (0.0, 0.0, [], [])
+
+def test_polyline_maps_values_to_pixels(pipeline):
+    frame = GraphFrame(make_view(100), 30.0)
+    assert list(frame.polyline([0.5, 1.5], [0.0, 10.0], -10.0, 20.0, 100)) == [0.5, 50.0, 1.5, 0.0]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from fake_canvas import FakeCanvas
+from l8r_graph import GraphRaster, rasterize_polyline
+
+RED = (255, 0, 0)
+
+class FakePhoto:
+    def __init__(self, data, format):
+        self.frames = [data]
+
+    def configure(self, data, format):
+        self.frames.append(data)
+
+def lit(buf):
+    return {(int(x), int(y)) for y, x in zip(*np.nonzero(buf.any(axis=2)))}
+
+def blank(h=20, w=40):
+    return np.zeros((h, w, 3), dtype=np.uint8)
+
+def test_axis_lines():
+    buf = blank()
+    rasterize_polyline(buf, (2, 5, 30, 5), RED)
+    assert lit(buf) == {(x, 5) for x in range(2, 31)}
+    buf = blank()
+    rasterize_polyline(buf, (7, 0, 7, 100), RED, width=3) # Clipped to the buffer
+    assert lit(buf) == {(x, y) for x in (6, 7, 8) for y in range(20)}
+
+def test_dashed_axis_line():
+    buf = blank()
+    rasterize_polyline(buf, (0, 3, 39, 3), RED, dash=(4, 4))
+    assert lit(buf) == {(x, 3) for x in range(40) if x % 8 < 4}
+
+def test_polyline_is_connected_and_hits_its_points():
+    buf = blank()
+    coords = [0.5, 19.0, 10.5, 2.0, 20.5, 15.0, 39.0, 0.0]
+    rasterize_polyline(buf, coords, RED)
+    pixels = lit(buf)
+    for x, y in zip(coords[0::2], coords[1::2]):
+        assert (int(np.rint(x)), int(np.rint(y))) in pixels
+    # Every column between the ends has a pixel (no gaps along the major axis)
+    assert {x for x, _ in pixels} == set(range(0, 40))
+    assert (buf[buf.any(axis=2)] == RED).all()
+
+def test_out_of_bounds_points_are_clipped():
+    buf = blank()
+    rasterize_polyline(buf, [-50, -50, 100, 100], RED, width=2)
+    assert lit(buf) and all(0 <= x < 40 and 0 <= y < 20 for x, y in lit(buf))
+
+def test_raster_blits_one_photo_per_canvas():
+    canvas = FakeCanvas(width=40, height=20)
+    raster = GraphRaster(canvas, FakePhoto)
+    for y in (5, 9):
+        raster.begin()
+        raster.line("trace", [0, y, 39, y], layer="trace", fill="#FF0000")
+        raster.text("title", (2, 2), anchor="nw", text="MAGNITUDE", fill="#00FF00")
+        raster.end()
+    kinds = [state["kind"] for state in canvas.items.values()]
+    assert sorted(kinds) == ["image", "text"] # Lines never become canvas items
+    frames = raster.photo.frames
+    assert len(frames) == 2
+    header = b"P6 40 20 255\n"
+    assert all(f.startswith(header) and len(f) == len(header) + 40 * 20 * 3 for f in frames)
+    pixels = np.frombuffer(frames[1][len(header):], np.uint8).reshape(20, 40, 3)
+    assert lit(pixels) == {(x, 9) for x in range(40)} # Cleared between frames
+
+def test_clear_blanks_the_image_and_hides_labels():
+    canvas = FakeCanvas(width=40, height=20)
+    raster = GraphRaster(canvas, FakePhoto)
+    raster.begin()
+    raster.line("trace", [0, 5, 39, 5], fill="#FF0000")
+    raster.text("title", (2, 2), text="X")
+    raster.end()
+    raster.clear()
+    assert set(raster.photo.frames[-1][len(b"P6 40 20 255\n"):]) == {0}
+    title = raster.labels.items["title"]
+    assert canvas.items[title]["options"]["state"] == "hidden"
@@ -0,0 +1,90 @@
+import pytest
+
+from fake_canvas import FakeCanvas
+from l8r_graph import GraphScene
+
+def frame(scene, grid_y=50.0, trace=(0, 10, 100, 20), peaks=()):
+    scene.begin()
+    scene.line("zero", (0, grid_y, 240, grid_y), fill="#555555")
+    scene.text("title", (2, 2), anchor="nw", text="MAGNITUDE", fill="#00FF00")
+    scene.line("trace", list(trace), layer="trace", fill="#00FF00", width=2)
+    for t, x in peaks:
+        scene.line(("peak", t), (x, 0, x, 100), layer="peak", transient=True, fill="#FFFF00")
+    scene.end()
+
+def test_unchanged_frame_sends_nothing():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    frame(scene)
+    assert [c[0] for c in canvas.take_calls()].count("create_line") == 2
+    frame(scene)
+    assert canvas.take_calls() == []
+
+def test_only_what_changed_is_sent():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    frame(scene)
+    canvas.take_calls()
+    trace = scene.items["trace"]
+    frame(scene, trace=(0, 10, 100, 25))
+    assert canvas.take_calls() == [("coords", trace)]
+    frame(scene, trace=(0, 10, 100, 25.001)) # Below COORD_EPSILON
+    assert canvas.take_calls() == []
+    scene.begin()
+    scene.text("title", (2, 2), anchor="nw", text="X VELOCITY", fill="#00FF00")
+    assert canvas.take_calls() == [("itemconfig", scene.items["title"], ("text",))]
+
+def test_undrawn_items_hide_and_come_back():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    frame(scene)
+    canvas.take_calls()
+    scene.begin()
+    scene.end() # Nothing drawn: everything hidden once
+    hidden = canvas.take_calls()
+    assert sorted(c[1] for c in hidden) == sorted(scene.items.values())
+    assert all(canvas.items[i]["options"]["state"] == "hidden" for i in scene.items.values())
+    scene.begin()
+    scene.end()
+    assert canvas.take_calls() == []
+    frame(scene)
+    assert all(canvas.items[i]["options"]["state"] == "normal" for i in scene.items.values())
+    assert len(canvas.items) == 3 # Reused, not recreated
+
+def test_transient_items_are_deleted():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    frame(scene, peaks=[(1.0, 50), (2.0, 80)])
+    assert len(canvas.items) == 5
+    gone = scene.items[("peak", 1.0)]
+    canvas.take_calls()
+    frame(scene, peaks=[(2.0, 80)])
+    assert canvas.take_calls() == [("delete", gone)]
+    assert ("peak", 1.0) not in scene.items and len(canvas.items) == 4
+
+def test_scroll_moves_a_layer_in_one_call():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    scene.scroll("peak", 100.0, 8.0)
+    frame(scene, peaks=[(110.0, 80.0), (112.0, 96.0)])
+    canvas.take_calls()
+    scene.begin()
+    scene.scroll("peak", 101.0, 8.0) # Window moved 1 s: markers 8 px left
+    scene.line("zero", (0, 50.0, 240, 50.0), fill="#555555")
+    scene.text("title", (2, 2), anchor="nw", text="MAGNITUDE", fill="#00FF00")
+    scene.line("trace", [0, 10, 100, 20], layer="trace", fill="#00FF00", width=2)
+    for t in (110.0, 112.0):
+        x = (t - 101.0) * 8.0
+        scene.line(("peak", t), (x, 0, x, 100), layer="peak", transient=True, fill="#FFFF00")
+    scene.end()
+    assert canvas.take_calls() == [("move", "peak", pytest.approx(-8.0), 0)]
+    assert canvas.items[scene.items[("peak", 110.0)]]["coords"] == pytest.approx([72.0, 0, 72.0, 100])
+
+def test_new_items_are_stacked_under_higher_layers():
+    canvas = FakeCanvas()
+    scene = GraphScene(canvas)
+    scene.begin()
+    scene.line("trace", [0, 0, 10, 10], layer="trace")
+    canvas.take_calls()
+    scene.line("zero", (0, 5, 240, 5))
+    assert canvas.take_calls()[-1] == ("tag_lower", scene.items["zero"], "trace")
@@ -0,0 +1,58 @@
+from array import array
+
+from l8r_history import HistoryBuffer
+
+def test_eviction_keeps_the_window_without_growing():
+    buf = HistoryBuffer(16, fields=("t", "v"), slack=4)
+    for i in range(200):
+        buf.append(float(i), float(i) * 2)
+        buf.evict_older_than(i - 14) # 15 live, so the next append makes exactly 16
+        assert len(buf) == min(i + 1, 15)
+        assert list(buf.column("t")) == [float(x) for x in range(max(0, i - 14), i + 1)]
+    assert buf.capacity == 16
+    assert len(buf.columns[0]) == 20
+    assert list(buf.column(1)) == [2.0 * x for x in range(185, 200)]
+
+def test_evict_bisects_on_time():
+    buf = HistoryBuffer(16, fields=("t", "v"), slack=4)
+    for i in range(10):
+        buf.append(i * 0.5, 0.0)
+    assert buf.evict_older_than(2.0) == 4 # t == t_min stays
+    assert buf.first_time() == 2.0
+    assert buf.evict_older_than(2.0) == 0
+    assert buf.evict_older_than(100.0) == 6
+    assert len(buf) == 0
+    assert buf.first_time() is None and buf.last_time() is None
+
+def test_grows_when_the_window_outlives_capacity():
+    buf = HistoryBuffer(16, fields=("t", "v"), slack=4)
+    for i in range(20): # Up to the end of the slack: no room needed yet
+        buf.append(float(i), 0.0)
+    assert buf.capacity == 16
+    buf.append(20.0, 0.0) # 21 live samples won't fit: double
+    assert buf.capacity == 32
+    assert len(buf.columns[0]) == 36
+    buf.extend((array('d', range(21, 100)), array('d', range(21, 100))))
+    assert buf.capacity == 128
+    assert list(buf.column(0)) == [float(x) for x in range(100)]
+    assert list(buf.column(1))[21:] == [float(x) for x in range(21, 100)]
+
+def extend_window(buf, keep, step=7, rounds=30):
+    # Extend, then evict down to `keep` samples, like HistoryPyramid.add
+    t = 0
+    for _ in range(rounds):
+        batch = [float(x) for x in range(t, t + step)]
+        buf.extend((batch, batch))
+        t += step
+        buf.evict_older_than(t - keep)
+        assert list(buf.column(0)) == [float(x) for x in range(max(0, t - keep), t)]
+
+def test_extend_at_the_window_edge_slides_without_growing():
+    buf = HistoryBuffer(16, fields=("t", "v"), slack=4)
+    extend_window(buf, 9) # 9 kept + 7 new = exactly capacity
+    assert buf.capacity == 16
+
+def test_extend_past_the_window_edge_grows_once():
+    buf = HistoryBuffer(16, fields=("t", "v"), slack=4)
+    extend_window(buf, 10, rounds=100) # 10 + 7 = one over
+    assert buf.capacity == 32
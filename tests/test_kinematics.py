@@ -0,0 +1,55 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from l8r_kinematics import Kinematics
+
+def jittery_samples(n, seed=7, t0=12345.0):
+    # perf_counter-sized times with uneven spacing, smooth-ish velocities
+    rng = random.Random(seed)
+    t = t0
+    out = []
+    for _ in range(n):
+        t += rng.uniform(0.0005, 0.004)
+        s = t - t0
+        out.append((t, 10.0 * math.sin(3.0 * s) + rng.gauss(0, 0.2), 4.0 * s * s, 7.0 * math.cos(s) + rng.gauss(0, 0.2)))
+    return out
+
+def polyfit_derivatives(window):
+    # Quadratic least squares per axis, derivatives at the newest sample
+    t = np.array([s[0] for s in window])
+    x = t - t[-1]
+    accel, jerk = [], []
+    for k in (1, 2, 3):
+        c2, c1, c0 = np.polyfit(x, np.array([s[k] for s in window]), 2)
+        accel.append(c1)
+        jerk.append(2.0 * c2)
+    return math.hypot(*accel), math.hypot(*jerk)
+
+@pytest.mark.parametrize("window", [3, 7, 25])
+def test_savgol_matches_polyfit(window):
+    kin = Kinematics("savgol", window=window)
+    samples = jittery_samples(1000)
+    for i, (t, vx, vy, vz) in enumerate(samples):
+        h_speed, accel, jerk = kin.update(t, vx, vy, vz)
+        assert h_speed == pytest.approx(math.hypot(vx, vz))
+        if i < 2: continue
+        expected_accel, expected_jerk = polyfit_derivatives(samples[max(0, i + 1 - window):i + 1])
+        assert accel == pytest.approx(expected_accel, rel=1e-6, abs=1e-6)
+        assert jerk == pytest.approx(expected_jerk, rel=1e-5, abs=1e-3)
+
+def test_savgol_batch_matches_per_sample():
+    samples = jittery_samples(300)
+    one, batch = Kinematics("savgol"), Kinematics("savgol")
+    expected = [one.update(*s) for s in samples]
+    h, a, j = batch.extend(*zip(*samples))
+    assert list(zip(h, a, j)) == expected
+
+def test_gap_restarts_the_fit():
+    kin = Kinematics("savgol", window=5)
+    for t, vx, vy, vz in jittery_samples(20):
+        kin.update(t, vx, vy, vz)
+    assert kin.update(20000.0, 1.0, 0.0, 0.0)[1:] == (0.0, 0.0)
+    assert len(kin.samples) == 1
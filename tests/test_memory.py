@@ -0,0 +1,112 @@
+import ctypes
+import os
+import struct
+import sys
+import threading
+
+import pytest
+
+from l8r_game import PLAYER_FIELDS, PROCESS_NAME
+from l8r_memory import LinuxBackend, MemoryReader, ReadPlan
+from l8r_sim import SimGame
+
+@pytest.fixture
+def sim_reader():
+    clock = [100.0]
+    sim = SimGame(0x2000, [0x10, 0x20], PLAYER_FIELDS, module_size=1 << 20, clock=lambda: clock[0])
+    mem = MemoryReader(sim, scan_workers=1)
+    assert mem.attach(PROCESS_NAME)
+    clock[0] += 0.5 # Somewhere mid-run, so every field is non-zero
+    yield sim, mem
+    mem.close()
+
+def field_by_field(mem, address, fields):
+    return tuple(struct.unpack('<' + fmt, mem.read_bytes(address + offset, struct.calcsize(fmt)))[0]
+                 for _, offset, fmt in fields)
+
+def test_single_span_is_one_read(sim_reader):
+    sim, mem = sim_reader
+    plan = ReadPlan(PLAYER_FIELDS)
+    assert len(plan.spans) == 1
+    before = sim.syscalls
+    values = plan.read(mem, sim.player_address)
+    assert sim.syscalls - before == 1
+    assert values == field_by_field(mem, sim.player_address, PLAYER_FIELDS)
+    assert all(values)
+
+def test_multi_span_is_one_gather(sim_reader):
+    sim, mem = sim_reader
+    plan = ReadPlan(PLAYER_FIELDS, max_gap=0)
+    assert len(plan.spans) == 3 # vx and vz are 4 bytes apart
+    before = sim.syscalls
+    values = plan.read(mem, sim.player_address)
+    assert sim.syscalls - before == 1
+    assert values == ReadPlan(PLAYER_FIELDS).read(mem, sim.player_address)
+    assert values == field_by_field(mem, sim.player_address, PLAYER_FIELDS)
+
+def test_failed_span_reads_none(sim_reader):
+    sim, mem = sim_reader
+    plan = ReadPlan(PLAYER_FIELDS + [("far", 0x100000, 'f')])
+    assert len(plan.spans) == 2
+    assert plan.read(mem, sim.player_address) is None
+
+def test_overlapping_fields_are_rejected():
+    with pytest.raises(ValueError):
+        ReadPlan([("a", 0, 'f'), ("b", 2, 'f')])
+
+def test_resolve_chain_follows_the_sim(sim_reader):
+    sim, mem = sim_reader
+    assert mem.resolve_chain(sim.root_addr, sim.pointer_offsets) == sim.player_address
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="process_vm_readv")
+def test_linux_gathers_from_several_threads():
+    # Each thread gathers its own source buffers out of this very process
+    backend = LinuxBackend()
+    pid = os.getpid()
+    errors = []
+
+    def reader(seed):
+        sources = [ctypes.create_string_buffer(bytes([seed, i]) * 32, 64) for i in range(64)]
+        targets = [ctypes.create_string_buffer(64) for _ in sources]
+        requests = [(ctypes.addressof(src), dst, 64) for src, dst in zip(sources, targets)]
+        for _ in range(2000):
+            if not backend.read_scatter(pid, requests) or any(dst.raw != src.raw for src, dst in zip(sources, targets)):
+                errors.append(seed)
+                return
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert errors == []
+
+def test_scalar_reads_reuse_one_buffer(sim_reader, monkeypatch):
+    sim, mem = sim_reader
+    expected = struct.unpack('<f', mem.read_bytes(sim.player_address + PLAYER_FIELDS[0][1], 4))[0]
+    allocations = []
+    real = ctypes.create_string_buffer
+    monkeypatch.setattr(ctypes, "create_string_buffer", lambda *a: allocations.append(a) or real(*a))
+    assert mem.read_ptr(sim.root_addr) != 0
+    assert mem.read_float(sim.player_address + PLAYER_FIELDS[0][1]) == expected
+    assert mem.read_ptr(0x10) == 0 and mem.read_float(0x10) == 0.0
+    assert mem.resolve_chain(sim.root_addr, sim.pointer_offsets) == sim.player_address
+    assert allocations == []
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="process_vm_readv")
+def test_scalar_reads_from_several_threads():
+    # Two threads sharing one reader each read their own pointer out of this process
+    mem = MemoryReader(LinuxBackend(), scan_workers=1)
+    assert mem.attach_pid(os.getpid())
+    errors = []
+
+    def reader(value):
+        cell = ctypes.c_uint64(value)
+        for _ in range(5000):
+            if mem.read_ptr(ctypes.addressof(cell)) != value:
+                errors.append(value)
+                return
+
+    threads = [threading.Thread(target=reader, args=(seed * 0x1111111111,)) for seed in range(1, 5)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    mem.close()
+    assert errors == []
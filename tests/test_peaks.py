@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from l8r_peaks import PeakTracker, local_maxima
+
+def greedy_peaks(peaks, spacing):
+    # The original pass: highest first (earlier wins ties), keep each peak
+    # not within `spacing` of one already kept
+    kept = []
+    for t, v in sorted(peaks, key=lambda p: (-p[1], p[0])):
+        if all(not abs(t - k) < spacing for k, _ in kept):
+            kept.append((t, v))
+    return sorted(kept)
+
+def random_run(seed, n=5000):
+    rng = random.Random(seed)
+    times, values = [], []
+    t = 0.0
+    for _ in range(n):
+        t += rng.uniform(0.0005, 0.003)
+        times.append(t)
+        values.append(round(rng.uniform(0.0, 40.0)) if rng.random() < 0.3 else rng.uniform(0.0, 40.0))
+    return times, values
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("spacing", [0.01, 0.2, 2.0])
+def test_streaming_matches_greedy(seed, spacing):
+    times, values = random_run(seed)
+    tracker = PeakTracker(spacing, 0.0)
+    rng = random.Random(seed)
+    i = 0
+    while i < len(times):
+        j = i + rng.randint(1, 200) # Small batches take the list path, large ones numpy
+        tracker.feed(times[i:j], values[i:j])
+        tracker.advance(times[min(j, len(times)) - 1])
+        i = j
+    tracker.advance(times[-1] + 1.0)
+    expected = greedy_peaks(local_maxima(times, values), spacing)
+    assert tracker.visible(0.0) == expected
+
+@pytest.mark.parametrize("seed", range(5))
+def test_expiry_matches_greedy_over_the_window(seed):
+    times, values = random_run(seed)
+    spacing, window = 0.1, 1.5
+    maxima = local_maxima(times, values)
+    tracker = PeakTracker(spacing, 0.0)
+    for i in range(0, len(times), 50):
+        tracker.feed(times[i:i + 50], values[i:i + 50])
+        now = times[min(i + 50, len(times)) - 1]
+        tracker.advance(now)
+        t_min = now - window
+        tracker.expire(t_min)
+        # Maxima whose right neighbour hasn't arrived yet aren't known
+        known = [p for p in maxima if t_min <= p[0] <= times[min(i + 50, len(times)) - 2]]
+        assert tracker.visible(t_min) == greedy_peaks(known, spacing)
+
+def test_delay_holds_peaks_back():
+    tracker = PeakTracker(1.0, 0.5)
+    tracker.feed([0.0, 0.1, 0.2], [0.0, 10.0, 0.0])
+    tracker.advance(0.5)
+    assert tracker.visible(0.0) == []
+    tracker.advance(0.6)
+    assert tracker.visible(0.0) == [(0.1, 10.0)]
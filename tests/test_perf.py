@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from l8r_perf import LatencySamples, PerfMonitor, hud_text, write_jsonl
+
+def test_summary_percentiles_and_histogram():
+    samples = LatencySamples()
+    for us in range(1, 101):
+        samples.add(us * 1e-6)
+    s = samples.summary()
+    assert (s["n"], s["p50"], s["p99"], s["max"]) == (100, 51.0, 100.0, 100.0)
+    assert s["mean"] == pytest.approx(50.5)
+    assert sum(count for _, count in s["hist"]) == 100
+    edges = [edge for edge, _ in s["hist"]]
+    assert edges == sorted(edges) and edges[-1] >= 100.0
+    assert LatencySamples().summary() == {"n": 0}
+
+def test_report_windows_and_rates():
+    perf = PerfMonitor(clock=lambda: 0.0)
+    perf.read.add(20e-6)
+    for i, queued in enumerate((3, 0, 9)):
+        perf.frame_start(i * 0.016, queued)
+    perf.rendered("MAGNITUDE", 0.002)
+    perf.rendered("MAGNITUDE", 0.004)
+
+    first = perf.report(2.0, {"polls": 1000, "dropped": 5})
+    assert first["window_s"] == 2.0
+    assert first["read_us"]["n"] == 1
+    assert first["frame_ms"]["n"] == 2 # Intervals between 3 frame starts
+    assert first["frame_ms"]["p50"] == pytest.approx(16.0)
+    assert first["render_ms"]["MAGNITUDE"]["mean"] == pytest.approx(3.0)
+    assert (first["queue_mean"], first["queue_max"]) == (4.0, 9)
+    assert first["polls_per_s"] == 0.0 # No baseline yet
+
+    second = perf.report(4.0, {"polls": 3000, "dropped": 5})
+    assert (second["polls_per_s"], second["dropped_per_s"]) == (1000.0, 0.0)
+    assert second["read_us"] == {"n": 0} and second["render_ms"] == {}
+    assert second["queue_max"] == 0
+
+def test_hud_and_log_lines():
+    perf = PerfMonitor(clock=lambda: 0.0)
+    perf.read.add(25e-6)
+    perf.frame_start(0.0, 2)
+    perf.frame_start(0.02, 1)
+    report = perf.report(1.0, {"resolves": 0})
+    report["scan_ms"] = 12.0
+    line = hud_text(report)
+    assert "read 25/25us" in line and "scan 12ms" in line and "frame 20/20ms" in line
+    f = io.StringIO()
+    write_jsonl(f, report)
+    assert f.getvalue().endswith("\n") and json.loads(f.getvalue()) == report
@@ -0,0 +1,54 @@
+import pytest
+
+import l8r_pointers
+from l8r_game import PLAYER_FIELDS, PROCESS_NAME
+from l8r_memory import MemoryReader
+from l8r_pointers import PointerMap, PointerScanner, format_chain, merge_chains, rescan
+from l8r_sim import SimGame
+
+OFFSETS = [0x100, 0xD0, 0x8, 0x48]
+
+@pytest.fixture
+def game():
+    sim = SimGame(0x3000, OFFSETS, PLAYER_FIELDS, module_size=1 << 20)
+    mem = MemoryReader(sim)
+    assert mem.attach(PROCESS_NAME)
+    yield sim, mem
+    mem.close()
+
+def search(mem, sim, scanner):
+    pmap = PointerMap.snapshot(mem)
+    return scanner.search(pmap, sim.player_address, sim.module_base, len(sim.module))
+
+def test_finds_the_planted_chain(game):
+    sim, mem = game
+    chains = search(mem, sim, PointerScanner(workers=1))
+    assert {"root": 0x3000, "offsets": OFFSETS, "checks": 0, "hits": 0} in chains
+    for chain in chains:
+        assert mem.resolve_chain(sim.module_base + chain["root"], chain["offsets"]) == sim.player_address
+    assert format_chain(chains[0]).endswith("[new]")
+
+def test_workers_find_the_same_chains(game, monkeypatch):
+    sim, mem = game
+    serial = search(mem, sim, PointerScanner(workers=1))
+    monkeypatch.setattr(l8r_pointers, "PARALLEL_MIN_FRONTIER", 1)
+    scanner = PointerScanner(workers=2)
+    try:
+        assert search(mem, sim, scanner) == serial
+        assert scanner.shared is not None
+    finally:
+        scanner.close()
+    assert scanner.shared is None and scanner.pool is None
+
+def test_rescans_rank_the_chains_that_survive_a_respawn(game):
+    sim, mem = game
+    broken = {"root": 0x3000, "offsets": OFFSETS[:-1] + [0x50], "checks": 0, "hits": 0}
+    chains = [broken, {"root": 0x3000, "offsets": list(OFFSETS), "checks": 0, "hits": 0}]
+    for _ in range(3):
+        sim.respawn()
+        assert rescan(mem, chains, sim.module_base, sim.player_address) == 1
+    # No address: anything whose velocity reads back sane counts
+    assert rescan(mem, chains, sim.module_base) == 1
+    merged = merge_chains(chains, [dict(broken, checks=0, hits=0)])
+    assert merged[0]["offsets"] == OFFSETS and merged[0]["hits"] == 4
+    assert merged[1]["checks"] == 4 # Rescan history kept, not reset by the new scan
@@ -0,0 +1,53 @@
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from l8r_record import RECORD, RECORD_HEADER, SessionRecorder
+from l8r_replay import Recording
+
+def f32(x):
+    return struct.unpack('<f', struct.pack('<f', x))[0]
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "nested" / "session.l8r")
+    recorder = SessionRecorder(path, chunk_records=100, flush_interval=0.05, clock=lambda: 50.0)
+    samples = [(50.0 + i * 0.001, f32(math.sin(i)), f32(-9.81 * i / 7), f32(i / 3)) for i in range(1234)]
+    for sample in samples:
+        recorder.record(*sample)
+    recorder.close()
+    recorder.join()
+    assert recorder.error is None
+    assert recorder.records == len(samples)
+    assert recorder.bytes_written == RECORD_HEADER.size + len(samples) * RECORD.size
+
+    with Recording(path) as rec:
+        assert len(rec) == len(samples)
+        assert rec.origin == 50.0
+        assert rec.duration() == pytest.approx(1.233)
+        t, speed, vx, vy, vz = rec.columns()
+        assert list(zip(t, vx, vy, vz)) == samples
+        assert np.array_equal(speed, np.sqrt(vx * vx + vy * vy + vz * vz))
+        # Chunked reads line up with the whole
+        assert list(rec.columns(1000, 5000)[0]) == [s[0] for s in samples[1000:]]
+        assert rec.index_after(50.0005) == 1
+
+def test_torn_record_is_ignored(tmp_path):
+    path = str(tmp_path / "session.l8r")
+    recorder = SessionRecorder(path)
+    for i in range(10):
+        recorder.record(float(i), 1.0, 2.0, 3.0)
+    recorder.close()
+    recorder.join()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD.size // 2))
+    with Recording(path) as rec:
+        assert len(rec) == 10
+        assert rec.columns()[0][-1] == 9.0
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-session.l8r"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        Recording(str(path))
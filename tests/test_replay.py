@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from l8r_record import SessionRecorder
+from l8r_replay import Recording, ReplaySource
+
+def write_session(path, times):
+    recorder = SessionRecorder(str(path), chunk_records=64)
+    for i, t in enumerate(times):
+        recorder.record(t, float(i), 0.0, 0.0)
+    recorder.close()
+    recorder.join()
+    assert recorder.error is None
+    return str(path)
+
+@pytest.mark.parametrize("room", [10_000, 100])
+def test_max_speed_restamp_strictly_increases(tmp_path, room):
+    times = 100.0 + np.arange(1000) / 1000.0
+    with Recording(write_session(tmp_path / "s.l8r", times)) as rec:
+        source = ReplaySource(rec, speed=None, batch=256)
+        stamped = []
+        now = 5.0
+        while not source.done():
+            batch = source.poll(now, room)
+            if batch is not None:
+                stamped.extend(batch[0])
+            now += 0.016
+        assert len(stamped) == len(times)
+        assert np.all(np.diff(stamped) > 0)
+        # The first batch keeps the recorded spacing and ends at the first poll
+        assert stamped[min(room, 256) - 1] == pytest.approx(5.0)
+        assert stamped[1] - stamped[0] == pytest.approx(0.001)
+
+def test_fixed_speed_restamp_follows_recording(tmp_path):
+    times = 100.0 + np.arange(1000) / 1000.0
+    with Recording(write_session(tmp_path / "s.l8r", times)) as rec:
+        source = ReplaySource(rec, speed=2.0)
+        assert source.poll(5.0, 10_000)[0][0] == pytest.approx(5.0)
+        t = source.poll(5.25, 10_000)[0]
+        assert np.all(np.diff(t) > 0)
+        assert t[-1] == pytest.approx(5.25)
@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import l8r_game
+import l8r_sample
+from l8r_game import PLAYER_FIELDS
+from l8r_memory import MemoryReader
+from l8r_record import RECORD, RECORD_HEADER
+from l8r_replay import Recording
+from l8r_sample import HeadlessSampler, SampleWriter
+from l8r_sim import SimGame
+
+def written(fmt, derived=False):
+    f = io.BytesIO()
+    writer = SampleWriter(f, fmt, derived, origin=100.0)
+    writer.begin()
+    writer.write(100.5, 5.0, 3.0, 0.0, 4.0, *((1.5, -2.0, 0.25) if derived else ()))
+    writer.write(100.75, 1.0, 0.0, 1.0, 0.0, *((0.0, 0.0, 0.0) if derived else ()))
+    return f.getvalue()
+
+def test_ndjson():
+    lines = [json.loads(line) for line in written("ndjson", derived=True).decode().splitlines()]
+    assert lines[0] == {"t": 0.5, "speed": 5.0, "vx": 3.0, "vy": 0.0, "vz": 4.0,
+                        "h_speed": 1.5, "accel": -2.0, "jerk": 0.25}
+    assert lines[1]["t"] == 0.75 and len(lines) == 2
+
+def test_csv():
+    rows = written("csv").decode().splitlines()
+    assert rows == ["t,speed,vx,vy,vz", "0.500000,5,3,0,4", "0.750000,1,0,1,0"]
+
+def test_bin_is_a_session_recording(tmp_path):
+    path = tmp_path / "run.l8r"
+    data = written("bin", derived=True) # Derived fields are never stored
+    assert len(data) == RECORD_HEADER.size + 2 * RECORD.size
+    path.write_bytes(data)
+    with Recording(str(path)) as rec:
+        t, speed, vx, vy, vz = rec.columns()
+        assert list(t) == [100.5, 100.75] and rec.origin == 100.0
+        assert list(speed) == [5.0, 1.0]
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        SampleWriter(io.BytesIO(), "xml")
+
+def test_samples_the_simulated_game(monkeypatch):
+    monkeypatch.setattr(l8r_game, "BASE_OFFSET", 0x3000)
+    monkeypatch.setattr(l8r_game, "POINTER_OFFSETS", [0x100, 0xD0, 0x8])
+    monkeypatch.setattr(l8r_game, "VELOCITY_SIGNATURE", None)
+    sim = SimGame(0x3000, [0x100, 0xD0, 0x8], PLAYER_FIELDS, module_size=1 << 20)
+    mem = MemoryReader(sim)
+    f = io.BytesIO()
+    statuses = []
+    sampler = HeadlessSampler(mem, SampleWriter(f, "csv", derived=True), period=0, smoothing="ema",
+                              log=statuses.append)
+    sampler.writer.begin()
+    sampler.run(count=50)
+    mem.close()
+    rows = f.getvalue().decode().splitlines()
+    assert rows[0] == "t,speed,vx,vy,vz,h_speed,accel,jerk"
+    assert len(rows) == 51 and sampler.samples == 50
+    t, speed, vx, vy, vz = (float(x) for x in rows[-1].split(",")[:5])
+    assert speed == pytest.approx((vx * vx + vy * vy + vz * vz) ** 0.5, rel=1e-5)
+    assert sampler.attached and statuses
+
+def test_command_line_never_imports_tkinter_or_numpy(tmp_path):
+    # A whole simulated run, in a fresh interpreter so nothing else has loaded them
+    path = tmp_path / "run.l8r"
+    code = ("import sys, l8r_sample; "
+            f"l8r_sample.main(['--simulate', '--rate', '0', '--count', '20', '--format', 'bin', '-o', {str(path)!r}, '-q']); "
+            "print(sorted(m for m in ('tkinter', 'numpy') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(l8r_sample.__file__)))
+    assert out.stdout.strip() == "[]"
+    with Recording(str(path)) as rec:
+        assert len(rec) == 20
@@ -0,0 +1,56 @@
+from array import array
+
+import pytest
+
+from l8r_sampling import SampleRing
+
+def push_range(ring, lo, hi):
+    for i in range(lo, hi):
+        ring.push(float(i), float(-i))
+
+def test_capacity_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        SampleRing(12, fields=("t", "v"))
+
+def test_wrap_without_lap_loses_nothing():
+    ring = SampleRing(8, fields=("t", "v"))
+    push_range(ring, 0, 6)
+    assert list(ring.consume()[0]) == [0, 1, 2, 3, 4, 5]
+    push_range(ring, 6, 12) # Wraps around the end of the columns
+    t, v = ring.consume()
+    assert list(t) == [6, 7, 8, 9, 10, 11]
+    assert list(v) == [-6, -7, -8, -9, -10, -11]
+    assert ring.dropped == 0
+    assert ring.pending() == 0
+
+def test_lapped_consumer_drops_oldest():
+    ring = SampleRing(8, fields=("t", "v"))
+    push_range(ring, 0, 20)
+    t, v = ring.consume()
+    # The slot after head may have been mid-write, so one less than capacity survives
+    assert list(t) == list(range(13, 20))
+    assert list(v) == [-x for x in range(13, 20)]
+    assert ring.dropped == 13
+    push_range(ring, 20, 23)
+    assert list(ring.consume()[0]) == [20, 21, 22]
+    assert ring.dropped == 13
+    assert ring.head == ring.tail == 23
+
+def test_extend_across_the_wrap():
+    ring = SampleRing(8, fields=("t", "v"))
+    push_range(ring, 0, 5)
+    ring.consume()
+    ring.extend((array('d', range(5, 11)), array('d', [-x for x in range(5, 11)])))
+    t, v = ring.consume()
+    assert list(t) == list(range(5, 11))
+    assert list(v) == [-x for x in range(5, 11)]
+    assert ring.dropped == 0
+
+def test_extend_past_unconsumed_samples_counts_them():
+    ring = SampleRing(8, fields=("t", "v"))
+    push_range(ring, 0, 4)
+    ring.extend((array('d', range(4, 10)), array('d', range(4, 10))))
+    t, _ = ring.consume()
+    assert list(t) == list(range(3, 10))
+    assert ring.dropped == 3
+    assert ring.dropped + len(t) == ring.head
@@ -0,0 +1,107 @@
+import re
+
+import pytest
+
+from l8r_game import PLAYER_FIELDS, PROCESS_NAME
+from l8r_memory import MemoryReader
+from l8r_scan import (PARALLEL_MIN_SIZE, POOL_START_MIN_SIZE, SCAN_CHUNK_SIZE, ParallelSignatureScanner,
+                      SignatureScanner, attach_shared_memory, compile_signature, find_in_buffer)
+from l8r_sim import SIM_SIGNATURE, SimGame
+
+MODULE_SIZE = 8 << 20
+SIG = compile_signature(SIM_SIGNATURE)
+PLANTED = bytes.fromhex(SIM_SIGNATURE.replace("??", "90"))
+
+def straddling_sim():
+    # The sim plants its signature 0x400 before the root slot: put it across
+    # the first 1 MB chunk boundary, then plant more across later ones
+    base_offset = SCAN_CHUNK_SIZE - 5 + 0x400
+    sim = SimGame(base_offset, [0x10], PLAYER_FIELDS, module_size=MODULE_SIZE)
+    for pos in (2 * SCAN_CHUNK_SIZE - 1, 3 * SCAN_CHUNK_SIZE - SIG.length + 1, 5 * SCAN_CHUNK_SIZE - 7, MODULE_SIZE - SIG.length):
+        sim._image[pos:pos + SIG.length] = PLANTED
+    expected = [sim.module_base + m.start() for m in SIG.regex.finditer(bytes(sim._image))]
+    assert sim.module_base + SCAN_CHUNK_SIZE - 5 in expected
+    return sim, expected
+
+def test_find_in_buffer_matches_regex():
+    sim, expected = straddling_sim()
+    data = bytes(sim._image)
+    assert [sim.module_base + hit for hit in find_in_buffer(data, SIG, 0, len(data))] == expected
+    # A window that ends mid-match can't report it
+    assert SCAN_CHUNK_SIZE - 5 not in find_in_buffer(data, SIG, 0, SCAN_CHUNK_SIZE)
+
+@pytest.mark.parametrize("scanner", [
+    SignatureScanner(),
+    SignatureScanner(chunk_size=SCAN_CHUNK_SIZE // 3 + 1),
+    ParallelSignatureScanner(1),
+    ParallelSignatureScanner(2),
+], ids=["serial", "serial-odd-chunks", "parallel-x1", "parallel-x2"])
+def test_scanner_finds_matches_across_chunk_boundaries(scanner):
+    sim, expected = straddling_sim()
+    mem = MemoryReader(sim, scan_workers=1)
+    assert mem.attach(PROCESS_NAME)
+    try:
+        hits = scanner.scan(mem, sim.module_base, MODULE_SIZE, [SIM_SIGNATURE], first_only=False)
+        assert hits[SIM_SIGNATURE] == expected
+        first = scanner.scan(mem, sim.module_base, MODULE_SIZE, [SIM_SIGNATURE])
+        assert first[SIM_SIGNATURE] == expected[:1]
+    finally:
+        if hasattr(scanner, "close"): scanner.close()
+        mem.close()
+
+def test_scan_pattern_resolves_the_root():
+    sim, expected = straddling_sim()
+    mem = MemoryReader(sim, scan_workers=1)
+    assert mem.attach(PROCESS_NAME)
+    assert mem.scan_pattern("UnityPlayer.dll", SIM_SIGNATURE) + sim.signature_offset == sim.root_addr
+    mem.close()
+
+def test_close_and_drop_release_the_shared_block():
+    from multiprocessing import shared_memory
+    sim, _ = straddling_sim()
+    mem = MemoryReader(sim, scan_workers=2)
+    assert mem.attach(PROCESS_NAME)
+    mem.scanner.scan(mem, sim.module_base, MODULE_SIZE, [SIM_SIGNATURE])
+    closed = mem.scanner.shm.name
+    mem.close()
+    assert mem.scanner.pool is None
+
+    mem = MemoryReader(sim, scan_workers=1)
+    assert mem.attach(PROCESS_NAME)
+    scanner = ParallelSignatureScanner(2)
+    scanner.scan(mem, sim.module_base, MODULE_SIZE, [SIM_SIGNATURE])
+    dropped = scanner.shm.name
+    del scanner # Never closed: the finalizer cleans up
+    for name in (closed, dropped):
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    mem.close()
+
+def test_automatic_workers_only_start_a_pool_for_big_modules():
+    scanner = ParallelSignatureScanner(0)
+    scanner.workers = 8 # As on an 8-core machine
+    assert not scanner.use_pool(30 << 20) # UnityPlayer.dll-sized: in-process beats pool startup
+    assert scanner.use_pool(POOL_START_MIN_SIZE)
+    scanner.workers = 1
+    assert not scanner.use_pool(POOL_START_MIN_SIZE) # Single core: never
+    assert ParallelSignatureScanner(2).use_pool(PARALLEL_MIN_SIZE) # Asked for workers: always above the minimum
+    assert not ParallelSignatureScanner(2).use_pool(PARALLEL_MIN_SIZE - 1)
+
+def test_attaching_leaves_the_tracker_alone(monkeypatch):
+    from multiprocessing import resource_tracker, shared_memory
+    owner = shared_memory.SharedMemory(create=True, size=4096)
+    try:
+        owner.buf[:4] = b"L8R!"
+        registered = []
+        record = lambda name, rtype: registered.append(name)
+        monkeypatch.setattr(resource_tracker, "register", record)
+        block = attach_shared_memory(owner.name)
+        assert bytes(block.buf[:4]) == b"L8R!" and block.size >= 4096
+        block.buf[4:8] = b"back" # Same pages, not a copy
+        assert bytes(owner.buf[4:8]) == b"back"
+        block.close()
+        block.close()
+        assert registered == []
+    finally:
+        owner.close()
+        owner.unlink()
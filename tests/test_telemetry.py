@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+
+import l8r_telemetry
+from l8r_sampling import RING_FIELDS
+from l8r_telemetry import (TelemetryServer, _Subscriber, connect, decode_batch, encode_batch,
+                           ws_accept_key, ws_frame, ws_read)
+
+def read_frame(data):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await ws_read(reader)
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("n", [0, 125, 126, 65535, 65536])
+@pytest.mark.parametrize("mask", [False, True])
+def test_frames_round_trip_at_every_length_encoding(n, mask):
+    payload = bytes(i & 0xFF for i in range(n))
+    frame = ws_frame(payload, mask=mask)
+    assert frame[0] == 0x82 and bool(frame[1] & 0x80) == mask
+    assert read_frame(frame) == (0x2, payload)
+
+def test_accept_key_matches_rfc_example():
+    assert ws_accept_key(b"dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+def batch_of(n):
+    return [[float(i + k) for i in range(n)] for k in range(len(RING_FIELDS))]
+
+def test_batches_round_trip():
+    batch = batch_of(5)
+    records = decode_batch(encode_batch(batch))
+    assert records == [tuple(column[i] for column in batch) for i in range(5)]
+    assert decode_batch(encode_batch(batch, 4)) == records[4:]
+    with pytest.raises(ValueError):
+        decode_batch(b"XXXX" + encode_batch(batch)[4:])
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+        self.writes = []
+        self.closing = False
+
+    def is_closing(self):
+        return self.closing
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def write(self, data):
+        self.writes.append(data)
+
+class FakeWriter:
+    def __init__(self, error=None):
+        self.transport = FakeTransport()
+        self.error = error
+
+    def close(self):
+        self.transport.closing = True
+
+    async def drain(self):
+        if self.error is not None:
+            raise self.error
+
+def test_stuck_client_keeps_only_the_newest_sample():
+    client = _Subscriber(FakeWriter())
+    client.offer(b"a", 10, None)
+    assert client.transport.writes == [b"a"] and client.sent == 10
+
+    client.transport.buffered = l8r_telemetry.TELEMETRY_HIGH_WATER + 1
+    client.offer(b"b", 10, lambda: b"b-newest")
+    assert client.pending == (b"b", 10) and client.ready.is_set()
+    client.offer(b"c", 7, lambda: b"c-newest")
+    assert client.pending == (b"c-newest", 1)
+    assert client.dropped == 10 + 7 - 1
+    assert client.transport.writes == [b"a"]
+
+    async def flush():
+        task = asyncio.create_task(client.send_loop())
+        await asyncio.sleep(0)
+        task.cancel()
+    asyncio.run(flush())
+    assert client.transport.writes == [b"a", b"c-newest"]
+    assert client.pending is None and client.sent == 11
+
+@pytest.mark.parametrize("error", [ConnectionResetError(), BrokenPipeError(), OSError()])
+def test_a_connection_breaking_while_backed_up_closes_the_client(error):
+    client = _Subscriber(FakeWriter(error))
+    client.transport.buffered = l8r_telemetry.TELEMETRY_HIGH_WATER + 1
+    client.offer(b"a", 5, None)
+    asyncio.run(asyncio.wait_for(client.send_loop(), 1.0)) # Returns instead of raising
+    assert client.transport.closing and client.pending is None
+    assert client.dropped == 5
+    client.offer(b"b", 3, None) # Nothing more goes to a closed transport
+    assert client.transport.writes == [] and client.pending is None
+
+def test_server_streams_pushed_samples():
+    server = TelemetryServer(port=0, tick=0.001)
+    assert server.start()
+    try:
+        async def run():
+            reader, writer, hello = await connect(port=server.port)
+            assert hello["fields"] == list(RING_FIELDS)
+            deadline = time.monotonic() + 2.0
+            while not server.clients and time.monotonic() < deadline:
+                await asyncio.sleep(0.005)
+            for i in range(3):
+                server.push(*(float(i),) * len(RING_FIELDS))
+            records = []
+            while len(records) < 3:
+                opcode, payload = await asyncio.wait_for(ws_read(reader), 2.0)
+                assert opcode == 0x2
+                records += decode_batch(payload)
+            writer.write(ws_frame(b"\x03\xe8", opcode=0x8, mask=True))
+            opcode, _ = await asyncio.wait_for(ws_read(reader), 2.0)
+            writer.close()
+            return records, opcode
+        records, opcode = asyncio.run(run())
+    finally:
+        server.stop()
+    assert [r[0] for r in records] == [0.0, 1.0, 2.0]
+    assert opcode == 0x8
+    assert server.stats()["clients"] == 0
+
+def test_stopping_with_clients_connected_is_clean(caplog):
+    server = TelemetryServer(port=0, tick=0.001)
+    assert server.start()
+    async def run():
+        reader, writer, hello = await connect(port=server.port)
+        deadline = time.monotonic() + 2.0
+        while not server.clients and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        await asyncio.get_running_loop().run_in_executor(None, server.stop)
+        writer.close()
+    with caplog.at_level("ERROR", logger="asyncio"):
+        asyncio.run(run())
+    assert not server._thread.is_alive()
+    assert not [r for r in caplog.records if r.name == "asyncio"]
@@ -0,0 +1,83 @@
+import pytest
+
+import l8r_game
+from l8r_game import OFFSET_VELOCITY, PLAYER_FIELDS, PROCESS_NAME
+from l8r_memory import MemoryReader
+from l8r_sim import SimGame
+from l8r_values import ValueScanner, run_command
+
+OFFSETS = [0x100, 0xD0, 0x8]
+
+class Motion:
+    # Velocity set by the test instead of the skate script
+    def __init__(self):
+        self.values = {"vx": 1234.5, "vy": 0.0, "vz": -7.25}
+
+    def __call__(self, t):
+        return self.values
+
+def refresh(sim, mem):
+    # The sim rewrites the velocity fields whenever the player object is read
+    mem.read_bytes(sim.player_address, 4)
+
+@pytest.fixture
+def game(monkeypatch):
+    monkeypatch.setattr(l8r_game, "BASE_OFFSET", 0x3000)
+    monkeypatch.setattr(l8r_game, "POINTER_OFFSETS", OFFSETS)
+    monkeypatch.setattr(l8r_game, "VELOCITY_SIGNATURE", None)
+    motion = Motion()
+    sim = SimGame(0x3000, OFFSETS, PLAYER_FIELDS, module_size=1 << 20, motion=motion)
+    mem = MemoryReader(sim)
+    assert mem.attach(PROCESS_NAME)
+    yield sim, mem, motion
+    mem.close()
+
+def test_first_and_next_narrow_down_to_the_field(game):
+    sim, mem, motion = game
+    vx = sim.player_address + OFFSET_VELOCITY
+    scanner = ValueScanner(mem)
+    refresh(sim, mem)
+    assert scanner.first("exact", 1234.5) >= 1
+    assert vx in dict(scanner.candidates())
+
+    motion.values = dict(motion.values, vx=1300.0)
+    refresh(sim, mem)
+    scanner.next("increased")
+    refresh(sim, mem)
+    scanner.next("unchanged")
+    assert scanner.candidates() == [(vx, 1300.0)]
+    assert scanner.next("exact", 0.0) == 0
+
+def test_unknown_then_changed(game):
+    sim, mem, motion = game
+    scanner = ValueScanner(mem)
+    refresh(sim, mem)
+    everything = scanner.first("unknown")
+    assert everything == (len(sim.module) + sim.heap_size) // 4
+    assert scanner.nbytes == everything * 4 # Values only until the first next scan
+    motion.values = {"vx": 1.0, "vy": 2.0, "vz": 3.0}
+    refresh(sim, mem)
+    assert scanner.next("changed") == 3
+    assert [address - sim.player_address for address, _ in scanner.candidates()] == \
+        sorted(offset for _, offset, _ in PLAYER_FIELDS)
+
+def test_range_scans_and_bad_conditions(game):
+    sim, mem, motion = game
+    scanner = ValueScanner(mem)
+    with pytest.raises(ValueError):
+        scanner.next("changed") # No first scan yet
+    with pytest.raises(ValueError):
+        scanner.first("changed")
+    refresh(sim, mem)
+    scanner.first("range", -7.5, -7.0)
+    assert sim.player_address + OFFSET_VELOCITY + 8 in dict(scanner.candidates())
+
+def test_offsets_command_names_the_fields(game):
+    sim, mem, motion = game
+    scanner = ValueScanner(mem)
+    refresh(sim, mem)
+    lines = []
+    for words in (["first", "exact", "1234.5"], ["offsets"]):
+        assert run_command(scanner, words, lines.append)
+    assert any(f"+0x{OFFSET_VELOCITY:X}" in line and "(currently vx)" in line for line in lines)
+    assert not run_command(scanner, ["quit"], lines.append)
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from l8r_game import BASE_MODULE, PLAYER_FIELDS
+from l8r_memory import LinuxBackend, MemoryReader
+from l8r_sim import SimGame
+from l8r_watch import AttachWatcher
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.002)
+
+def small_sim(cls=SimGame):
+    return cls(0x2000, [0x10], PLAYER_FIELDS, module_size=1 << 20, signature=None)
+
+def test_attach_detach_and_relaunch():
+    sim = small_sim()
+    mem = MemoryReader(sim)
+    watcher = AttachWatcher(sim).start()
+    try:
+        wait_for(lambda: watcher.events)
+        assert watcher.events[0] == ("attach", sim.pid, {BASE_MODULE: (sim.module_base, len(sim.module))})
+        assert watcher.apply(mem) is True and mem.pid == sim.pid
+        assert mem.get_module(BASE_MODULE) == (sim.module_base, len(sim.module))
+        assert watcher.apply(mem) is None # Nothing new
+
+        sim.exit()
+        wait_for(lambda: watcher.events)
+        assert watcher.apply(mem) is False and mem.pid is None
+        assert watcher.status.startswith("Game closed")
+
+        sim.restart()
+        wait_for(lambda: watcher.events)
+        assert watcher.apply(mem) is True and mem.pid == sim.pid == 4243
+    finally:
+        watcher.stop(1.0)
+        mem.close()
+
+class SlowLoad(SimGame):
+    # The module shows up a few lookups after the process
+    loaded = False
+
+    def find_module(self, pid, module_name):
+        return super().find_module(pid, module_name) if self.loaded else (None, 0)
+
+def test_waits_for_the_module_before_attaching():
+    sim = small_sim(SlowLoad)
+    watcher = AttachWatcher(sim).start()
+    try:
+        wait_for(lambda: watcher.lookups >= 3)
+        assert not watcher.events and watcher.status.startswith("Waiting for")
+        sim.loaded = True
+        wait_for(lambda: watcher.events)
+        assert watcher.events[0][0] == "attach"
+    finally:
+        watcher.stop(1.0)
+
+class Unopenable(SimGame):
+    # Visible to the watcher, but the sampling side can't open it (no rights yet)
+    openable = False
+
+    def open_process(self, pid):
+        return super().open_process(pid) if self.openable else None
+
+def test_attach_is_posted_again_when_the_process_cant_be_opened():
+    sim = small_sim(Unopenable)
+    mem = MemoryReader(sim)
+    watcher = AttachWatcher(sim).start()
+    try:
+        wait_for(lambda: watcher.events)
+        assert watcher.apply(mem) is False and watcher.retry
+        assert watcher.status.startswith("Can't open")
+        sim.openable = True
+        wait_for(lambda: watcher.events)
+        assert watcher.apply(mem) is True and mem.pid == sim.pid
+    finally:
+        watcher.stop(1.0)
+        mem.close()
+
+class DeadOnArrival(SimGame):
+    # Keeps reporting a process that has already exited, like a zombie: it
+    # is still listed, and a pidfd opens on it and reads as exited at once
+    found = 0
+
+    def find_process(self, process_name):
+        self.found += 1
+        return self.pid
+
+    def open_waiter(self, pid):
+        return pid
+
+def test_a_process_found_dead_doesnt_spin_the_watcher():
+    sim = small_sim(DeadOnArrival)
+    sim.exit()
+    watcher = AttachWatcher(sim).start()
+    time.sleep(0.5)
+    watcher.stop(1.0)
+    # Backing off 2, 4, 8 ... 250 ms: a handful of searches, not thousands
+    assert sim.found < 15
+    assert not watcher.events
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc")
+def test_linux_find_process_skips_zombies(tmp_path):
+    exe = tmp_path / "l8rzombie"
+    exe.symlink_to("/bin/true")
+    child = subprocess.Popen([str(exe)])
+    try:
+        backend = LinuxBackend()
+        deadline = time.monotonic() + 5.0
+        while backend.is_alive(child.pid) and time.monotonic() < deadline:
+            time.sleep(0.01) # Exits at once; nobody reaps it yet
+        assert os.path.exists(f"/proc/{child.pid}")
+        assert backend.find_process("l8rzombie") is None
+    finally:
+        child.wait()